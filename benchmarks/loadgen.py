@@ -0,0 +1,182 @@
+# benchmarks/loadgen.py
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter, defaultdict
+
+from lib.models import Session, Product
+from benchmarks.run import percentile
+
+DEFAULT_URL_HOST = "127.0.0.1"
+DEFAULT_URL_PORT = 8080
+DEFAULT_CONNECTIONS = 16
+DEFAULT_DURATION = 10.0
+DEFAULT_PIPELINE = 1
+DEFAULT_MIX = "lookup=80,order=12,fulfill=5,ship=3"
+SAMPLE_SIZE = 2000
+SHIP_STATUSES = ("in transit", "delivered")
+
+
+def parse_mix(value):
+    """Turn 'lookup=80,order=15' into normalized (name, weight) lists."""
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ("lookup", "order", "fulfill", "ship"):
+            raise argparse.ArgumentTypeError(f"Unknown operation '{name}' in --mix.")
+        mix[name] = float(weight or 1)
+    return list(mix), list(mix.values())
+
+
+class LoadState:
+    """Shared inputs and results for every simulated client."""
+
+    def __init__(self, product_ids, skus, seed):
+        self.product_ids = product_ids
+        self.skus = skus
+        self.rng = random.Random(seed)
+        self.pending_orders = []
+        self.open_shipments = []
+        self.latencies = defaultdict(list)
+        self.statuses = Counter()
+        self.requests = 0
+
+    def next_request(self, operation):
+        """Build (label, method, path, body) for one operation, falling back to a lookup when it has no input yet."""
+        rng = self.rng
+        if operation == "order":
+            basket = rng.sample(self.product_ids, min(3, len(self.product_ids)))
+            body = {"customer_name": "Load Test", "items": [{"product_id": p, "quantity": 1} for p in basket]}
+            return "order", "POST", "/orders", body
+        if operation == "fulfill" and self.pending_orders:
+            return "fulfill", "POST", f"/orders/{self.pending_orders.pop()}/fulfill", None
+        if operation == "ship" and self.open_shipments:
+            shipment_id, step = self.open_shipments.pop()
+            return "ship", "POST", f"/shipments/{shipment_id}", {"status": SHIP_STATUSES[step]}
+        if rng.random() < 0.5:
+            return "lookup_id", "GET", f"/products/{rng.choice(self.product_ids)}", None
+        return "lookup_sku", "GET", f"/products?sku={rng.choice(self.skus)}", None
+
+    def record(self, label, path, status, payload, elapsed):
+        self.requests += 1
+        self.statuses[status] += 1
+        self.latencies[label].append(elapsed)
+        if status == 201 and label == "order":
+            self.pending_orders.append(payload["id"])
+        elif status == 201 and label == "fulfill":
+            self.open_shipments.append((payload["id"], 0))
+        elif status == 200 and label == "ship" and payload["delivery_status"] == SHIP_STATUSES[0]:
+            self.open_shipments.append((payload["id"], 1))
+
+
+def encode_request(host, method, path, body):
+    data = json.dumps(body).encode() if body is not None else b""
+    head = f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Length: {len(data)}\r\n"
+    if data:
+        head += "Content-Type: application/json\r\n"
+    return (head + "\r\n").encode("latin-1") + data
+
+
+async def read_response(reader):
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("Server closed the connection.")
+    status = int(status_line.split()[1])
+    length = 0
+    while True:
+        header = await reader.readline()
+        if header in (b"\r\n", b""):
+            break
+        name, _, value = header.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    body = await reader.readexactly(length) if length else b""
+    return status, json.loads(body) if body else None
+
+
+async def run_client(host, port, state, operations, weights, pipeline, deadline):
+    """One keep-alive connection sending batches of pipeline requests until the deadline."""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            batch = [state.next_request(op) for op in state.rng.choices(operations, weights, k=pipeline)]
+            started = time.perf_counter()
+            writer.write(b"".join(encode_request(host, method, path, body) for _, method, path, body in batch))
+            await writer.drain()
+            for label, _, path, _ in batch:
+                status, payload = await read_response(reader)
+                state.record(label, path, status, payload, time.perf_counter() - started)
+    except (ConnectionError, asyncio.IncompleteReadError):
+        state.statuses["connection error"] += 1
+    finally:
+        writer.close()
+
+
+def sample_products(seed):
+    session = Session()
+    try:
+        rows = session.query(Product.id, Product.sku).all()
+    finally:
+        session.close()
+    rows = random.Random(seed).sample(rows, min(SAMPLE_SIZE, len(rows)))
+    return [row.id for row in rows], [row.sku for row in rows]
+
+
+def print_load_report(state, elapsed, connections, pipeline):
+    print(f"\n🚀 {state.requests:,} requests in {elapsed:.1f}s over {connections} connection(s), pipeline depth {pipeline}")
+    print(f"   Throughput: {state.requests / elapsed:,.0f} req/s")
+    print(f"   Status codes: {', '.join(f'{code}={count}' for code, count in sorted(state.statuses.items(), key=str))}")
+    print(f"\n{'Operation':<12} {'Count':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    print("-" * 60)
+    everything = []
+    for label in sorted(state.latencies):
+        values = sorted(state.latencies[label])
+        everything.extend(values)
+        print(f"{label:<12} {len(values):>8} " + " ".join(
+            f"{percentile(values, pct) * 1000:>9.2f}" for pct in (50, 95, 99, 100)
+        ))
+    everything.sort()
+    print("-" * 60)
+    print(f"{'all':<12} {len(everything):>8} " + " ".join(
+        f"{percentile(everything, pct) * 1000:>9.2f}" for pct in (50, 95, 99, 100)
+    ))
+
+
+async def run_load(host, port, connections, duration, pipeline, operations, weights, seed):
+    product_ids, skus = sample_products(seed)
+    if not product_ids:
+        print("⚠️ No products in the database; seed it first.")
+        return None
+    state = LoadState(product_ids, skus, seed)
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*(
+        run_client(host, port, state, operations, weights, pipeline, deadline) for _ in range(connections)
+    ))
+    print_load_report(state, time.perf_counter() - started, connections, pipeline)
+    return state
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drive the warehouse HTTP API and report throughput and tail latency.")
+    parser.add_argument("--host", default=DEFAULT_URL_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_URL_PORT)
+    parser.add_argument("--connections", type=int, default=DEFAULT_CONNECTIONS)
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION, help="seconds to run")
+    parser.add_argument("--pipeline", type=int, default=DEFAULT_PIPELINE,
+                        help="requests sent back to back on a connection before reading replies")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f"operation weights (default {DEFAULT_MIX})")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+    operations, weights = args.mix
+    asyncio.run(run_load(args.host, args.port, args.connections, args.duration, args.pipeline,
+                         operations, weights, args.seed))
+
+
+if __name__ == "__main__":
+    main()
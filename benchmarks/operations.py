@@ -0,0 +1,93 @@
+# benchmarks/operations.py
+
+import io
+from contextlib import redirect_stdout
+from lib import services
+from lib.cache import ProductCatalogCache
+from lib.models import Product, Order
+from lib.helpers import (
+    get_product_by_sku, get_product_by_id,
+    print_orders, print_shipments, keyset_page, order_summary_query,
+)
+
+SAMPLE_SIZE = 2000
+
+
+class BenchContext:
+    """IDs sampled once per database so timed operations don't pay for picking their inputs."""
+
+    def __init__(self, session, rng, catalog=None):
+        product_rows = session.query(Product.id, Product.sku).all()
+        sample = rng.sample(product_rows, min(SAMPLE_SIZE, len(product_rows)))
+        self.product_ids = [row.id for row in sample]
+        self.skus = [row.sku for row in sample]
+        pending = [row.id for row in session.query(Order.id).filter(Order.status == "pending").limit(SAMPLE_SIZE * 2)]
+        rng.shuffle(pending)
+        self.fulfill_ids = iter(pending[::2])
+        self.cancel_ids = iter(pending[1::2])
+        self.rng = rng
+        self.catalog = catalog or ProductCatalogCache()
+
+
+def lookup_by_sku(session, ctx):
+    get_product_by_sku(session, ctx.rng.choice(ctx.skus))
+
+
+def lookup_by_id(session, ctx):
+    get_product_by_id(session, ctx.rng.choice(ctx.product_ids))
+
+
+def cached_lookup_by_sku(session, ctx):
+    ctx.catalog.get_by_sku(session, ctx.rng.choice(ctx.skus))
+
+
+def cached_lookup_by_id(session, ctx):
+    ctx.catalog.get_by_id(session, ctx.rng.choice(ctx.product_ids))
+
+
+def create_order(session, ctx):
+    basket = {product_id: 1 for product_id in ctx.rng.sample(ctx.product_ids, 3)}
+    try:
+        services.place_order(session, "Benchmark Customer", basket)
+    except services.InsufficientStockError:
+        pass
+
+
+def fulfill_order(session, ctx):
+    try:
+        services.fulfill_order(session, next(ctx.fulfill_ids))
+    except services.InsufficientStockError:
+        pass
+
+
+def cancel_order(session, ctx):
+    services.delete_order(session, next(ctx.cancel_ids))
+
+
+def list_orders_page(session, ctx):
+    keyset_page(order_summary_query(session), Order.id)
+
+
+def list_orders_full(session, ctx):
+    with redirect_stdout(io.StringIO()):
+        print_orders(session)
+
+
+def track_shipments(session, ctx):
+    with redirect_stdout(io.StringIO()):
+        print_shipments(session)
+
+
+# (name, function, is_full_scan) -- full scans get fewer iterations.
+OPERATIONS = [
+    ("lookup_by_sku", lookup_by_sku, False),
+    ("lookup_by_id", lookup_by_id, False),
+    ("cached_lookup_sku", cached_lookup_by_sku, False),
+    ("cached_lookup_id", cached_lookup_by_id, False),
+    ("create_order", create_order, False),
+    ("fulfill_order", fulfill_order, False),
+    ("cancel_order", cancel_order, False),
+    ("list_orders_page", list_orders_page, False),
+    ("list_orders_full", list_orders_full, True),
+    ("track_shipments", track_shipments, True),
+]
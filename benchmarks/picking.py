@@ -0,0 +1,130 @@
+# benchmarks/picking.py
+
+import argparse
+import json
+import platform
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+from lib.picking import Incidence, WavePlan, plan_waves
+
+DEFAULT_ORDERS = 100000
+DEFAULT_SKUS = 5000
+DEFAULT_WAVE_SIZES = "25,50,100"
+DEFAULT_SKEW = 1.1
+DEFAULT_MEAN_LINES = 3.0
+DEFAULT_REPEAT = 3
+DEFAULT_MAX_REGRESSION = 0.20
+DEFAULT_SEED = 42
+
+
+def synthetic_incidence(num_orders, num_skus, skew=DEFAULT_SKEW, mean_lines=DEFAULT_MEAN_LINES, seed=DEFAULT_SEED):
+    """
+    Pending orders with 1 + Poisson(mean_lines - 1) lines each, whose SKUs are
+    drawn from a Zipf-like popularity curve: a few SKUs are on many orders and
+    most are on few, as in a real catalog.
+    """
+    rng = np.random.default_rng(seed)
+    lines_per_order = 1 + rng.poisson(mean_lines - 1, num_orders)
+    popularity = 1.0 / np.arange(1, num_skus + 1) ** skew
+    skus = rng.choice(num_skus, size=int(lines_per_order.sum()), p=popularity / popularity.sum())
+    orders = np.repeat(np.arange(1, num_orders + 1), lines_per_order)
+    quantities = rng.integers(1, 4, len(skus))
+    return Incidence(orders, skus + 1, quantities)
+
+
+def measure(incidence, wave_size, repeat):
+    """Best-of-repeat planning time, plus the plan's quality against FIFO waves."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        waves = plan_waves(incidence, wave_size)
+        timings.append(time.perf_counter() - started)
+    plan = WavePlan(incidence, waves, wave_size, min(timings))
+    return {
+        "plan_s": round(plan.elapsed, 4),
+        "waves": len(waves),
+        "stops": int(plan.stops.sum()),
+        "fifo_stops": int(plan.fifo_stops.sum()),
+        "stops_saved": round(plan.stops_saved, 4),
+        "lines_per_stop": round(plan.lines_per_stop, 3),
+    }
+
+
+def compare_to_baseline(results, baseline, max_regression):
+    """Return human-readable regressions in planning time or wave quality against a stored run."""
+    regressions = []
+    for name, current in results["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous:
+            continue
+        if previous["plan_s"] > 0:
+            change = (current["plan_s"] - previous["plan_s"]) / previous["plan_s"]
+            if change > max_regression:
+                regressions.append(f"{name}: planning {previous['plan_s']:.2f}s -> {current['plan_s']:.2f}s (+{change:.0%})")
+        if current["stops"] > previous["stops"]:
+            regressions.append(f"{name}: shelf stops {previous['stops']:,} -> {current['stops']:,}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the pick-wave planner and measure the quality of its waves.")
+    parser.add_argument("--orders", type=int, default=DEFAULT_ORDERS, help="pending orders to plan")
+    parser.add_argument("--skus", type=int, default=DEFAULT_SKUS, help="SKUs in the catalog")
+    parser.add_argument("--wave-sizes", default=DEFAULT_WAVE_SIZES, help="comma-separated wave sizes to plan with")
+    parser.add_argument("--skew", type=float, default=DEFAULT_SKEW, help="Zipf exponent of SKU popularity")
+    parser.add_argument("--mean-lines", type=float, default=DEFAULT_MEAN_LINES, help="average lines per order")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="plans per wave size (best time is kept)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="compare against a previous JSON results file")
+    parser.add_argument("--max-regression", type=float, default=DEFAULT_MAX_REGRESSION,
+                        help="allowed planning slowdown vs. baseline as a fraction (default 0.20)")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    incidence = synthetic_incidence(args.orders, args.skus, args.skew, args.mean_lines, args.seed)
+    print(f"📦 {incidence.num_orders:,} orders, {incidence.num_lines:,} lines over "
+          f"{len(incidence.product_ids):,} SKUs generated in {time.perf_counter() - started:.2f}s\n")
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "orders": args.orders, "skus": args.skus, "skew": args.skew,
+            "mean_lines": args.mean_lines, "seed": args.seed,
+        },
+        "results": {},
+    }
+    print(f"{'Wave size':>9} {'Plan s':>8} {'Waves':>7} {'Stops':>9} {'FIFO stops':>11} {'Saved':>7} {'Lines/stop':>11}")
+    print("-" * 68)
+    for wave_size in (int(size) for size in args.wave_sizes.split(",")):
+        result = measure(incidence, wave_size, args.repeat)
+        results["results"][f"wave_{wave_size}"] = result
+        print(f"{wave_size:>9} {result['plan_s']:>8.2f} {result['waves']:>7,} {result['stops']:>9,} "
+              f"{result['fifo_stops']:>11,} {result['stops_saved']:>7.1%} {result['lines_per_stop']:>11.2f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, args.max_regression)
+        if regressions:
+            print(f"\n🛑 {len(regressions)} planner regression(s) against {args.baseline}:")
+            for line in regressions:
+                print(f"  - {line}")
+            return 1
+        print(f"\n✅ No planner regressions against {args.baseline}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+# benchmarks/run.py
+
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from datetime import datetime
+
+from sqlalchemy.orm import sessionmaker
+
+from lib.config import make_engine
+from lib.models import Base
+from lib.checks import count_statements
+from lib.cache import ProductCatalogCache
+from lib.seed import generate_database
+from benchmarks.operations import BenchContext, OPERATIONS
+
+BENCH_DB_DIR = os.path.join("db", "bench")
+DEFAULT_SIZES = "10k,100k,1m"
+DEFAULT_ITERATIONS = 200
+DEFAULT_SCAN_ITERATIONS = 3
+DEFAULT_MAX_REGRESSION = 0.20
+DEFAULT_SEED = 42
+
+
+def parse_size(value):
+    """Turn '10k', '100k' or '1m' into an order count."""
+    value = value.strip().lower()
+    multiplier = {"k": 1000, "m": 1000000}.get(value[-1:], 1)
+    digits = value[:-1] if multiplier > 1 else value
+    return int(float(digits) * multiplier)
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+def peak_alloc_kb(operation, make_session, ctx):
+    """
+    Peak Python memory allocated by one extra, untimed call of the operation,
+    in KiB, or None when the operation has nothing left to work on. Tracing
+    is kept out of the timed calls so it cannot skew their latency.
+    """
+    session = make_session()
+    tracemalloc.start()
+    try:
+        operation(session, ctx)
+        return tracemalloc.get_traced_memory()[1] // 1024
+    except StopIteration:
+        return None
+    finally:
+        tracemalloc.stop()
+        session.close()
+
+
+def template_path(num_orders):
+    return os.path.join(BENCH_DB_DIR, f"orders_{num_orders}.db")
+
+
+def build_template(num_orders, seed, rebuild=False):
+    """Generate the benchmark database for a size once and reuse it across runs."""
+    path = template_path(num_orders)
+    if os.path.exists(path) and not rebuild:
+        return path
+    os.makedirs(BENCH_DB_DIR, exist_ok=True)
+    if os.path.exists(path):
+        os.remove(path)
+    engine = make_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with redirect_stdout(io.StringIO()):
+        generate_database(max(1000, num_orders // 10), num_orders, seed=seed, target_engine=engine)
+    engine.dispose()
+    return path
+
+
+def run_size(num_orders, iterations, scan_iterations, seed, rebuild=False):
+    """Time every operation against a fresh copy of the database for one size."""
+    template = build_template(num_orders, seed, rebuild)
+    work_path = template.replace(".db", "_work.db")
+    shutil.copyfile(template, work_path)
+    for suffix in ("-wal", "-shm"):
+        if os.path.exists(work_path + suffix):
+            os.remove(work_path + suffix)
+    engine = make_engine(f"sqlite:///{work_path}")
+    make_session = sessionmaker(bind=engine)
+
+    setup_session = make_session()
+    ctx = BenchContext(setup_session, random.Random(seed), ProductCatalogCache().attach(make_session))
+    setup_session.close()
+
+    results = {}
+    for name, operation, is_full_scan in OPERATIONS:
+        runs = scan_iterations if is_full_scan else iterations
+        timings = []
+        with count_statements(engine) as counter:
+            for _ in range(runs):
+                session = make_session()
+                try:
+                    started = time.perf_counter()
+                    operation(session, ctx)
+                    timings.append((time.perf_counter() - started) * 1000.0)
+                except StopIteration:
+                    break
+                finally:
+                    session.close()
+        timings.sort()
+        peak_kb = peak_alloc_kb(operation, make_session, ctx) if timings else None
+        results[name] = {
+            "iterations": len(timings),
+            "p50_ms": round(percentile(timings, 50), 4),
+            "p95_ms": round(percentile(timings, 95), 4),
+            "p99_ms": round(percentile(timings, 99), 4),
+            "statements_per_call": round(counter["count"] / len(timings), 2) if timings else 0,
+            "peak_alloc_kb": peak_kb,
+        }
+        memory = f"{peak_kb:,}KiB" if peak_kb is not None else "n/a"
+        print(f"  {name:<18} p50={results[name]['p50_ms']:>9.3f}ms p95={results[name]['p95_ms']:>9.3f}ms "
+              f"p99={results[name]['p99_ms']:>9.3f}ms stmts={results[name]['statements_per_call']:>7} "
+              f"peak={memory}")
+
+    engine.dispose()
+    for path in (work_path, work_path + "-wal", work_path + "-shm"):
+        if os.path.exists(path):
+            os.remove(path)
+    return results
+
+
+def compare_to_baseline(results, baseline, max_regression):
+    """Return a list of human-readable regressions against a stored baseline run."""
+    regressions = []
+    for size, operations in results["results"].items():
+        for name, current in operations.items():
+            previous = baseline.get("results", {}).get(size, {}).get(name)
+            if not previous:
+                continue
+            if previous["p95_ms"] > 0:
+                change = (current["p95_ms"] - previous["p95_ms"]) / previous["p95_ms"]
+                if change > max_regression:
+                    regressions.append(
+                        f"{size} orders / {name}: p95 {previous['p95_ms']:.3f}ms -> {current['p95_ms']:.3f}ms (+{change:.0%})"
+                    )
+            if current["statements_per_call"] > previous["statements_per_call"]:
+                regressions.append(
+                    f"{size} orders / {name}: statements per call {previous['statements_per_call']} -> {current['statements_per_call']}"
+                )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark core warehouse operations at realistic scale.")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="comma-separated order counts, e.g. 10k,100k,1m")
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS, help="timed calls per point operation")
+    parser.add_argument("--scan-iterations", type=int, default=DEFAULT_SCAN_ITERATIONS, help="timed calls per full-table listing")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="seed for data generation and sampling")
+    parser.add_argument("--rebuild", action="store_true", help="regenerate cached benchmark databases")
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="compare against a previous JSON results file")
+    parser.add_argument("--max-regression", type=float, default=DEFAULT_MAX_REGRESSION,
+                        help="allowed p95 slowdown vs. baseline as a fraction (default 0.20)")
+    args = parser.parse_args(argv)
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "iterations": args.iterations,
+            "scan_iterations": args.scan_iterations,
+            "seed": args.seed,
+        },
+        "results": {},
+    }
+    for size in args.sizes.split(","):
+        num_orders = parse_size(size)
+        print(f"\n--- ⏱️ {num_orders} orders ---")
+        results["results"][str(num_orders)] = run_size(
+            num_orders, args.iterations, args.scan_iterations, args.seed, args.rebuild
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, args.max_regression)
+        if regressions:
+            print(f"\n🛑 {len(regressions)} regression(s) against {args.baseline}:")
+            for line in regressions:
+                print(f"  - {line}")
+            return 1
+        print(f"\n✅ No regressions against {args.baseline}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
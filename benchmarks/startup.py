@@ -0,0 +1,133 @@
+# benchmarks/startup.py
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+DEFAULT_RUNS = 7
+DEFAULT_TOP = 10
+DEFAULT_MAX_REGRESSION = 0.20
+
+# (name, python arguments, module whose cumulative import time is tracked)
+TARGETS = [
+    ("interpreter", ["-c", "pass"], None),
+    ("cli_import", ["-c", "import lib.cli"], "lib.cli"),
+    ("cli_help", ["-m", "lib.cli", "--help"], None),
+    ("models_import", ["-c", "import lib.models"], "lib.models"),
+    ("sqlalchemy_import", ["-c", "import sqlalchemy"], "sqlalchemy"),
+]
+
+
+def parse_importtime(stderr):
+    """Map module name -> (self_us, cumulative_us) from `python -X importtime` output."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def run_once(args, cwd):
+    """Run a fresh interpreter once; return its wall time in ms and its import timings."""
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True,
+    )
+    return (time.perf_counter() - started) * 1000, parse_importtime(completed.stderr)
+
+
+def measure(name, args, module, runs, cwd, top):
+    walls, cumulative, self_times = [], [], {}
+    for _ in range(runs):
+        wall_ms, modules = run_once(args, cwd)
+        walls.append(wall_ms)
+        if module:
+            cumulative.append(modules.get(module, (0, 0))[1] / 1000)
+        for mod, (self_us, _) in modules.items():
+            self_times.setdefault(mod, []).append(self_us / 1000)
+    heaviest = sorted(
+        ((statistics.median(values), mod) for mod, values in self_times.items()), reverse=True
+    )[:top]
+    return {
+        "wall_ms": round(statistics.median(walls), 2),
+        "import_ms": round(statistics.median(cumulative), 2) if cumulative else None,
+        "modules_loaded": len(self_times),
+        "heaviest_modules": [{"module": mod, "self_ms": round(ms, 2)} for ms, mod in heaviest],
+    }
+
+
+def compare_to_baseline(results, baseline, max_regression):
+    """Return a list of human-readable startup regressions against a stored run."""
+    regressions = []
+    for name, current in results["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous or previous["wall_ms"] <= 0:
+            continue
+        change = (current["wall_ms"] - previous["wall_ms"]) / previous["wall_ms"]
+        if change > max_regression:
+            regressions.append(f"{name}: {previous['wall_ms']:.1f}ms -> {current['wall_ms']:.1f}ms (+{change:.0%})")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Track cold start latency of the CLI with -X importtime.")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS, help="fresh interpreters per target (median is kept)")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help="heaviest modules to list per target")
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="compare against a previous JSON results file")
+    parser.add_argument("--max-regression", type=float, default=DEFAULT_MAX_REGRESSION,
+                        help="allowed wall-time slowdown vs. baseline as a fraction (default 0.20)")
+    args = parser.parse_args(argv)
+
+    cwd = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    results = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "runs": args.runs,
+        },
+        "results": {},
+    }
+    print(f"{'Target':<18} {'Wall ms':>9} {'Import ms':>10} {'Modules':>8}")
+    print("-" * 48)
+    for name, target_args, module in TARGETS:
+        result = measure(name, target_args, module, args.runs, cwd, args.top)
+        results["results"][name] = result
+        import_ms = f"{result['import_ms']:.1f}" if result["import_ms"] is not None else "-"
+        print(f"{name:<18} {result['wall_ms']:>9.1f} {import_ms:>10} {result['modules_loaded']:>8}")
+
+    heaviest = results["results"]["cli_import"]["heaviest_modules"]
+    print(f"\n🐢 Heaviest modules on `import lib.cli` (self time):")
+    for entry in heaviest:
+        print(f"   {entry['self_ms']:>8.2f} ms  {entry['module']}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, args.max_regression)
+        if regressions:
+            print(f"\n🛑 {len(regressions)} startup regression(s) against {args.baseline}:")
+            for line in regressions:
+                print(f"  - {line}")
+            return 1
+        print(f"\n✅ No startup regressions against {args.baseline}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,328 @@
+# lib/archive.py
+
+import argparse
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import (
+    Column, Index, MetaData, Table, and_, create_engine, delete, exists, func, insert, or_, select, text,
+)
+
+from lib.config import get_archive_path
+from lib.models import Order, OrderItem, Shipment, get_engine
+
+ARCHIVE_SCHEMA = "archive"
+DEFAULT_BATCH_SIZE = 5000
+DEFAULT_MIN_AGE_DAYS = 365
+VACUUM_STEP_PAGES = 2000
+
+orders = Order.__table__
+order_items = OrderItem.__table__
+shipments = Shipment.__table__
+
+# Cold storage
+# ------------
+# Closed orders (cancelled, or fulfilled with a delivered shipment) older
+# than a cutoff are moved with their items and shipments into a separate
+# SQLite file that the archival job ATTACHes as "archive". The archive tables
+# mirror the hot ones without foreign keys, since products stay in the hot
+# database. get_archived_order() reads the file directly for IDs that are no
+# longer hot.
+
+archive_metadata = MetaData()
+
+
+def mirror_table(table):
+    """An archive copy of a hot table: same columns, no foreign keys or defaults."""
+    return Table(
+        table.name, archive_metadata,
+        *(Column(column.name, column.type, primary_key=column.primary_key, nullable=column.nullable)
+          for column in table.columns),
+        schema=ARCHIVE_SCHEMA,
+    )
+
+
+archived_orders = mirror_table(orders)
+archived_order_items = mirror_table(order_items)
+archived_shipments = mirror_table(shipments)
+Index("ix_archive_order_items_order_id", archived_order_items.c.order_id)
+Index("ix_archive_shipments_order_id", archived_shipments.c.order_id, unique=True)
+
+
+class ArchiveResult:
+    def __init__(self):
+        self.batches = 0
+        self.orders = 0
+        self.skipped = 0
+        self.pages_freed = 0
+        self.elapsed = 0.0
+
+    def __str__(self):
+        return (
+            f"{self.orders} order(s) archived in {self.batches} batch(es), {self.skipped} skipped, "
+            f"{self.pages_freed} page(s) freed in {self.elapsed:.1f}s"
+        )
+
+
+def closed_orders_before(cutoff, limit):
+    """IDs of the next batch of closed orders placed before cutoff."""
+    delivered = exists().where(shipments.c.order_id == orders.c.id, shipments.c.delivery_status == "delivered")
+    return (
+        select(orders.c.id)
+        .where(
+            orders.c.order_date < cutoff,
+            or_(orders.c.status == "cancelled", and_(orders.c.status == "fulfilled", delivered)),
+        )
+        .order_by(orders.c.id)
+        .limit(limit)
+    )
+
+
+def reserve_archived_ids(conn):
+    """
+    Move each hot table's AUTOINCREMENT counter past the highest ID in the
+    archive, so no ID is ever handed out again. Rows archived before the
+    counters existed may hold IDs above anything left in the hot tables.
+    """
+    for source, target in ((orders, archived_orders), (order_items, archived_order_items),
+                           (shipments, archived_shipments)):
+        highest = conn.execute(select(func.max(target.c.id))).scalar()
+        if highest is None:
+            continue
+        params = {"name": source.name, "seq": highest}
+        current = conn.execute(text("SELECT seq FROM main.sqlite_sequence WHERE name = :name"), params).scalar()
+        if current is None:
+            conn.execute(text("INSERT INTO main.sqlite_sequence (name, seq) VALUES (:name, :seq)"), params)
+        elif current < highest:
+            conn.execute(text("UPDATE main.sqlite_sequence SET seq = :seq WHERE name = :name"), params)
+
+
+def copy_to_archive(conn, order_ids):
+    """
+    Copy orders, their items and shipments into the attached archive,
+    replacing earlier copies of the same orders. A row whose ID the archive
+    already holds for another order fails the batch with an IntegrityError
+    instead of overwriting it.
+    """
+    for source, target, key, archived_key in (
+        (orders, archived_orders, orders.c.id, archived_orders.c.id),
+        (order_items, archived_order_items, order_items.c.order_id, archived_order_items.c.order_id),
+        (shipments, archived_shipments, shipments.c.order_id, archived_shipments.c.order_id),
+    ):
+        conn.execute(delete(target).where(archived_key.in_(order_ids)))
+        columns = [column.name for column in source.columns]
+        conn.execute(insert(target).from_select(columns, select(source).where(key.in_(order_ids))))
+
+
+def delete_archived(conn, order_ids):
+    """
+    Delete the hot copies of orders that reached the archive unchanged.
+    An order updated since it was copied stays hot and is refreshed next run.
+    Returns the IDs deleted.
+    """
+    archived = archived_orders.alias("archived")
+    unchanged = select(archived.c.updated_at).where(archived.c.id == orders.c.id).scalar_subquery()
+    deleted = conn.execute(
+        delete(orders)
+        .where(orders.c.id.in_(order_ids), orders.c.updated_at.is_not_distinct_from(unchanged))
+        .returning(orders.c.id)
+    ).scalars().all()
+    if deleted:
+        # Cascades do this already when foreign keys are enforced.
+        conn.execute(delete(shipments).where(shipments.c.order_id.in_(deleted)))
+        conn.execute(delete(order_items).where(order_items.c.order_id.in_(deleted)))
+    return deleted
+
+
+def compact_hot_database(conn):
+    """
+    Return free pages to the filesystem with incremental vacuum, a step at a
+    time so writers are never blocked for long. A database created without
+    auto_vacuum=INCREMENTAL is switched over with one full VACUUM first.
+    Returns the number of pages the file shrank by.
+    """
+    pages_before = conn.exec_driver_sql("PRAGMA page_count").scalar()
+    if conn.exec_driver_sql("PRAGMA auto_vacuum").scalar() != 2:
+        print("🧹 Switching the database to incremental auto-vacuum (one full VACUUM)...")
+        conn.exec_driver_sql("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.exec_driver_sql("VACUUM")
+    else:
+        free_pages = conn.exec_driver_sql("PRAGMA freelist_count").scalar()
+        while free_pages:
+            conn.exec_driver_sql(f"PRAGMA incremental_vacuum({VACUUM_STEP_PAGES})")
+            remaining = conn.exec_driver_sql("PRAGMA freelist_count").scalar()
+            if remaining >= free_pages:
+                break
+            free_pages = remaining
+    conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+    return pages_before - conn.exec_driver_sql("PRAGMA page_count").scalar()
+
+
+def archive_orders(cutoff, batch_size=DEFAULT_BATCH_SIZE, archive_path=None, engine=None, vacuum=True):
+    """
+    Move closed orders placed before cutoff into the archive database, one
+    batch per pair of transactions. Each batch is first copied (a
+    transaction that writes only the archive) and then deleted from the hot
+    database (one that writes only the hot database). SQLite in WAL mode
+    does not commit attached databases atomically together; this order means
+    a crash can leave a duplicate, which the next run refreshes, but never
+    loses an order.
+    """
+    archive_path = archive_path or get_archive_path()
+    if archive_path is None:
+        raise ValueError("Archival needs a file-based SQLite database; set WAREHOUSE_ARCHIVE_PATH.")
+    engine = engine or get_engine()
+    result = ArchiveResult()
+    started = time.perf_counter()
+    with engine.connect() as conn:
+        conn.exec_driver_sql(f"ATTACH DATABASE ? AS {ARCHIVE_SCHEMA}", (archive_path,))
+        try:
+            archive_metadata.create_all(conn)
+            reserve_archived_ids(conn)
+            conn.commit()
+            after_id = 0
+            while True:
+                with conn.begin():
+                    order_ids = conn.execute(
+                        closed_orders_before(cutoff, batch_size).where(orders.c.id > after_id)
+                    ).scalars().all()
+                    if not order_ids:
+                        break
+                    copy_to_archive(conn, order_ids)
+                with conn.begin():
+                    deleted = delete_archived(conn, order_ids)
+                after_id = order_ids[-1]
+                result.batches += 1
+                result.orders += len(deleted)
+                result.skipped += len(order_ids) - len(deleted)
+                print(f"📦 Batch {result.batches}: archived {len(deleted)} order(s) up to #{after_id}...")
+        finally:
+            conn.rollback()
+            conn.exec_driver_sql(f"DETACH DATABASE {ARCHIVE_SCHEMA}")
+        if vacuum:
+            result.pages_freed = compact_hot_database(conn)
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+_archive_engines = {}
+_archive_engines_lock = threading.Lock()
+
+
+def get_archive_engine(archive_path=None):
+    """A read-only engine on the archive file, or None when nothing has been archived yet."""
+    archive_path = archive_path or get_archive_path()
+    if archive_path is None or not os.path.exists(archive_path):
+        return None
+    with _archive_engines_lock:
+        engine = _archive_engines.get(archive_path)
+        if engine is None:
+            engine = create_engine(f"sqlite:///file:{archive_path}?mode=ro&uri=true").execution_options(
+                schema_translate_map={ARCHIVE_SCHEMA: None}
+            )
+            _archive_engines[archive_path] = engine
+        return engine
+
+
+def get_archived_order(order_id, archive_path=None):
+    """
+    Load an archived order with its items and shipment as detached,
+    read-only Order objects marked archived=True, or return None.
+    """
+    engine = get_archive_engine(archive_path)
+    if engine is None:
+        return None
+    with engine.connect() as conn:
+        row = conn.execute(select(archived_orders).where(archived_orders.c.id == order_id)).mappings().first()
+        if row is None:
+            return None
+        items = conn.execute(
+            select(archived_order_items).where(archived_order_items.c.order_id == order_id).order_by(archived_order_items.c.id)
+        ).mappings().all()
+        shipment = conn.execute(
+            select(archived_shipments).where(archived_shipments.c.order_id == order_id)
+        ).mappings().first()
+    order = Order(**row)
+    order.order_items = [OrderItem(**item) for item in items]
+    order.shipment = Shipment(**shipment) if shipment else None
+    order.archived = True
+    return order
+
+
+def archive_stats(engine=None, archive_path=None):
+    """Row counts of the hot and archive order tables plus the database file sizes."""
+    engine = engine or get_engine()
+    archive_path = archive_path or get_archive_path()
+    stats = {}
+    with engine.connect() as conn:
+        stats["hot_orders"] = conn.execute(select(func.count()).select_from(orders)).scalar()
+        stats["hot_free_pages"] = conn.exec_driver_sql("PRAGMA freelist_count").scalar()
+        stats["hot_bytes"] = (conn.exec_driver_sql("PRAGMA page_count").scalar()
+                              * conn.exec_driver_sql("PRAGMA page_size").scalar())
+    archive_engine = get_archive_engine(archive_path)
+    stats["archived_orders"] = 0
+    stats["archive_bytes"] = 0
+    if archive_engine is not None:
+        with archive_engine.connect() as conn:
+            stats["archived_orders"] = conn.execute(select(func.count()).select_from(archived_orders)).scalar()
+        stats["archive_bytes"] = os.path.getsize(archive_path)
+    return stats
+
+
+def print_archive_stats(stats):
+    print("\n--- 🗄️ Order Archive ---")
+    print(f"Hot orders:      {stats['hot_orders']:,} ({stats['hot_bytes'] / 1e6:.1f} MB, {stats['hot_free_pages']:,} free page(s))")
+    print(f"Archived orders: {stats['archived_orders']:,} ({stats['archive_bytes'] / 1e6:.1f} MB)")
+
+
+def parse_date(value):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date '{value}', expected YYYY-MM-DD")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Move old closed orders into the archive database.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run = subparsers.add_parser("run", help="archive closed orders placed before a cutoff")
+    cutoff = run.add_mutually_exclusive_group()
+    cutoff.add_argument("--before", type=parse_date, metavar="YYYY-MM-DD", help="archive orders placed before this date")
+    cutoff.add_argument("--older-than-days", type=int, default=DEFAULT_MIN_AGE_DAYS,
+                        help=f"archive orders placed more than this many days ago (default {DEFAULT_MIN_AGE_DAYS})")
+    run.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="orders moved per batch")
+    run.add_argument("--no-vacuum", action="store_true", help="skip compacting the hot database afterwards")
+
+    show = subparsers.add_parser("show", help="print an archived order")
+    show.add_argument("id", type=int)
+
+    subparsers.add_parser("stats", help="count hot and archived orders")
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        cutoff = args.before or datetime.now() - timedelta(days=args.older_than_days)
+        print(f"--- 🗄️ Archiving closed orders placed before {cutoff:%Y-%m-%d} ---")
+        result = archive_orders(cutoff, args.batch_size, vacuum=not args.no_vacuum)
+        print(f"✅ {result}.")
+        print_archive_stats(archive_stats())
+    elif args.command == "show":
+        order = get_archived_order(args.id)
+        if order is None:
+            print(f"🔍 Order #{args.id} is not in the archive.")
+            return 1
+        print(f"Order #{order.id} for '{order.customer_name}' ({order.status}, archived), placed {order.order_date:%Y-%m-%d %H:%M}")
+        for item in order.order_items:
+            print(f"  - {item.quantity} x product #{item.product_id} at KSH-{item.unit_price:.2f}")
+        if order.shipment:
+            print(f"  Shipment #{order.shipment.id}: {order.shipment.delivery_status}")
+    elif args.command == "stats":
+        print_archive_stats(archive_stats())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
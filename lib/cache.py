@@ -0,0 +1,175 @@
+# lib/cache.py
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from lib.models import Session, Product
+
+DEFAULT_MAX_ENTRIES = 10000
+DEFAULT_REFRESH_INTERVAL = 1.0
+DEFAULT_REFRESH_OVERLAP = 5.0
+PENDING_KEY = "catalog_cache_changes"
+
+PRODUCT_COLUMNS = (
+    Product.id, Product.name, Product.sku, Product.stock_quantity,
+    Product.price_per_unit, Product.version, Product.updated_at,
+)
+
+
+class CachedProduct:
+    """Read-only snapshot of a product row, safe to share across sessions and threads."""
+
+    __slots__ = ("id", "name", "sku", "stock_quantity", "price_per_unit", "version", "updated_at")
+
+    def __init__(self, row):
+        for field in self.__slots__:
+            setattr(self, field, getattr(row, field))
+
+    def __repr__(self):
+        return f"<CachedProduct(id={self.id}, sku='{self.sku}', stock={self.stock_quantity}, version={self.version})>"
+
+    def __str__(self):
+        return f"{self.name} (SKU: {self.sku}) - KSH-{self.price_per_unit:.2f} [{self.stock_quantity} in stock]"
+
+    def is_in_stock(self, quantity):
+        return self.stock_quantity >= quantity
+
+
+class ProductCatalogCache:
+    """
+    Read-through LRU cache of products indexed by ID and SKU.
+
+    Entries are dropped when this process commits a change to a product
+    (invalidating at flush time would let another thread reload the old row
+    before the commit), and at most every refresh_interval seconds the cache asks the database which
+    products changed (by updated_at) since the last check, so writes from
+    other processes are picked up too. Stock reservation itself always
+    happens in SQL, so a cached stock level is only ever advisory.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, refresh_interval=DEFAULT_REFRESH_INTERVAL,
+                 refresh_overlap=DEFAULT_REFRESH_OVERLAP):
+        self.max_entries = max_entries
+        self.refresh_interval = refresh_interval
+        self.refresh_overlap = timedelta(seconds=refresh_overlap)
+        self._by_id = OrderedDict()
+        self._id_by_sku = {}
+        self._lock = threading.RLock()
+        self._watermark = None
+        self._next_refresh = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get_by_id(self, session, product_id):
+        """Return the cached snapshot for a product ID, loading it on a miss (None if it doesn't exist)."""
+        self.refresh(session)
+        with self._lock:
+            product = self._by_id.get(product_id)
+            if product is not None:
+                self._by_id.move_to_end(product_id)
+                self.hits += 1
+                return product
+            self.misses += 1
+        return self._load(session, Product.id == product_id)
+
+    def get_by_sku(self, session, sku):
+        """Return the cached snapshot for a SKU, loading it on a miss (None if it doesn't exist)."""
+        self.refresh(session)
+        with self._lock:
+            product_id = self._id_by_sku.get(sku)
+            if product_id is not None:
+                self._by_id.move_to_end(product_id)
+                self.hits += 1
+                return self._by_id[product_id]
+            self.misses += 1
+        return self._load(session, Product.sku == sku)
+
+    def _load(self, session, criterion):
+        row = session.query(*PRODUCT_COLUMNS).filter(criterion).first()
+        if row is None:
+            return None
+        product = CachedProduct(row)
+        with self._lock:
+            self._discard(product.id)
+            self._by_id[product.id] = product
+            self._id_by_sku[product.sku] = product.id
+            while len(self._by_id) > self.max_entries:
+                _, evicted = self._by_id.popitem(last=False)
+                self._id_by_sku.pop(evicted.sku, None)
+                self.evictions += 1
+        return product
+
+    def _discard(self, product_id):
+        product = self._by_id.pop(product_id, None)
+        if product is not None:
+            self._id_by_sku.pop(product.sku, None)
+        return product
+
+    def invalidate(self, product_id=None):
+        """Drop one product, or the whole cache when no ID is given."""
+        with self._lock:
+            if product_id is None:
+                self.invalidations += len(self._by_id)
+                self._by_id.clear()
+                self._id_by_sku.clear()
+            elif self._discard(product_id) is not None:
+                self.invalidations += 1
+
+    def refresh(self, session, force=False):
+        """Invalidate products whose updated_at moved since the last check, rate-limited by refresh_interval."""
+        now = time.monotonic()
+        if not force and now < self._next_refresh:
+            return
+        self._next_refresh = now + self.refresh_interval
+        checked_at = datetime.now()
+        if self._watermark is not None:
+            changed = session.query(Product.id).filter(Product.updated_at >= self._watermark)
+            for row in changed:
+                self.invalidate(row.id)
+        # Overlap the window so rows stamped by transactions that were still
+        # open during this check are seen by the next one.
+        self._watermark = checked_at - self.refresh_overlap
+
+    def invalidate_on_commit(self, session, product_id):
+        """Drop a product once the session's current transaction commits; a rollback leaves the cache alone."""
+        session.info.setdefault(PENDING_KEY, set()).add(product_id)
+
+    def attach(self, session_factory):
+        """Invalidate products when sessions from this factory commit changes to them."""
+        event.listen(session_factory, "after_flush", self._after_flush)
+        event.listen(session_factory, "after_commit", self._after_commit)
+        event.listen(session_factory, "after_rollback", self._after_rollback)
+        return self
+
+    def _after_flush(self, session, flush_context):
+        for obj in list(session.dirty) + list(session.deleted):
+            if isinstance(obj, Product):
+                self.invalidate_on_commit(session, obj.id)
+
+    def _after_commit(self, session):
+        for product_id in session.info.pop(PENDING_KEY, ()):
+            self.invalidate(product_id)
+
+    def _after_rollback(self, session):
+        session.info.pop(PENDING_KEY, None)
+
+    @property
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._by_id),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+catalog_cache = ProductCatalogCache().attach(Session)
@@ -0,0 +1,206 @@
+# lib/checks.py
+
+import re
+import sys
+from contextlib import contextmanager
+from datetime import datetime
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from lib import services
+from lib.cache import ProductCatalogCache
+from lib.low_stock import LowStockWatchlist
+from lib.ledger import open_ledger, stock_at
+from lib.picking import pending_lines_query
+from lib.search import search_products
+from lib.models import Base, Product, Order, OrderItem, Shipment
+from lib.helpers import (
+    get_product_by_sku, get_product_by_id, get_order_by_id,
+    keyset_page, order_summary_query, shipment_listing_query,
+)
+from lib.services.products import count_linked_order_items
+
+SCAN_PATTERN = re.compile(r"^SCAN (\w+)(?: USING (?:COVERING )?INDEX (\w+))?")
+MATERIALIZE_PATTERN = re.compile(r"^MATERIALIZE (\w+)")
+# Scanning a partial index only visits the rows it covers, so it is not a full scan.
+PARTIAL_INDEXES = {"ix_products_low_stock"}
+
+
+@contextmanager
+def count_statements(engine):
+    """Count the SQL statements executed on the engine inside the block."""
+    counter = {"count": 0}
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        counter["count"] += 1
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", on_execute)
+
+
+def build_scratch_session(num_orders, items_per_order=3):
+    """Create an in-memory database holding num_orders orders and return a session on it."""
+    engine = create_engine("sqlite://", echo=False)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+
+    products = [
+        Product(name=f"Product {i}", sku=f"SKU-{i:05d}", stock_quantity=1000, price_per_unit=10.0 + i)
+        for i in range(items_per_order)
+    ]
+    session.add_all(products)
+    session.flush()
+    for n in range(num_orders):
+        order = Order(customer_name=f"Customer {n}", order_date=datetime(2025, 1, 1), status="pending")
+        order.order_items = [
+            OrderItem(product_id=p.id, quantity=1, unit_price=p.price_per_unit)
+            for p in products
+        ]
+        order.item_count = len(products)
+        order.total_amount = sum(p.price_per_unit for p in products)
+        if n % 2:
+            order.status = "fulfilled"
+            order.shipment = Shipment(delivery_status="in transit", shipped_date=datetime(2025, 1, 2))
+        session.add(order)
+    session.commit()
+    return engine, session
+
+
+@contextmanager
+def capture_statements(engine):
+    """Collect every statement that reads rows (with its parameters) executed on the engine inside the block."""
+    captured = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE", "INSERT")):
+            captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    try:
+        yield captured
+    finally:
+        event.remove(engine, "before_cursor_execute", on_execute)
+
+
+def explain_query_plan(engine, statement, parameters):
+    """Return the detail column of EXPLAIN QUERY PLAN for a statement."""
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    return [row[-1] for row in rows]
+
+
+def lookup_order_with_items_and_shipment(session):
+    order = get_order_by_id(session, 2)
+    return list(order.order_items), order.shipment
+
+
+def place_and_cancel_order(session):
+    order = services.place_order(session, "Plan Check", {1: 1, 2: 1})
+    services.delete_order(session, order.id)
+
+
+def refresh_catalog_cache(session):
+    cache = ProductCatalogCache(refresh_interval=0)
+    cache.get_by_sku(session, "SKU-00001")
+    cache.get_by_id(session, 1)
+
+
+def load_low_stock_watchlist(session):
+    LowStockWatchlist().load(session)
+
+
+def stock_at_point_in_time(session):
+    open_ledger(session, [(1, 1000)])
+    services.update_product(session, 1, stock_quantity=900)
+    stock_at(session, 1, datetime.now())
+
+
+def cancel_and_delete_old_orders(session):
+    services.cancel_orders(session, placed_before=datetime(2025, 1, 2))
+    services.delete_orders(session, order_ids=[3, 4])
+
+
+def read_pending_lines(session):
+    # The planner reads through the raw DBAPI cursor, which the statement capture cannot see.
+    session.connection().exec_driver_sql(*pending_lines_query(limit=20)).fetchall()
+
+
+def fulfill_first_pending_order(session):
+    services.fulfill_order(session, 1)
+
+
+# (description, workload, tables allowed to be scanned in full)
+PLAN_WORKLOADS = [
+    ("product lookup by SKU", lambda s: get_product_by_sku(s, "SKU-00001"), ()),
+    ("product lookup by ID", lambda s: get_product_by_id(s, 1), ()),
+    ("order lookup with items and shipment", lookup_order_with_items_and_shipment, ()),
+    ("catalog cache lookups and refresh", refresh_catalog_cache, ()),
+    ("low-stock watchlist load", load_low_stock_watchlist, ()),
+    ("order items linked to a product", lambda s: count_linked_order_items(s, 1), ()),
+    ("orders page by status", lambda s: keyset_page(order_summary_query(s, status="pending"), Order.id, after_id=5), ()),
+    ("orders page by date range", lambda s: keyset_page(
+        order_summary_query(s, date_from=datetime(2024, 12, 1), date_to=datetime(2025, 2, 1)), Order.id, after_id=5), ()),
+    ("shipments page", lambda s: keyset_page(shipment_listing_query(s), Shipment.id, after_id=1), ()),
+    ("shipments page by status", lambda s: keyset_page(
+        shipment_listing_query(s, status="in transit"), Shipment.id, after_id=1), ()),
+    ("shipments by shipped date range", lambda s: shipment_listing_query(
+        s, date_from=datetime(2025, 1, 1), date_to=datetime(2025, 1, 3)).all(), ()),
+    ("order placement and cancellation", place_and_cancel_order, ()),
+    ("order fulfillment", fulfill_first_pending_order, ()),
+    ("wave fulfillment", lambda s: services.fulfill_wave(s, range(5, 25)), ()),
+    ("bulk order cancellation and deletion", cancel_and_delete_old_orders, ()),
+    ("point-in-time stock from the ledger", stock_at_point_in_time, ()),
+    ("pick-wave planner's pending order lines", read_pending_lines, ()),
+    # FTS5 reports its MATCH lookups as a SCAN of the virtual table's own index.
+    ("product search by name or SKU prefix", lambda s: search_products(s, "product 1"), ("products_fts",)),
+]
+
+
+def check_query_plans(workloads=PLAN_WORKLOADS, verbose=False):
+    """Run the app's known queries and assert none of them falls back to a full table SCAN."""
+    engine, session = build_scratch_session(50)
+    failures = []
+    try:
+        for description, workload, allowed_scans in workloads:
+            with capture_statements(engine) as statements:
+                workload(session)
+            for statement, parameters in statements:
+                plan = explain_query_plan(engine, statement, parameters)
+                if verbose:
+                    print(f"{description}: {' | '.join(plan)}")
+                # A subquery SQLite materialized is scanned in full by design; it is not a table.
+                materialized = {m.group(1) for m in map(MATERIALIZE_PATTERN.match, plan) if m}
+                scans = []
+                for detail in plan:
+                    match = SCAN_PATTERN.match(detail)
+                    if (match and match.group(1) not in allowed_scans and match.group(1) not in materialized
+                            and match.group(2) not in PARTIAL_INDEXES):
+                        scans.append(detail)
+                if scans:
+                    failures.append(f"{description}: {'; '.join(scans)}\n    {' '.join(statement.split())}")
+    finally:
+        session.close()
+        engine.dispose()
+
+    assert not failures, "query plans regressed to full scans:\n  - " + "\n  - ".join(failures)
+    print(f"✅ {len(workloads)} query workloads use indexes (no full table SCANs).")
+
+
+def run_all_checks():
+    checks = [check_query_plans]
+    failed = False
+    for check in checks:
+        try:
+            check()
+        except AssertionError as e:
+            print(f"❌ {check.__name__} failed: {e}")
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(run_all_checks())
@@ -1,8 +1,11 @@
 import sys
-from lib.models import Session, Product, Order, OrderItem, Shipment
-from lib.helpers import print_products, print_orders, get_product_by_sku, get_order_by_id, get_product_by_id
 from datetime import datetime
 
+from lib.commands import build_parser, run_command
+
+# Everything that pulls in SQLAlchemy is imported inside the action that needs
+# it, so printing the menu or --help does not pay for it.
+
 
 def get_user_input(prompt_message, type=str, allow_empty=False, options=None):
   
@@ -44,13 +47,29 @@ def confirm_action(prompt_message):
 
 
 def list_products():
+    from lib.models import Session
+    from lib.helpers import print_products
     session = Session()
     try:
         print_products(session)
     finally:
         session.close()
 
+def choose_product_id(session, prompt_message):
+    """Ask for a product ID, searching by name or SKU when words are typed instead. Returns None if left blank."""
+    from lib.search import print_search_results
+    while True:
+        choice = get_user_input(f"{prompt_message} (or type part of a name/SKU to search, blank to go back)", allow_empty=True)
+        if choice is None:
+            return None
+        if choice.isdigit():
+            return int(choice)
+        print_search_results(session, choice)
+
 def add_product():
+    from lib.models import Session
+    from lib import services
+    from lib.helpers import get_product_by_sku
     session = Session()
     try:
         print("\n--- ➕ Adding a New Product ---")
@@ -68,39 +87,64 @@ def add_product():
              print("Operation canceled due to invalid input.")
              return
 
-        if price <= 0:
-            print("❌ Price must be greater than zero. Product not added.")
-            return
-        if qty < 0:
-            print("❌ Quantity cannot be negative. Product not added.")
-            return
+        reorder_point = get_user_input("Reorder point: alert when stock falls to this level (leave blank for 0)", type=int, allow_empty=True) or 0
+        reorder_qty = get_user_input("Reorder quantity to suggest (leave blank for 0)", type=int, allow_empty=True) or 0
 
-        product = Product(
-            name=name,
-            sku=sku,
-            price_per_unit=price,
-            stock_quantity=qty
-        )
-        session.add(product)
-        session.commit()
+        product = services.add_product(session, name, sku, price, qty, reorder_point=reorder_point, reorder_qty=reorder_qty)
         print(f"✅ Success! Product '{product.name}' (ID: {product.id}) added to inventory!\n")
+    except services.ServiceError as e:
+        print(f"❌ {e} Product not added.")
     except Exception as e:
-        session.rollback()
         print(f"❗ An unexpected error occurred while adding the product: {e}. Please try again.")
     finally:
         session.close()
 
+def import_products_from_file():
+    from lib.importer import import_products, print_import_result
+    print("\n--- 📥 Importing Products from a File ---")
+    path = get_user_input("Enter the path to a CSV or JSONL file (columns: name, sku, stock_quantity, price_per_unit)")
+    try:
+        result = import_products(path)
+    except (OSError, ValueError) as e:
+        print(f"❌ Could not import products: {e}")
+        return
+    print_import_result(result)
+
+def sales_reports():
+    from lib.reports import build_sales_report, write_report
+    print("\n--- 📈 Sales Reports ---")
+    date_from = get_date_input("Orders placed on or after")
+    date_to = get_date_input("Orders placed before")
+    report = build_sales_report(date_from, date_to)
+    if report is None:
+        print("📭 No orders in that range yet.\n")
+        return
+    write_report(report, "summary")
+
+def low_stock_report():
+    from lib.models import Session
+    from lib.low_stock import print_low_stock
+    session = Session()
+    try:
+        print_low_stock(session)
+    finally:
+        session.close()
+
 def update_product():
+    from lib.models import Session
+    from lib import services
+    from lib.services.products import validate_price, validate_stock, validate_reorder
     session = Session()
     print("\n--- ✏️ Updating a Product ---")
-    list_products()
-    pid = get_user_input("Enter the ID of the product you want to update", type=int)
+    pid = choose_product_id(session, "Enter the ID of the product you want to update")
 
     if pid is None:
+        session.close()
         return
 
-    product = get_product_by_id(session, pid)
-    if not product:
+    try:
+        product = services.get_product(session, pid)
+    except services.NotFoundError:
         print(f"🔍 Product with ID {pid} not found. Please check the ID and try again.")
         session.close()
         return
@@ -108,51 +152,66 @@ def update_product():
     print(f"\n--- Updating Product: {product.name} (ID: {product.id}) ---")
 
     new_name = get_user_input(f"Current name: {product.name}. Enter new name (or leave blank to keep)", allow_empty=True)
-    if new_name is not None and new_name != "":
-        product.name = new_name
-        print(f"Updated name to: {product.name}")
+    if new_name:
+        print(f"Updated name to: {new_name}")
 
     new_price = get_user_input(f"Current price: KSH-{product.price_per_unit:.2f}. Enter new price (or leave blank to keep)", type=float, allow_empty=True)
-    if new_price is not None and new_price != "":
-        if new_price <= 0:
-            print("❌ Price must be greater than zero. Price update skipped.")
-        else:
-            product.price_per_unit = new_price
-            print(f"Updated price to: KSH-{product.price_per_unit:.2f}")
+    if new_price is not None:
+        try:
+            validate_price(new_price)
+            print(f"Updated price to: KSH-{new_price:.2f}")
+        except services.ValidationError as e:
+            print(f"❌ {e} Price update skipped.")
+            new_price = None
 
     new_stock = get_user_input(f"Current stock quantity: {product.stock_quantity}. Enter new stock quantity (or leave blank to keep)", type=int, allow_empty=True)
-    if new_stock is not None and new_stock != "":
-        if new_stock < 0:
-            print("❌ Stock quantity cannot be negative. Stock update skipped.")
-        else:
-            product.stock_quantity = new_stock
-            print(f"Updated stock quantity to: {product.stock_quantity}")
+    if new_stock is not None:
+        try:
+            validate_stock(new_stock)
+            print(f"Updated stock quantity to: {new_stock}")
+        except services.ValidationError as e:
+            print(f"❌ {e} Stock update skipped.")
+            new_stock = None
+
+    new_reorder_point = get_user_input(f"Current reorder point: {product.reorder_point}. Enter new reorder point (or leave blank to keep)", type=int, allow_empty=True)
+    new_reorder_qty = get_user_input(f"Current reorder quantity: {product.reorder_qty}. Enter new reorder quantity (or leave blank to keep)", type=int, allow_empty=True)
+    try:
+        validate_reorder(new_reorder_point, new_reorder_qty)
+    except services.ValidationError as e:
+        print(f"❌ {e} Reorder settings update skipped.")
+        new_reorder_point = new_reorder_qty = None
 
     try:
-        session.commit()
+        product = services.update_product(
+            session, pid, name=new_name, price_per_unit=new_price, stock_quantity=new_stock,
+            reorder_point=new_reorder_point, reorder_qty=new_reorder_qty,
+        )
         print(f"✅ Product '{product.name}' (ID: {product.id}) updated successfully!\n")
     except Exception as e:
-        session.rollback()
         print(f"❗ An error occurred during product update: {e}. Changes have been rolled back.")
     finally:
         session.close()
 
 def delete_product():
+    from lib.models import Session
+    from lib import services
+    from lib.services.products import count_linked_order_items
     session = Session()
     print("\n--- ❌ Deleting a Product ---")
-    list_products()
-    pid = get_user_input("Enter the ID of the product you want to delete", type=int)
+    pid = choose_product_id(session, "Enter the ID of the product you want to delete")
 
     if pid is None:
+        session.close()
         return
 
-    product = get_product_by_id(session, pid)
-    if not product:
+    try:
+        product = services.get_product(session, pid)
+    except services.NotFoundError:
         print(f"🔍 Product with ID {pid} not found. Nothing to delete.")
         session.close()
         return
 
-    linked_items_count = session.query(OrderItem).filter_by(product_id=pid).count()
+    linked_items_count = count_linked_order_items(session, pid)
     if linked_items_count > 0:
         print(f"🛑 Cannot delete '{product.name}'. It's currently linked to {linked_items_count} existing order item(s).")
         print("To delete this product, you must first remove it from all orders.")
@@ -161,11 +220,12 @@ def delete_product():
 
     if confirm_action(f"Are you absolutely sure you want to PERMANENTLY delete product '{product.name}' (ID: {product.id})? This cannot be undone"):
         try:
-            session.delete(product)
-            session.commit()
+            services.delete_product(session, pid)
             print(f"🗑️ Product '{product.name}' has been successfully deleted.\n")
+        except services.ProductInUseError as e:
+            print(f"🛑 {e}")
+            print("To delete this product, you must first remove it from all orders.")
         except Exception as e:
-            session.rollback()
             print(f"❗ Error deleting product: {e}. Changes rolled back.")
         finally:
             session.close()
@@ -174,6 +234,9 @@ def delete_product():
 
 
 def create_order():
+    from lib.models import Session
+    from lib import services
+    from lib.cache import catalog_cache
     session = Session()
     try:
         print("\n--- 🛒 Creating a New Order ---")
@@ -182,93 +245,72 @@ def create_order():
             print("Order creation canceled.")
             return
 
-        order = Order(customer_name=customer, order_date=datetime.now(), status="pending")
-        session.add(order)
-        session.commit()
-
-        print(f"\n🎉 Order #{order.id} for '{customer}' initiated! Let's add some items...")
+        print(f"\n🎉 New order for '{customer}' started! Let's add some items...")
 
-        items_added = False
+        basket = {}
+        basket_products = {}
+        from lib.search import print_search_results
         while True:
-            list_products()
             print("Current Order Items:")
-            if order.order_items:
-                for item in order.order_items:
-                    print(f"  - {item.quantity} x {item.product.name} (KSH-{item.unit_price:.2f} each)")
+            if basket:
+                for pid, qty in basket.items():
+                    prod = basket_products[pid]
+                    print(f"  - {qty} x {prod.name} (KSH-{prod.price_per_unit:.2f} each)")
             else:
                 print("  (No items added yet.)")
 
-            choice = get_user_input("Enter Product ID to add (or type '0' to finalize order, 'C' to cancel order)", type=str).upper()
+            choice = get_user_input("Enter Product ID to add, or part of a name/SKU to search (type '0' to finalize order, 'C' to cancel order)", type=str)
 
             if choice == "0":
                 break
-            elif choice == "C":
-                confirm_cancel = confirm_action(f"Are you sure you want to cancel order #{order.id}? This will remove all items and the order.")
-                if confirm_cancel:
-                    for item in order.order_items:
-                        product = get_product_by_id(session, item.product_id)
-                        if product:
-                            product.stock_quantity += item.quantity
-                            session.add(product)
-                    session.delete(order)
-                    session.commit()
-                    print(f"❌ Order #{order.id} canceled and stock returned.\n")
+            elif choice.upper() == "C":
+                if confirm_action(f"Are you sure you want to cancel the order for '{customer}'? This will discard all items."):
+                    print("❌ Order canceled. Nothing was reserved.\n")
                     return
                 else:
                     print("👍 Continuing to add items to the current order.")
                     continue
 
-            try:
-                pid = int(choice)
-            except ValueError:
-                print("❌ Invalid input. Please enter a valid Product ID, '0' to finish, or 'C' to cancel.")
+            if not choice.isdigit():
+                print_search_results(session, choice)
                 continue
 
-            prod = get_product_by_id(session, pid)
+            pid = int(choice)
+            prod = catalog_cache.get_by_id(session, pid)
             if not prod:
-                print(f"🔍 Product with ID {pid} not found. Please choose from the list.")
+                print(f"🔍 Product with ID {pid} not found. Search by name or SKU to find it.")
                 continue
 
-            qty = get_user_input(f"How many units of '{prod.name}' (available: {prod.stock_quantity})?", type=int)
+            available = prod.stock_quantity - basket.get(pid, 0)
+            qty = get_user_input(f"How many units of '{prod.name}' (available: {available})?", type=int)
             if qty is None:
                 continue
 
             if qty <= 0:
                 print("❌ Quantity must be greater than zero. Please try again.")
                 continue
-            if prod.stock_quantity < qty:
-                print(f"⚠️ Insufficient stock! Only {prod.stock_quantity} units of '{prod.name}' are available. Please enter a lower quantity.")
+            if available < qty:
+                print(f"⚠️ Insufficient stock! Only {available} units of '{prod.name}' are available. Please enter a lower quantity.")
                 continue
 
-            existing_item = next((item for item in order.order_items if item.product_id == prod.id), None)
-            if existing_item:
-                existing_item.quantity += qty
-                session.add(existing_item)
-                print(f"🔄 Updated quantity for {prod.name} in order #{order.id} to {existing_item.quantity}.")
+            if pid in basket:
+                basket[pid] += qty
+                print(f"🔄 Updated quantity for {prod.name} in the order to {basket[pid]}.")
             else:
-                item = OrderItem(
-                    order_id=order.id,
-                    product_id=prod.id,
-                    quantity=qty,
-                    unit_price=prod.price_per_unit
-                )
-                session.add(item)
-                order.order_items.append(item)
-                print(f"✅ Added {qty} x '{prod.name}' to order #{order.id}.")
-
-            prod.stock_quantity -= qty
-            session.add(prod)
-
-            session.commit()
-
-            items_added = True
-
-        if not items_added:
-            session.delete(order)
-            session.commit()
+                basket[pid] = qty
+                basket_products[pid] = prod
+                print(f"✅ Added {qty} x '{prod.name}' to the order.")
+
+        if not basket:
             print("⚠️ No items added to the order. Order canceled.\n")
-        else:
-            print(f"\n✨ Order #{order.id} for '{customer}' successfully created with {len(order.order_items)} unique item(s)! Ready for fulfillment.\n")
+            return
+
+        try:
+            order = services.place_order(session, customer, basket)
+        except (services.InsufficientStockError, services.NotFoundError) as e:
+            print(f"⚠️ {e} Stock changed while the order was being built, so nothing was placed. Please try again.\n")
+            return
+        print(f"\n✨ Order #{order.id} for '{customer}' successfully created with {len(basket)} unique item(s)! Ready for fulfillment.\n")
     except Exception as e:
         session.rollback()
         print(f"❗ An unexpected error occurred while creating the order: {e}. Order creation rolled back.")
@@ -276,6 +318,8 @@ def create_order():
         session.close()
 
 def list_orders():
+    from lib.models import Session
+    from lib.helpers import print_orders
     session = Session()
     try:
         print_orders(session)
@@ -283,6 +327,9 @@ def list_orders():
         session.close()
 
 def update_order():
+    from lib.models import Session
+    from lib import services
+    from lib.models.models import ORDER_STATUSES
     session = Session()
     print("\n--- ✏️ Updating an Order ---")
     list_orders()
@@ -291,36 +338,41 @@ def update_order():
     if oid is None:
         return
 
-    order = get_order_by_id(session, oid)
-    if not order:
+    try:
+        order = services.get_order(session, oid)
+    except services.NotFoundError:
         print(f"🔍 Order with ID {oid} not found. Please check the ID and try again.")
         session.close()
         return
+    except services.InvalidStateError as e:
+        print(f"🗄️ {e}")
+        session.close()
+        return
 
     print(f"\n--- Updating Order: #{order.id} for '{order.customer_name}' ---")
 
     new_customer = get_user_input(f"Current customer: {order.customer_name}. Enter new customer name (or leave blank to keep)", allow_empty=True)
-    if new_customer is not None and new_customer != "":
-        order.customer_name = new_customer
+    if new_customer:
         print(f"🚨 Updated customer name to: {new_customer}")
 
-    valid_statuses = ["pending", "fulfilled", "cancelled"]
-    print(f"🚨 Current status: {order.status}. Valid statuses: {', '.join(valid_statuses)}")
-    new_status = get_user_input("Enter new status (e.g., 'pending', 'fulfilled', 'cancelled') or leave blank to keep", allow_empty=True, options=valid_statuses)
-    if new_status is not None and new_status != "":
-        order.status = new_status
-        print(f"🚨 Updated order status to: {order.status}")
+    print(f"🚨 Current status: {order.status}. Valid statuses: {', '.join(ORDER_STATUSES)}")
+    if order.status == "pending":
+        print("ℹ️ Cancelling a pending order returns its items to stock.")
+    new_status = get_user_input("Enter new status (e.g., 'pending', 'fulfilled', 'cancelled') or leave blank to keep", allow_empty=True, options=ORDER_STATUSES)
+    if new_status:
+        print(f"🚨 Updated order status to: {new_status.lower()}")
 
     try:
-        session.commit()
-        print(f"✅ Order #{order.id} updated successfully!\n")
+        services.update_order(session, oid, customer_name=new_customer, status=new_status)
+        print(f"✅ Order #{oid} updated successfully!\n")
     except Exception as e:
-        session.rollback()
         print(f"❗ An error occurred during order update: {e}. Changes have been rolled back.")
     finally:
         session.close()
 
 def delete_order():
+    from lib.models import Session
+    from lib import services
     session = Session()
     print("\n--- ❌ Deleting an Order ---")
     list_orders()
@@ -329,25 +381,25 @@ def delete_order():
     if oid is None:
         return
 
-    order = get_order_by_id(session, oid)
-    if not order:
+    try:
+        order = services.get_order(session, oid)
+    except services.NotFoundError:
         print(f"🔍 Order with ID {oid} not found. Nothing to delete.")
         session.close()
         return
+    except services.InvalidStateError as e:
+        print(f"🗄️ {e}")
+        session.close()
+        return
 
-    if confirm_action(f"‼️ Are you absolutely sure you want to PERMANENTLY delete order #{order.id} (for '{order.customer_name}') and return its items to stock? This cannot be undone."):
+    customer = order.customer_name
+    # A cancelled order's stock went back on the shelf when it was cancelled.
+    returned = "" if order.status == "cancelled" else " and return its items to stock"
+    if confirm_action(f"‼️ Are you absolutely sure you want to PERMANENTLY delete order #{order.id} (for '{customer}'){returned}? This cannot be undone."):
         try:
-            for item in order.order_items:
-                product = get_product_by_id(session, item.product_id)
-                if product:
-                    product.stock_quantity += item.quantity
-                    session.add(product)
-
-            session.delete(order)
-            session.commit()
-            print(f"🗑️ Order #{order.id} for '{order.customer_name}' has been successfully deleted and stock returned.\n")
+            services.delete_order(session, oid)
+            print(f"🗑️ Order #{oid} for '{customer}' has been successfully deleted{' and stock returned' if returned else ''}.\n")
         except Exception as e:
-            session.rollback()
             print(f"❗ Error deleting order: {e}. Changes rolled back.")
         finally:
             session.close()
@@ -355,55 +407,46 @@ def delete_order():
         session.close()
 
 def fulfill_order():
+    from lib.models import Session
+    from lib import services
     session = Session()
     try:
         print("\n--- ✅ Fulfilling an Order ---")
         list_orders()
-        oid = get_user_input("Enter the Order ID to fulfill", type=int)
-
-        if oid is None:
+        while True:
+            raw = get_user_input("Enter the Order ID to fulfill, or several as '1, 4, 5' or a range like '100-150' to fulfill them as one wave")
+            try:
+                ids, id_range = parse_id_selection(raw)
+                break
+            except ValueError:
+                print("❌ Invalid selection. Enter IDs separated by commas, or a range like 100-150.")
+        if id_range or len(ids) > 1:
+            fulfill_wave(session, ids or list(range(id_range[0], id_range[1] + 1)))
             return
 
-        order = get_order_by_id(session, oid)
-        if not order:
-            print(f"🔍 Order with ID {oid} not found. Please check the ID.")
-            return
+        oid = ids[0]
 
-        if order.status == "fulfilled":
-            print(f"🚀 Order #{order.id} is already marked as 'fulfilled'. No action needed.")
+        try:
+            order = services.check_fulfillable(session, oid)
+        except services.NotFoundError:
+            print(f"🔍 Order with ID {oid} not found. Please check the ID.")
             return
-        elif order.status == "cancelled":
-            print(f"🚫 Order #{order.id} is 'cancelled' and cannot be fulfilled.")
+        except services.InvalidStateError as e:
+            print(f"🚫 {e}")
             return
-
-        all_stock_available = True
-        for item in order.order_items:
-            product = get_product_by_id(session, item.product_id)
-            if not product or product.stock_quantity < item.quantity:
-                print(f"⚠️ Insufficient stock for '{item.product.name}' (needed: {item.quantity}, available: {product.stock_quantity if product else 'N/A'}). Cannot fulfill order.")
-                all_stock_available = False
-                break
-
-        if not all_stock_available:
+        except services.InsufficientStockError as e:
+            print(f"⚠️ {e} Cannot fulfill order.")
             print("🛑 Order cannot be fulfilled due to insufficient stock for some items.")
             return
 
         if confirm_action(f"Confirm fulfillment for Order #{order.id} (Customer: '{order.customer_name}')?"):
-            order.status = "fulfilled"
-            for item in order.order_items:
-                product = get_product_by_id(session, item.product_id)
-                product.stock_quantity -= item.quantity
-                session.add(product)
-
-            shipment = Shipment(order_id=order.id, delivery_status="not shipped")
-            session.add(shipment)
-            session.commit()
-            print(f"🎉 Order #{order.id} successfully fulfilled! A new shipment (ID: {shipment.id}) has been created.\n")
+            shipment = services.fulfill_order(session, oid)
+            print(f"🎉 Order #{oid} successfully fulfilled! A new shipment (ID: {shipment.id}) has been created.\n")
         else:
             print("🚨 Order fulfillment canceled.")
 
-    except ValueError:
-        print("❌ Invalid input. Please enter a valid Order ID.")
+    except services.ServiceError as e:
+        print(f"❗ Could not fulfill the order: {e}")
     except Exception as e:
         session.rollback()
         print(f"❗ An unexpected error occurred while fulfilling the order: {e}. Please try again.")
@@ -411,70 +454,126 @@ def fulfill_order():
         session.close()
 
 
+def fulfill_wave(session, order_ids):
+    from lib import services
+    if not confirm_action(f"Fulfill {len(order_ids)} order(s) as one wave? Orders that cannot be met stay pending"):
+        return
+    try:
+        result = services.fulfill_wave(session, order_ids)
+    except services.ServiceError as e:
+        print(f"❗ Could not fulfill the wave: {e}")
+        return
+    print(f"🎉 {len(result.shipments)} order(s) fulfilled and shipments created in one go!")
+    for order_id, error in sorted(result.short.items()):
+        print(f"  ⚠️ Order #{order_id} left pending: {error}")
+    for order_id, reason in sorted(result.skipped.items()):
+        print(f"  ⏭️ {reason}")
+    print()
+
 def track_shipments():
+    from lib.models import Session
+    from lib.models.models import DELIVERY_STATUSES
+    from lib.helpers import print_shipments
+    status = get_user_input(f"Filter by delivery status ({', '.join(DELIVERY_STATUSES)}) or leave blank for all", allow_empty=True, options=DELIVERY_STATUSES)
+    date_from = get_date_input("Shipped on or after")
+    date_to = get_date_input("Shipped before")
     session = Session()
     try:
-        shipments = session.query(Shipment).order_by(Shipment.id).all()
-        print("\n--- 🚚 Shipment Tracking ---")
-        if not shipments:
-            print(" (No shipments recorded yet. Fulfill an order to see one here!)\n")
-        else:
-            print("ID | Order ID | Delivery Status | Shipped Date")
-            print("---|----------|-----------------|-------------------")
-            for s in shipments:
-                shipped_str = s.shipped_date.strftime("%Y-%m-%d %H:%M:%S") if s.shipped_date else "Pending Dispatch"
-                print(f"{str(s.id).ljust(2)} | {str(s.order_id).ljust(8)} | {s.delivery_status.ljust(15)} | {shipped_str}")
-            print("----------------------------------------------------\n")
+        print_shipments(session, status=status and status.lower(), date_from=date_from, date_to=date_to)
     finally:
         session.close()
 
+def parse_id_selection(raw):
+    """
+    Parse '7', '1, 4, 5' or an inclusive range '3-9' into (ids, id_range).
+    Raises ValueError for anything else, including a selection without IDs
+    and a range that ends before it starts.
+    """
+    if "-" in raw:
+        first, last = (int(part) for part in raw.split("-", 1))
+        if first > last:
+            raise ValueError(f"Range {first}-{last} ends before it starts.")
+        return None, (first, last)
+    ids = [int(part) for part in raw.replace(",", " ").split()]
+    if not ids:
+        raise ValueError("No IDs selected.")
+    return ids, None
+
 def update_shipment():
-    session = Session()
+    from lib.models import Session
+    from lib import services
+    from lib.models.models import DELIVERY_STATUSES
     print("\n--- 🔧 Updating Shipment Status ---")
     track_shipments()
-    sid = get_user_input("Enter the Shipment ID to update", type=int)
-
-    if sid is None:
+    while True:
+        raw = get_user_input("Enter the Shipment ID to update, or several as '1, 4, 5' or a range like '100-600'")
+        try:
+            ids, id_range = parse_id_selection(raw)
+            break
+        except ValueError:
+            print("❌ Invalid selection. Enter IDs separated by commas, or a range like 100-600.")
+    if id_range or len(ids) > 1:
+        update_shipments_in_bulk(ids, id_range)
         return
 
-    shipment = session.get(Shipment, sid)
-    if not shipment:
+    sid = ids[0]
+    session = Session()
+
+    try:
+        shipment = services.get_shipment(session, sid)
+    except services.NotFoundError:
         print(f"🔍 Shipment with ID {sid} not found. Please check the ID.")
         session.close()
         return
 
-    valid_statuses = ["not shipped", "in transit", "delivered", "returned", "on hold"]
     print(f"Current status for Shipment #{shipment.id}: {shipment.delivery_status}")
-    print(f"Available statuses: {', '.join(valid_statuses)}")
+    print(f"Available statuses: {', '.join(DELIVERY_STATUSES)}")
 
-    new_status = get_user_input("Enter new delivery status (e.g., 'in transit', 'delivered')", options=valid_statuses).lower()
-    if new_status is None:
-        print("🚨 Shipment status update canceled.")
-        return
+    new_status = get_user_input("Enter new delivery status (e.g., 'in transit', 'delivered')", options=DELIVERY_STATUSES).lower()
 
     if new_status == shipment.delivery_status:
         print("🚨 Status is already the same. No changes made.")
         session.close()
         return
 
-    shipment.delivery_status = new_status
-    if new_status == "delivered" and not shipment.shipped_date:
-        shipment.shipped_date = datetime.now()
-        print("📦 Automatically setting 'Shipped Date' to now as status is 'delivered'.")
-    elif new_status != "delivered" and shipment.shipped_date and confirm_action("Do you want to clear the 'Shipped Date' (e.g., if re-routing)?"):
-        shipment.shipped_date = None
+    clear_shipped_date = False
+    if new_status != "delivered" and shipment.shipped_date and confirm_action("Do you want to clear the 'Shipped Date' (e.g., if re-routing)?"):
+        clear_shipped_date = True
         print("🚨 Shipped Date cleared.")
+    elif new_status != "not shipped" and not shipment.shipped_date:
+        print(f"📦 Automatically setting 'Shipped Date' to now as status is '{new_status}'.")
 
     try:
-        session.commit()
-        print(f"✅ Shipment #{shipment.id} status successfully updated to '{new_status}'!\n")
+        services.update_shipment_status(session, sid, new_status, clear_shipped_date=clear_shipped_date)
+        print(f"✅ Shipment #{sid} status successfully updated to '{new_status}'!\n")
     except Exception as e:
-        session.rollback()
         print(f"❗ Error updating shipment: {e}. Changes rolled back.")
     finally:
         session.close()
 
+def update_shipments_in_bulk(ids, id_range):
+    from lib.models import Session
+    from lib import services
+    from lib.models.models import DELIVERY_STATUSES
+    selection = f"shipments {id_range[0]}-{id_range[1]}" if id_range else f"{len(ids)} shipments"
+    new_status = get_user_input(f"Enter new delivery status for {selection} ({', '.join(DELIVERY_STATUSES)})", options=DELIVERY_STATUSES).lower()
+    clear_shipped_date = new_status != "delivered" and confirm_action("Do you want to clear their 'Shipped Date' (e.g., if re-routing)?")
+    session = Session()
+    try:
+        updated = services.bulk_update_shipment_status(session, new_status, shipment_ids=ids, id_range=id_range,
+                                                       clear_shipped_date=clear_shipped_date)
+        print(f"✅ {len(updated)} shipment(s) updated to '{new_status}' in one go!\n")
+        missing = sorted(set(ids) - set(updated)) if ids else []
+        if missing:
+            print(f"🔍 Not found: {', '.join(map(str, missing))}")
+    except services.ServiceError as e:
+        print(f"❗ Error updating shipments: {e}")
+    finally:
+        session.close()
+
 def delete_shipment():
+    from lib.models import Session
+    from lib import services
     session = Session()
     print("\n--- ❌ Deleting a Shipment ---")
     track_shipments()
@@ -483,19 +582,18 @@ def delete_shipment():
     if sid is None:
         return
 
-    shipment = session.query(Shipment).get(sid)
-    if not shipment:
+    try:
+        shipment = services.get_shipment(session, sid)
+    except services.NotFoundError:
         print(f"🔍 Shipment with ID {sid} not found. Nothing to delete.")
         session.close()
         return
 
     if confirm_action(f"Are you absolutely sure you want to PERMANENTLY delete shipment #{shipment.id}? This cannot be undone."):
         try:
-            session.delete(shipment)
-            session.commit()
-            print(f"🗑️ Shipment #{shipment.id} has been successfully deleted.\n")
+            services.delete_shipment(session, sid)
+            print(f"🗑️ Shipment #{sid} has been successfully deleted.\n")
         except Exception as e:
-            session.rollback()
             print(f"❗ Error deleting shipment: {e}. Changes rolled back.")
         finally:
             session.close()
@@ -503,6 +601,109 @@ def delete_shipment():
         session.close()
 
 
+def get_date_input(prompt_message):
+    """Ask for an optional YYYY-MM-DD date, returning None when left blank."""
+    while True:
+        raw = get_user_input(f"{prompt_message} (YYYY-MM-DD, or leave blank for no limit)", allow_empty=True)
+        if raw is None:
+            return None
+        try:
+            return datetime.strptime(raw, "%Y-%m-%d")
+        except ValueError:
+            print("❌ Invalid date. Please use the YYYY-MM-DD format.")
+
+def browse_pages(title, query, id_column, print_rows, empty_message):
+    """Page through a listing query with next/previous navigation."""
+    from lib.helpers import PAGE_SIZE, keyset_page
+    page_size = get_user_input(f"Rows per page (leave blank for {PAGE_SIZE})", type=int, allow_empty=True) or PAGE_SIZE
+    if page_size <= 0:
+        print(f"❌ Page size must be greater than zero. Using {PAGE_SIZE}.")
+        page_size = PAGE_SIZE
+
+    rows = keyset_page(query, id_column, page_size)
+    if not rows:
+        print(f"\n--- {title} ---")
+        print(f" {empty_message}\n")
+        return
+
+    page_number = 1
+    while True:
+        print(f"\n--- {title} (page {page_number}) ---")
+        print_rows(rows)
+        choice = input("⏩ [N]ext page, [P]revious page, [Q]uit browsing: ").strip().lower()
+        if choice == "n":
+            next_rows = keyset_page(query, id_column, page_size, after_id=rows[-1].id)
+            if not next_rows:
+                print("🏁 You're already on the last page.")
+                continue
+            rows = next_rows
+            page_number += 1
+        elif choice == "p":
+            prev_rows = keyset_page(query, id_column, page_size, before_id=rows[0].id)
+            if not prev_rows:
+                print("🏁 You're already on the first page.")
+                continue
+            rows = prev_rows
+            page_number -= 1
+        elif choice == "q":
+            return
+        else:
+            print("❌ Invalid choice. Please enter 'N', 'P' or 'Q'.")
+
+def browse_products():
+    from lib.models import Session, Product
+    from lib.helpers import product_listing_query, print_product_rows
+    session = Session()
+    try:
+        browse_pages(
+            "📦 Inventory Stock",
+            product_listing_query(session),
+            Product.id,
+            print_product_rows,
+            "(Empty shelves! No products found. Time to restock!)",
+        )
+    finally:
+        session.close()
+
+def browse_orders():
+    from lib.models import Session, Order
+    from lib.models.models import ORDER_STATUSES
+    from lib.helpers import order_summary_query, print_order_rows
+    session = Session()
+    try:
+        status = get_user_input(f"Filter by status ({', '.join(ORDER_STATUSES)}) or leave blank for all", allow_empty=True, options=ORDER_STATUSES)
+        date_from = get_date_input("Orders placed on or after")
+        date_to = get_date_input("Orders placed before")
+        browse_pages(
+            "📦 Orders",
+            order_summary_query(session, status=status and status.lower(), date_from=date_from, date_to=date_to),
+            Order.id,
+            print_order_rows,
+            "(No orders match these filters.)",
+        )
+    finally:
+        session.close()
+
+def browse_shipments():
+    from lib.models import Session, Shipment
+    from lib.models.models import DELIVERY_STATUSES
+    from lib.helpers import shipment_listing_query, print_shipment_rows
+    session = Session()
+    try:
+        status = get_user_input(f"Filter by delivery status ({', '.join(DELIVERY_STATUSES)}) or leave blank for all", allow_empty=True, options=DELIVERY_STATUSES)
+        date_from = get_date_input("Shipped on or after")
+        date_to = get_date_input("Shipped before")
+        browse_pages(
+            "🚚 Shipments",
+            shipment_listing_query(session, status=status and status.lower(), date_from=date_from, date_to=date_to),
+            Shipment.id,
+            print_shipment_rows,
+            "(No shipments match these filters.)",
+        )
+    finally:
+        session.close()
+
+
 def go_back_or_exit():
     while True:
         print("\n---")
@@ -541,17 +742,37 @@ What's on your agenda today? Choose an option:
 ---
 [5] 🛒 Create a New Order (Start a customer order)
 [6] 📦 List All Orders (View all placed orders)
-[7] ✅ Fulfill an Order (Prepare orders for dispatch)
+[7] ✅ Fulfill Orders (One order, or a list or range as one wave)
 [8] ✏️ Update an Order (Modify customer name or status)
 [9] ❌ Delete an Order (Cancel and remove an order)
 ---
-[10] 🚚 Track Shipments (Monitor delivery progress)
-[11] 🔧 Update Shipment Status (Change delivery status)
+[10] 🚚 Track Shipments (Filter by delivery status and date)
+[11] 🔧 Update Shipment Status (One shipment, a list or a whole range)
 [12] ❌ Delete a Shipment (Remove a shipment record)
 ---
+[13] 📖 Browse Products (Page through inventory)
+[14] 📖 Browse Orders (Page through orders by status or date)
+[15] 📖 Browse Shipments (Page through shipments by status or date)
+---
+[16] 📥 Import Products (Bulk load a CSV or JSONL catalogue)
+[17] 📈 Sales Reports (Revenue, top SKUs and stock cover)
+[18] 🚨 Low-Stock Report (Products at or below their reorder point)
+---
 """)
 
-def main():
+def enable_low_stock_alerts():
+    """Print an alert whenever an action drops a product to its reorder point (registered on first use)."""
+    from lib.low_stock import low_stock_watchlist, print_low_stock_alert
+    low_stock_watchlist.add_alert_hook(print_low_stock_alert)
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command:
+        sys.exit(run_command(args))
+
+    from lib.profiling import profiler_from_env, print_profile
+    profiler = profiler_from_env(args.profile, args.cprofile, args.n_plus_one)
     actions = {
         "0": exit_program,
         "1": list_products,
@@ -566,6 +787,12 @@ def main():
         "10": track_shipments, 
         "11": update_shipment, 
         "12": delete_shipment, 
+        "13": browse_products,
+        "14": browse_orders,
+        "15": browse_shipments,
+        "16": import_products_from_file,
+        "17": sales_reports,
+        "18": low_stock_report,
     }
 
     while True:
@@ -573,7 +800,13 @@ def main():
         choice = input("🚀 Your command, warehouse manager: ").strip()
         action = actions.get(choice)
         if action:
-            action()
+            enable_low_stock_alerts()
+            if profiler and action is not exit_program:
+                with profiler.action(action.__name__.replace("_", " ")) as profile:
+                    action()
+                print_profile(profile, profiler.n_plus_one_threshold)
+            else:
+                action()
             go_back_or_exit()
         else:
             print("🚫 Invalid choice! Please enter a number from the menu. Let's get this right! 🧐")
@@ -0,0 +1,350 @@
+# lib/commands.py
+
+import argparse
+from datetime import datetime
+
+# Handlers import what they need when they run, so parsing arguments and
+# printing --help never load SQLAlchemy or open the database.
+
+LIST_LIMIT = 20
+
+
+def positive_int(value):
+    number = int(value)
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"expected a positive integer, got {value}")
+    return number
+
+
+def basket_item(value):
+    """Parse 'PRODUCT_ID:QUANTITY' (quantity defaults to 1)."""
+    product_id, _, quantity = value.partition(":")
+    try:
+        return int(product_id), int(quantity or 1)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid item '{value}', expected PRODUCT_ID:QUANTITY")
+
+
+def id_range(value):
+    """Parse an inclusive 'FIRST-LAST' ID range."""
+    first, _, last = value.partition("-")
+    try:
+        first, last = int(first), int(last)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid range '{value}', expected FIRST-LAST")
+    if first > last:
+        raise argparse.ArgumentTypeError(f"invalid range '{value}', FIRST must not exceed LAST")
+    return first, last
+
+
+def iso_date(value):
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date '{value}', expected YYYY-MM-DD")
+
+
+def add_listing_arguments(parser):
+    parser.add_argument("--limit", type=positive_int, default=None,
+                        help=f"show at most this many rows (default: all; e.g. {LIST_LIMIT})")
+    parser.add_argument("--after", type=int, default=None, metavar="ID", help="start after this ID")
+
+
+def print_listing(query, id_column, print_rows, limit, after, empty_message):
+    from lib.helpers import keyset_page, STREAM_BATCH_SIZE
+    if limit is not None:
+        rows = keyset_page(query, id_column, limit, after_id=after)
+    else:
+        rows = query.filter(id_column > after) if after is not None else query
+        rows = rows.yield_per(STREAM_BATCH_SIZE)
+    if not print_rows(rows):
+        print(f" {empty_message}\n")
+
+
+def products_list(session, args):
+    from lib.models import Product
+    from lib.helpers import product_listing_query, print_product_rows
+    print("\n--- 📦 Current Inventory Stock ---")
+    print_listing(product_listing_query(session), Product.id, print_product_rows, args.limit, args.after,
+                  "(Empty shelves! No products found. Time to restock!)")
+
+
+def products_show(session, args):
+    from lib import services
+    from lib.helpers import print_product_rows
+    print_product_rows([services.get_product(session, args.id)])
+
+
+def products_search(session, args):
+    """Search products by name or SKU prefix; exits 1 when nothing matches."""
+    from lib.search import print_search_results, DEFAULT_SEARCH_LIMIT
+    return 0 if print_search_results(session, " ".join(args.terms), args.limit or DEFAULT_SEARCH_LIMIT) else 1
+
+
+def products_add(session, args):
+    from lib import services
+    product = services.add_product(session, args.name, args.sku, args.price, args.stock,
+                                   reorder_point=args.reorder_point, reorder_qty=args.reorder_qty)
+    print(f"✅ Product '{product.name}' (ID: {product.id}) added to inventory.")
+
+
+def products_update(session, args):
+    from lib import services
+    product = services.update_product(session, args.id, name=args.name, price_per_unit=args.price,
+                                      stock_quantity=args.stock, reorder_point=args.reorder_point,
+                                      reorder_qty=args.reorder_qty)
+    print(f"✅ Product '{product.name}' (ID: {product.id}) updated.")
+
+
+def products_low_stock(session, args):
+    """List products at or below their reorder point; exits 1 when there are any, for cron alerting."""
+    from lib.low_stock import print_low_stock
+    return 1 if print_low_stock(session, args.limit) else 0
+
+
+def products_delete(session, args):
+    from lib import services
+    product = services.delete_product(session, args.id)
+    print(f"🗑️ Product '{product.name}' (ID: {args.id}) deleted.")
+
+
+def orders_list(session, args):
+    from lib.models import Order
+    from lib.helpers import order_summary_query, print_order_rows
+    print("\n--- 📦 Current Orders ---")
+    print_listing(order_summary_query(session, status=args.status), Order.id, print_order_rows, args.limit,
+                  args.after, "(No orders match these filters.)")
+
+
+def orders_show(session, args):
+    from lib import services
+    order = services.get_order(session, args.id, include_archived=True)
+    status = f"{order.status}, archived" if order.archived else order.status
+    print(f"Order #{order.id} for '{order.customer_name}' ({status}), placed {order.order_date:%Y-%m-%d %H:%M}")
+    for item in order.order_items:
+        print(f"  - {item.quantity} x product #{item.product_id} at KSH-{item.unit_price:.2f}")
+    print(f"  Total: KSH-{order.total_amount:.2f} over {order.item_count} item(s)")
+
+
+def orders_create(session, args):
+    from lib import services
+    order = services.place_order(session, args.customer, args.items)
+    print(f"✨ Order #{order.id} for '{order.customer_name}' created with {order.item_count} item(s).")
+
+
+def orders_fulfill(session, args):
+    """
+    Fulfill the orders as one wave in a single transaction; orders that
+    cannot be met stay pending and are reported, and the rest still ship.
+    With --all-or-nothing any shortfall fulfills none of them.
+    """
+    from lib import services
+    result = services.fulfill_wave(session, args.ids, partial=not args.all_or_nothing)
+    for order_id, shipment_id in sorted(result.shipments.items()):
+        print(f"🎉 Order #{order_id} fulfilled; shipment #{shipment_id} created.")
+    for order_id, error in sorted({**result.short, **result.skipped}.items()):
+        print(f"❌ Order #{order_id}: {error}")
+    return 1 if result.short or result.skipped else 0
+
+
+def orders_update(session, args):
+    from lib import services
+    order = services.update_order(session, args.id, customer_name=args.customer, status=args.status)
+    print(f"✅ Order #{order.id} updated.")
+
+
+def orders_cancel(session, args):
+    """Cancel pending orders and restock them in one transaction; exits 1 when listed IDs were not cancelled."""
+    from lib import services
+    cancelled = services.cancel_orders(session, order_ids=args.ids, placed_before=args.placed_before)
+    print(f"❌ {len(cancelled)} order(s) cancelled and their stock returned.")
+    return report_missing(args.ids, cancelled, "Not pending or not found")
+
+
+def orders_delete(session, args):
+    from lib import services
+    if len(args.ids) == 1:
+        order = services.delete_order(session, args.ids[0])
+        returned = "" if order.status == "cancelled" else " and its stock returned"
+        print(f"🗑️ Order #{args.ids[0]} deleted{returned}.")
+        return 0
+    deleted = services.delete_orders(session, order_ids=args.ids)
+    print(f"🗑️ {len(deleted)} order(s) deleted and the stock of those not cancelled returned.")
+    return report_missing(args.ids, deleted, "Not found")
+
+
+def report_missing(requested, done, label):
+    """Print the requested IDs that were not acted on and return the exit code for it."""
+    if not requested:
+        return 0
+    missing = sorted(set(requested) - set(done))
+    if missing:
+        print(f"🔍 {label}: {', '.join(map(str, missing))}")
+        return 1
+    return 0
+
+
+def shipments_list(session, args):
+    from lib.models import Shipment
+    from lib.helpers import shipment_listing_query, print_shipment_rows
+    print("\n--- 🚚 Shipment Tracking ---")
+    query = shipment_listing_query(session, status=args.status, date_from=args.shipped_from, date_to=args.shipped_before)
+    print_listing(query, Shipment.id, print_shipment_rows, args.limit, args.after, "(No shipments match these filters.)")
+
+
+def shipments_update(session, args):
+    from lib import services
+    shipment = services.update_shipment_status(session, args.id, args.status,
+                                               clear_shipped_date=args.clear_shipped_date)
+    print(f"✅ Shipment #{shipment.id} is now '{shipment.delivery_status}'.")
+
+
+def shipments_mark(session, args):
+    """Move a batch of shipments to a status in one UPDATE; exits 1 when listed IDs were not found."""
+    from lib import services
+    updated = services.bulk_update_shipment_status(
+        session, args.status, shipment_ids=args.ids, id_range=args.range, order_ids=args.orders,
+        clear_shipped_date=args.clear_shipped_date,
+    )
+    print(f"✅ {len(updated)} shipment(s) are now '{args.status.lower()}'.")
+    return report_missing(args.ids, updated, "Not found")
+
+
+def shipments_delete(session, args):
+    from lib import services
+    services.delete_shipment(session, args.id)
+    print(f"🗑️ Shipment #{args.id} deleted.")
+
+
+def build_parser():
+    """The CLI's parser: global flags plus scriptable subcommands. With no subcommand the interactive menu runs."""
+    parser = argparse.ArgumentParser(
+        prog="python -m lib.cli",
+        description="Warehouse manager. Run without a command for the interactive menu.",
+    )
+    parser.add_argument("--profile", action="store_true",
+                        help="print SQL statements, DB time and rows after each action (or set WAREHOUSE_PROFILE=1)")
+    parser.add_argument("--cprofile", action="store_true", help="also print the top cProfile entries per action")
+    parser.add_argument("--n-plus-one", type=int, default=None, metavar="K",
+                        help="flag statements repeated more than K times in one action (default 10)")
+    parser.set_defaults(command=None)
+    groups = parser.add_subparsers(title="commands", metavar="{products,orders,shipments}")
+
+    products = groups.add_parser("products", help="list, search, show, add, update or delete products, or list low stock")
+    actions = products.add_subparsers(title="actions", metavar="ACTION", required=True)
+    sub = actions.add_parser("list", help="list products")
+    add_listing_arguments(sub)
+    sub.set_defaults(command=products_list)
+    sub = actions.add_parser("search", help="find products by name or SKU prefix, best match first")
+    sub.add_argument("terms", nargs="+", help="words to match, e.g. 'desk lamp' or 'LS-0004'")
+    sub.add_argument("--limit", type=positive_int, default=None, help="show at most this many products (default 10)")
+    sub.set_defaults(command=products_search)
+    sub = actions.add_parser("show", help="show one product")
+    sub.add_argument("id", type=int)
+    sub.set_defaults(command=products_show)
+    sub = actions.add_parser("add", help="add a product")
+    sub.add_argument("name")
+    sub.add_argument("sku")
+    sub.add_argument("--price", type=float, required=True)
+    sub.add_argument("--stock", type=int, required=True)
+    sub.add_argument("--reorder-point", type=int, default=0, help="alert when stock falls to this level")
+    sub.add_argument("--reorder-qty", type=int, default=0, help="quantity to suggest reordering")
+    sub.set_defaults(command=products_add)
+    sub = actions.add_parser("update", help="change a product's name, price or stock")
+    sub.add_argument("id", type=int)
+    sub.add_argument("--name")
+    sub.add_argument("--price", type=float)
+    sub.add_argument("--stock", type=int)
+    sub.add_argument("--reorder-point", type=int)
+    sub.add_argument("--reorder-qty", type=int)
+    sub.set_defaults(command=products_update)
+    sub = actions.add_parser("low-stock", help="list products at or below their reorder point")
+    sub.add_argument("--limit", type=positive_int, default=None)
+    sub.set_defaults(command=products_low_stock)
+    sub = actions.add_parser("delete", help="delete a product that is on no order")
+    sub.add_argument("id", type=int)
+    sub.set_defaults(command=products_delete)
+
+    orders = groups.add_parser("orders", help="list, show, create, fulfill, update, cancel or delete orders")
+    actions = orders.add_subparsers(title="actions", metavar="ACTION", required=True)
+    sub = actions.add_parser("list", help="list orders")
+    sub.add_argument("--status")
+    add_listing_arguments(sub)
+    sub.set_defaults(command=orders_list)
+    sub = actions.add_parser("show", help="show one order with its items")
+    sub.add_argument("id", type=int)
+    sub.set_defaults(command=orders_show)
+    sub = actions.add_parser("create", help="place an order, e.g. create 'Jane Doe' 12:2 40:1")
+    sub.add_argument("customer")
+    sub.add_argument("items", nargs="+", type=basket_item, metavar="PRODUCT_ID:QTY")
+    sub.set_defaults(command=orders_create)
+    sub = actions.add_parser("fulfill", help="fulfill one or more pending orders as one wave")
+    sub.add_argument("ids", nargs="+", type=int, metavar="ID")
+    sub.add_argument("--all-or-nothing", action="store_true", help="fulfill none of them if any cannot be met")
+    sub.set_defaults(command=orders_fulfill)
+    sub = actions.add_parser("update", help="change an order's customer name or status")
+    sub.add_argument("id", type=int)
+    sub.add_argument("--customer")
+    sub.add_argument("--status")
+    sub.set_defaults(command=orders_update)
+    sub = actions.add_parser("cancel", help="cancel pending orders and return their stock, e.g. cancel --placed-before 2026-09-01")
+    selection = sub.add_mutually_exclusive_group(required=True)
+    selection.add_argument("--ids", nargs="+", type=int, metavar="ID", help="these order IDs")
+    selection.add_argument("--placed-before", type=iso_date, metavar="YYYY-MM-DD",
+                           help="every pending order placed before this date")
+    sub.set_defaults(command=orders_cancel)
+    sub = actions.add_parser("delete", help="delete orders and return the stock of those not cancelled")
+    sub.add_argument("ids", nargs="+", type=int, metavar="ID")
+    sub.set_defaults(command=orders_delete)
+
+    shipments = groups.add_parser("shipments", help="list, update, bulk-mark or delete shipments")
+    actions = shipments.add_subparsers(title="actions", metavar="ACTION", required=True)
+    sub = actions.add_parser("list", help="list shipments")
+    sub.add_argument("--status")
+    sub.add_argument("--shipped-from", type=iso_date, metavar="YYYY-MM-DD", help="shipped on or after this date")
+    sub.add_argument("--shipped-before", type=iso_date, metavar="YYYY-MM-DD", help="shipped before this date")
+    add_listing_arguments(sub)
+    sub.set_defaults(command=shipments_list)
+    sub = actions.add_parser("update", help="set a shipment's delivery status, e.g. update 7 delivered")
+    sub.add_argument("id", type=int)
+    sub.add_argument("status")
+    sub.add_argument("--clear-shipped-date", action="store_true")
+    sub.set_defaults(command=shipments_update)
+    sub = actions.add_parser("mark", help="set the status of many shipments at once, e.g. mark delivered --range 100-600")
+    sub.add_argument("status")
+    selection = sub.add_mutually_exclusive_group(required=True)
+    selection.add_argument("--ids", nargs="+", type=int, metavar="ID", help="these shipment IDs")
+    selection.add_argument("--range", type=id_range, metavar="FIRST-LAST", help="an inclusive shipment ID range")
+    selection.add_argument("--orders", nargs="+", type=int, metavar="ORDER_ID", help="the shipments of these orders")
+    sub.add_argument("--clear-shipped-date", action="store_true")
+    sub.set_defaults(command=shipments_mark)
+    sub = actions.add_parser("delete", help="delete a shipment")
+    sub.add_argument("id", type=int)
+    sub.set_defaults(command=shipments_delete)
+    return parser
+
+
+def run_command(args):
+    """Run a parsed subcommand in its own session and return the process exit code."""
+    from lib.models import Session
+    from lib import services
+    from lib.profiling import profiler_from_env, print_profile
+    from lib.low_stock import low_stock_watchlist, print_low_stock_alert
+
+    low_stock_watchlist.add_alert_hook(print_low_stock_alert)
+
+    profiler = profiler_from_env(args.profile, args.cprofile, args.n_plus_one)
+    session = Session()
+    try:
+        if profiler:
+            with profiler.action(args.command.__name__.replace("_", " ")) as profile:
+                status = args.command(session, args)
+            print_profile(profile, profiler.n_plus_one_threshold)
+        else:
+            status = args.command(session, args)
+        return status or 0
+    except services.ServiceError as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        session.close()
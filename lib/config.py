@@ -0,0 +1,99 @@
+# lib/config.py
+
+import configparser
+import os
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+
+DEFAULT_DATABASE_URL = "sqlite:///db/warehouse.db"
+DEFAULT_CONFIG_FILE = "warehouse.ini"
+
+# Production profile for SQLite: WAL lets readers run alongside the writer,
+# NORMAL sync is durable in WAL mode without an fsync per commit, and
+# foreign_keys makes the ondelete="CASCADE" clauses actually fire.
+# auto_vacuum=INCREMENTAL lets the archival job hand freed pages back to the
+# filesystem. On an existing database it only takes effect after a full
+# VACUUM, which the archival job runs once.
+DEFAULT_SQLITE_PRAGMAS = {
+    "auto_vacuum": "INCREMENTAL",
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": "-65536",
+    "mmap_size": "268435456",
+    "temp_store": "MEMORY",
+    "busy_timeout": "5000",
+    "foreign_keys": "ON",
+}
+
+
+def read_config_file(path=None):
+    """Load the optional INI config named by WAREHOUSE_CONFIG (default ./warehouse.ini)."""
+    parser = configparser.ConfigParser()
+    parser.read(path or os.environ.get("WAREHOUSE_CONFIG", DEFAULT_CONFIG_FILE))
+    return parser
+
+
+def get_database_url(config=None):
+    """Resolve the database URL: WAREHOUSE_DATABASE_URL, then [database] url, then the default."""
+    config = config if config is not None else read_config_file()
+    return os.environ.get("WAREHOUSE_DATABASE_URL") or config.get("database", "url", fallback=DEFAULT_DATABASE_URL)
+
+
+def get_archive_path(config=None):
+    """
+    Resolve the archive database file: WAREHOUSE_ARCHIVE_PATH, then
+    [database] archive_path, then <hot database>_archive.db next to the hot
+    database. Returns None when the hot database is not an SQLite file.
+    """
+    config = config if config is not None else read_config_file()
+    path = os.environ.get("WAREHOUSE_ARCHIVE_PATH") or config.get("database", "archive_path", fallback=None)
+    if path:
+        return path
+    url = make_url(get_database_url(config))
+    if url.get_backend_name() != "sqlite" or not url.database or url.database == ":memory:":
+        return None
+    root, ext = os.path.splitext(url.database)
+    return f"{root}_archive{ext or '.db'}"
+
+
+def get_sqlite_pragmas(config=None):
+    """
+    Resolve SQLite pragmas: defaults, overridden by the [sqlite] section,
+    overridden by WAREHOUSE_SQLITE_<PRAGMA> environment variables.
+    """
+    config = config if config is not None else read_config_file()
+    pragmas = dict(DEFAULT_SQLITE_PRAGMAS)
+    if config.has_section("sqlite"):
+        pragmas.update(config.items("sqlite"))
+    for name in list(pragmas):
+        value = os.environ.get(f"WAREHOUSE_SQLITE_{name.upper()}")
+        if value is not None:
+            pragmas[name] = value
+    return {name: value for name, value in pragmas.items() if value != ""}
+
+
+def apply_sqlite_pragmas(engine, pragmas):
+    """Run the given PRAGMA statements on every new DBAPI connection of the engine."""
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+    return engine
+
+
+def make_engine(url=None, pragmas=None, **kwargs):
+    """Create an engine for the configured database, applying the SQLite profile when relevant."""
+    config = read_config_file()
+    url = url or get_database_url(config)
+    kwargs.setdefault("echo", False)
+    engine = create_engine(url, **kwargs)
+    if engine.dialect.name == "sqlite":
+        apply_sqlite_pragmas(engine, pragmas if pragmas is not None else get_sqlite_pragmas(config))
+    return engine
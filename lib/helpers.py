@@ -1,38 +1,160 @@
 # lib/helpers.py
-from lib.models import Session, Product, Order 
+from lib.models import Session, Product, Order, OrderItem, Shipment
+from sqlalchemy import func
 from datetime import datetime
 
+PAGE_SIZE = 20
+STREAM_BATCH_SIZE = 1000
+
+
+def apply_date_range(query, column, date_from=None, date_to=None):
+    """Restrict a query to rows whose column falls within [date_from, date_to)."""
+    if date_from is not None:
+        query = query.filter(column >= date_from)
+    if date_to is not None:
+        query = query.filter(column < date_to)
+    return query
+
+def keyset_page(query, id_column, page_size=PAGE_SIZE, after_id=None, before_id=None):
+    """Return one page of rows ordered by id_column using keyset pagination.
+
+    Pass after_id to fetch the page following a row, or before_id to fetch the
+    page preceding it. Rows are always returned in ascending id order.
+    """
+    query = query.order_by(None)
+    if before_id is not None:
+        rows = query.filter(id_column < before_id).order_by(id_column.desc()).limit(page_size).all()
+        rows.reverse()
+        return rows
+    if after_id is not None:
+        query = query.filter(id_column > after_id)
+    return query.order_by(id_column).limit(page_size).all()
+
+
+def product_listing_query(session):
+    """Build the query backing product listings."""
+    return session.query(Product).order_by(Product.id)
+
+def print_product_rows(products):
+    """Print product rows as a table and return how many were printed."""
+    count = 0
+    for p in products:
+        if count == 0:
+            print("ID | Product Name           | SKU        | Stock | Price (KSH)")
+            print("---|------------------------|------------|-------|------------")
+        name_padded = p.name.ljust(22)[:22]
+        sku_padded = p.sku.ljust(10)[:10]
+        print(f"{str(p.id).ljust(2)} | {name_padded} | {sku_padded} | {str(p.stock_quantity).ljust(5)} | {p.price_per_unit:.2f}")
+        count += 1
+    if count:
+        print("----------------------------------------------------\n")
+    return count
+
 def print_products(session):
     """Print all products from the given session in a neat format."""
-    products = session.query(Product).order_by(Product.id).all()
     print("\n--- 📦 Current Inventory Stock ---")
-    if not products:
+    products = product_listing_query(session).yield_per(STREAM_BATCH_SIZE)
+    if not print_product_rows(products):
         print(" (Empty shelves! No products found. Time to restock!)\n")
-    else:
-        print("ID | Product Name           | SKU        | Stock | Price (KSH)")
-        print("---|------------------------|------------|-------|------------")
-        for p in products:
-            name_padded = p.name.ljust(22)[:22]
-            sku_padded = p.sku.ljust(10)[:10]
-            print(f"{str(p.id).ljust(2)} | {name_padded} | {sku_padded} | {str(p.stock_quantity).ljust(5)} | {p.price_per_unit:.2f}")
-        print("----------------------------------------------------\n")
+
+
+def order_summary_query(session, status=None, date_from=None, date_to=None):
+    """Build a query returning one summary row per order.
+
+    Each row carries id, customer_name, order_date, status, item_count and
+    total, read from the denormalized columns on orders without touching
+    order_items.
+    """
+    query = session.query(
+        Order.id,
+        Order.customer_name,
+        Order.order_date,
+        Order.status,
+        Order.item_count,
+        Order.total_amount.label("total"),
+    )
+    if status is not None:
+        query = query.filter(Order.status == status)
+    query = apply_date_range(query, Order.order_date, date_from, date_to)
+    return query.order_by(Order.id)
+
+def order_item_totals_query(session):
+    """Build a query recomputing each order's item count and total from its order_items."""
+    return (
+        session.query(
+            Order.id,
+            Order.item_count,
+            Order.total_amount,
+            func.count(OrderItem.id).label("actual_item_count"),
+            func.coalesce(func.sum(OrderItem.quantity * OrderItem.unit_price), 0.0).label("actual_total"),
+        )
+        .outerjoin(OrderItem, OrderItem.order_id == Order.id)
+        .group_by(Order.id)
+        .order_by(Order.id)
+    )
+
+def get_order_summaries(session, order_ids=None):
+    """Return summary rows for all orders, or only for the given IDs."""
+    query = order_summary_query(session)
+    if order_ids is not None:
+        query = query.filter(Order.id.in_(order_ids))
+    return query.all()
+
+def print_order_rows(orders):
+    """Print order summary rows as a table and return how many were printed."""
+    count = 0
+    for o in orders:
+        if count == 0:
+            print("ID | Customer Name          | Order Date           | Status     | Items | Total Value")
+            print("---|------------------------|----------------------|------------|-------|------------")
+        customer_name_padded = o.customer_name.ljust(22)[:22]
+        order_date_str = o.order_date.strftime("%Y-%m-%d %H:%M").ljust(20)
+        status_padded = o.status.ljust(10)
+        print(f"{str(o.id).ljust(2)} | {customer_name_padded} | {order_date_str} | {status_padded} | {str(o.item_count).ljust(5)} | KSH-{o.total:.2f}")
+        count += 1
+    if count:
+        print("--------------------------------------------------------------------------------\n")
+    return count
 
 def print_orders(session):
     """Print all orders from the given session in a neat format."""
-    orders = session.query(Order).order_by(Order.id).all()
     print("\n--- 📦 Current Orders ---")
-    if not orders:
+    orders = order_summary_query(session).yield_per(STREAM_BATCH_SIZE)
+    if not print_order_rows(orders):
         print(" (No orders in the system yet. Time to get selling!)\n")
-    else:
-        print("ID | Customer Name          | Order Date           | Status     | Items | Total Value")
-        print("---|------------------------|----------------------|------------|-------|------------")
-        for o in orders:
-            customer_name_padded = o.customer_name.ljust(22)[:22]
-            order_date_str = o.order_date.strftime("%Y-%m-%d %H:%M").ljust(20)
-            status_padded = o.status.ljust(10)
-            total_value = sum(item.quantity * item.unit_price for item in o.order_items) 
-            print(f"{str(o.id).ljust(2)} | {customer_name_padded} | {order_date_str} | {status_padded} | {str(len(o.order_items)).ljust(5)} | KSH-{total_value:.2f}")
-        print("--------------------------------------------------------------------------------\n")
+
+
+def shipment_listing_query(session, status=None, date_from=None, date_to=None):
+    """Build the query backing shipment listings, optionally filtered by status and shipped date."""
+    query = session.query(Shipment)
+    if status is not None:
+        query = query.filter(Shipment.delivery_status == status)
+    query = apply_date_range(query, Shipment.shipped_date, date_from, date_to)
+    return query.order_by(Shipment.id)
+
+def print_shipment_rows(shipments):
+    """Print shipment rows as a table and return how many were printed."""
+    count = 0
+    for s in shipments:
+        if count == 0:
+            print("ID | Order ID | Delivery Status | Shipped Date")
+            print("---|----------|-----------------|-------------------")
+        shipped_str = s.shipped_date.strftime("%Y-%m-%d %H:%M:%S") if s.shipped_date else "Pending Dispatch"
+        print(f"{str(s.id).ljust(2)} | {str(s.order_id).ljust(8)} | {s.delivery_status.ljust(15)} | {shipped_str}")
+        count += 1
+    if count:
+        print("----------------------------------------------------\n")
+    return count
+
+def print_shipments(session, status=None, date_from=None, date_to=None):
+    """Print shipments in a neat format, filtered in SQL by delivery status and shipped date."""
+    print("\n--- 🚚 Shipment Tracking ---")
+    query = shipment_listing_query(session, status=status, date_from=date_from, date_to=date_to)
+    if not print_shipment_rows(query.yield_per(STREAM_BATCH_SIZE)):
+        if status is None and date_from is None and date_to is None:
+            print(" (No shipments recorded yet. Fulfill an order to see one here!)\n")
+        else:
+            print(" (No shipments match these filters.)\n")
 
 
 def get_product_by_sku(session, sku):
@@ -45,4 +167,12 @@ def get_order_by_id(session, order_id):
 
 def get_product_by_id(session, product_id):
     """Retrieve a product by its ID."""
-    return session.get(Product, product_id) 
\ No newline at end of file
+    return session.get(Product, product_id)
+
+def commit_or_rollback(session):
+    """Commit the session, rolling back before re-raising if the commit fails."""
+    try:
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
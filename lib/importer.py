@@ -0,0 +1,196 @@
+# lib/importer.py
+
+import argparse
+import csv
+import json
+import os
+import time
+from datetime import datetime
+from itertools import islice
+
+from sqlalchemy.dialects.sqlite import insert
+
+from lib.commands import positive_int
+from lib.models import Session, Product
+from lib.cache import catalog_cache
+from lib.low_stock import low_stock_watchlist
+from lib.ledger import record_movements, open_ledger
+
+DEFAULT_CHUNK_SIZE = 1000
+PRODUCT_FIELDS = ("name", "sku", "stock_quantity", "price_per_unit")
+
+
+class ImportResult:
+    """Running totals for a bulk product import."""
+
+    def __init__(self):
+        self.upserted = 0
+        self.rejected = []
+        self.elapsed = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.upserted / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self):
+        return (
+            f"{self.upserted} product(s) upserted, {len(self.rejected)} rejected "
+            f"in {self.elapsed:.2f}s ({self.rows_per_second:,.0f} rows/sec)"
+        )
+
+
+def read_records(path):
+    """Yield (line_number, record) pairs from a CSV or JSONL file without loading it whole."""
+    extension = os.path.splitext(path)[1].lower()
+    with open(path, newline="", encoding="utf-8") as f:
+        if extension == ".csv":
+            for record in csv.DictReader(f):
+                yield None, record
+        elif extension in (".jsonl", ".ndjson"):
+            for line_number, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield line_number, json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield line_number, e
+        else:
+            raise ValueError(f"Unsupported file type '{extension}'. Use .csv or .jsonl.")
+
+
+def validate_record(record):
+    """Convert a raw record into product column values, raising ValueError if it is invalid."""
+    if isinstance(record, Exception):
+        raise ValueError(f"malformed JSON ({record})")
+    missing = [field for field in PRODUCT_FIELDS if record.get(field) in (None, "")]
+    if missing:
+        raise ValueError(f"missing {', '.join(missing)}")
+
+    name = str(record["name"]).strip()
+    sku = str(record["sku"]).strip()
+    if not name or not sku:
+        raise ValueError("name and sku cannot be blank")
+    try:
+        stock_quantity = int(record["stock_quantity"])
+        price_per_unit = float(record["price_per_unit"])
+    except (TypeError, ValueError):
+        raise ValueError("stock_quantity must be an integer and price_per_unit a number")
+    if price_per_unit <= 0:
+        raise ValueError("price_per_unit must be greater than zero")
+    if stock_quantity < 0:
+        raise ValueError("stock_quantity cannot be negative")
+
+    return {
+        "name": name,
+        "sku": sku,
+        "stock_quantity": stock_quantity,
+        "price_per_unit": price_per_unit,
+    }
+
+
+def upsert_products(session, rows):
+    """
+    Insert product rows, updating name, price and stock of any SKU that already exists.
+    Stock changes to existing SKUs go to the ledger as import movements and
+    new SKUs get opening snapshots, in the same transaction.
+    """
+    skus = [row["sku"] for row in rows]
+    previous = {
+        row.sku: row.stock_quantity
+        for row in session.query(Product.sku, Product.stock_quantity).filter(Product.sku.in_(skus))
+    }
+    now = datetime.now()
+    for row in rows:
+        row["updated_at"] = now
+    stmt = insert(Product.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Product.sku],
+        set_={
+            "name": stmt.excluded.name,
+            "stock_quantity": stmt.excluded.stock_quantity,
+            "price_per_unit": stmt.excluded.price_per_unit,
+            "updated_at": stmt.excluded.updated_at,
+            "version": Product.__table__.c.version + 1,
+        },
+    )
+    session.execute(stmt, rows)
+    current = session.query(Product.id, Product.sku, Product.stock_quantity).filter(Product.sku.in_(skus)).all()
+    record_movements(
+        session, [(row.id, row.stock_quantity - previous[row.sku]) for row in current if row.sku in previous], "import"
+    )
+    open_ledger(session, [(row.id, row.stock_quantity) for row in current if row.sku not in previous])
+
+
+def import_products(path, chunk_size=DEFAULT_CHUNK_SIZE, session_factory=Session):
+    """
+    Stream products from a CSV or JSONL file and upsert them one chunk per transaction.
+    When a SKU appears twice in a chunk the later row wins and the earlier one is rejected.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1.")
+    result = ImportResult()
+    records = enumerate(read_records(path), start=1)
+    started = time.perf_counter()
+    session = session_factory()
+    try:
+        while True:
+            chunk = list(islice(records, chunk_size))
+            if not chunk:
+                break
+            rows_by_sku = {}
+            locations = []
+            for position, (line_number, record) in chunk:
+                # CSV rows are counted from the header line, JSONL ones are numbered as read.
+                location = line_number if line_number is not None else position + 1
+                locations.append(location)
+                try:
+                    row = validate_record(record)
+                except ValueError as e:
+                    result.rejected.append((location, str(e)))
+                    continue
+                earlier = rows_by_sku.pop(row["sku"], None)
+                if earlier is not None:
+                    result.rejected.append((earlier[0], f"duplicate SKU {row['sku']}, superseded by line {location}"))
+                rows_by_sku[row["sku"]] = (location, row)
+            if not rows_by_sku:
+                continue
+            try:
+                upsert_products(session, [row for _, row in rows_by_sku.values()])
+                session.commit()
+                result.upserted += len(rows_by_sku)
+            except Exception as e:
+                session.rollback()
+                result.rejected.append(((locations[0], locations[-1]), f"chunk rolled back: {e}"))
+    finally:
+        session.close()
+        catalog_cache.invalidate()
+        low_stock_watchlist.invalidate()
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+def print_import_result(result, max_rejections=20):
+    """Print an import summary followed by the first few rejected rows."""
+    print(f"✅ Import finished: {result}.")
+    if result.rejected:
+        print(f"⚠️ Rejected rows (showing up to {max_rejections}):")
+        for location, reason in result.rejected[:max_rejections]:
+            if isinstance(location, tuple):
+                first, last = location
+                label = f"line {first}" if first == last else f"lines {first}-{last}"
+            else:
+                label = f"line {location}"
+            print(f"  - {label}: {reason}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk import products from a CSV or JSONL file.")
+    parser.add_argument("path", help="CSV or JSONL file with name, sku, stock_quantity and price_per_unit columns")
+    parser.add_argument("--chunk-size", type=positive_int, default=DEFAULT_CHUNK_SIZE, help="rows per transaction")
+    args = parser.parse_args(argv)
+    print_import_result(import_products(args.path, chunk_size=args.chunk_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+# lib/ledger.py
+
+import argparse
+import sys
+from datetime import datetime
+
+from sqlalchemy import delete, func, insert, literal, select
+
+from lib.models import Session, Product, OrderItem, StockMovement, StockSnapshot
+
+DEFAULT_MIN_TAIL = 50
+HISTORY_LIMIT = 20
+
+movements = StockMovement.__table__
+snapshots = StockSnapshot.__table__
+
+# Stock ledger
+# ------------
+# Every change to Product.stock_quantity appends a signed row to
+# stock_movements in the same transaction, and every product starts with an
+# opening row in stock_snapshots. A product's stock at time T is its newest
+# snapshot taken at or before T plus the movements after that snapshot up to
+# T. compact_ledger() folds long tails into new snapshots so that read stays
+# short, and can prune history older than a retention cutoff.
+
+
+def record_movements(session, changes, reason, order_id=None):
+    """Append a movement per (product_id, quantity_delta) pair in the session's current transaction."""
+    now = datetime.now()
+    rows = [
+        {"product_id": product_id, "occurred_at": now, "quantity_delta": delta, "reason": reason, "order_id": order_id}
+        for product_id, delta in changes
+        if delta
+    ]
+    if rows:
+        session.execute(insert(movements), rows)
+
+
+def record_order_movements(session, order_ids, reason, sign=1):
+    """
+    Append a movement per line item of the selected orders with one INSERT …
+    SELECT from order_items. order_ids is a list of IDs or a SELECT of them;
+    sign=-1 records the items leaving stock rather than returning to it.
+    """
+    items = OrderItem.__table__
+    lines = select(
+        items.c.product_id,
+        literal(datetime.now(), movements.c.occurred_at.type),
+        items.c.quantity * sign,
+        literal(reason, movements.c.reason.type),
+        items.c.order_id,
+    ).where(items.c.order_id.in_(order_ids), items.c.quantity != 0)
+    session.execute(
+        insert(movements).from_select(["product_id", "occurred_at", "quantity_delta", "reason", "order_id"], lines)
+    )
+
+
+def open_ledger(session, stock_levels):
+    """
+    Write an opening snapshot per (product_id, stock_quantity) pair for
+    products entering the ledger. The snapshot starts after the newest
+    movement, so movements left by a deleted product whose ID is reused
+    never count towards the new one.
+    """
+    stock_levels = list(stock_levels)
+    if not stock_levels:
+        return
+    now = datetime.now()
+    last_movement_id = session.execute(select(func.coalesce(func.max(movements.c.id), 0))).scalar()
+    session.execute(insert(snapshots), [
+        {"product_id": product_id, "taken_at": now, "stock_quantity": stock, "last_movement_id": last_movement_id}
+        for product_id, stock in stock_levels
+    ])
+
+
+def stock_at(session, product_id, at):
+    """A product's stock at a point in time, or None before its ledger begins (or before pruned history)."""
+    snapshot = session.execute(
+        select(snapshots.c.stock_quantity, snapshots.c.last_movement_id)
+        .where(snapshots.c.product_id == product_id, snapshots.c.taken_at <= at)
+        .order_by(snapshots.c.taken_at.desc(), snapshots.c.id.desc())
+        .limit(1)
+    ).first()
+    if snapshot is None:
+        return None
+    tail = session.execute(
+        select(func.coalesce(func.sum(movements.c.quantity_delta), 0))
+        .where(
+            movements.c.product_id == product_id,
+            movements.c.id > snapshot.last_movement_id,
+            movements.c.occurred_at <= at,
+        )
+    ).scalar()
+    return snapshot.stock_quantity + tail
+
+
+def latest_snapshots():
+    """Subquery of each product's newest snapshot row."""
+    newest = select(func.max(snapshots.c.id)).group_by(snapshots.c.product_id)
+    return select(snapshots).where(snapshots.c.id.in_(newest)).subquery("latest")
+
+
+def ledger_balances(session):
+    """Query each product's stock next to the stock its ledger adds up to (None when it has no snapshot)."""
+    latest = latest_snapshots()
+    tail = (
+        select(func.coalesce(func.sum(movements.c.quantity_delta), 0))
+        .where(movements.c.product_id == latest.c.product_id, movements.c.id > latest.c.last_movement_id)
+        .scalar_subquery()
+    )
+    return (
+        session.query(
+            Product.id, Product.name, Product.sku, Product.stock_quantity,
+            (latest.c.stock_quantity + tail).label("ledger_quantity"),
+        )
+        .outerjoin(latest, latest.c.product_id == Product.id)
+        .order_by(Product.id)
+    )
+
+
+def compact_ledger(session, min_tail=DEFAULT_MIN_TAIL, prune_before=None):
+    """
+    Fold every product's movements since its newest snapshot into a new
+    snapshot once there are at least min_tail of them. Snapshots are derived
+    from the ledger alone, so drift against products stays visible to
+    verify_ledger(). With prune_before, history older than the newest
+    snapshot at or before that time is deleted. Returns (snapshots written,
+    movements pruned).
+    """
+    latest = latest_snapshots()
+    folded = (
+        select(
+            latest.c.product_id,
+            func.max(movements.c.occurred_at),
+            latest.c.stock_quantity + func.sum(movements.c.quantity_delta),
+            func.max(movements.c.id),
+        )
+        .join(movements, (movements.c.product_id == latest.c.product_id)
+              & (movements.c.id > latest.c.last_movement_id))
+        .group_by(latest.c.product_id, latest.c.stock_quantity)
+        .having(func.count(movements.c.id) >= min_tail)
+    )
+    try:
+        written = session.execute(
+            insert(snapshots).from_select(["product_id", "taken_at", "stock_quantity", "last_movement_id"], folded)
+        ).rowcount
+        pruned = prune_ledger(session, prune_before) if prune_before is not None else 0
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    return written, pruned
+
+
+def prune_ledger(session, before):
+    """Delete movements and snapshots superseded by each product's newest snapshot taken at or before `before`."""
+    kept = snapshots.alias("kept")
+    covered = (
+        select(func.max(kept.c.last_movement_id))
+        .where(kept.c.product_id == movements.c.product_id, kept.c.taken_at <= before)
+        .scalar_subquery()
+    )
+    pruned = session.execute(delete(movements).where(movements.c.id <= covered)).rowcount
+    newest_kept = (
+        select(func.max(kept.c.id))
+        .where(kept.c.product_id == snapshots.c.product_id, kept.c.taken_at <= before)
+        .scalar_subquery()
+    )
+    session.execute(delete(snapshots).where(snapshots.c.taken_at <= before, snapshots.c.id < newest_kept))
+    return pruned
+
+
+def verify_ledger(session, fix=False, max_report=20):
+    """
+    Report products whose stock disagrees with their ledger. With fix, the
+    ledger is brought in line by appending reconciliation movements (and
+    opening snapshots for untracked products); it is never rewritten.
+    Returns the number of products that disagreed.
+    """
+    drifted = [row for row in ledger_balances(session) if row.ledger_quantity != row.stock_quantity]
+    print("\n--- 📒 Stock Ledger Check ---")
+    if not drifted:
+        print("✅ Every product's stock matches its ledger.")
+        return 0
+
+    print(f"⚠️ {len(drifted)} product(s) disagree with their ledger (showing up to {max_report}):")
+    for row in drifted[:max_report]:
+        ledger = "no ledger" if row.ledger_quantity is None else f"ledger says {row.ledger_quantity}"
+        print(f"  - '{row.name}' (SKU: {row.sku}): stock {row.stock_quantity}, {ledger}")
+    if fix:
+        try:
+            open_ledger(session, [(row.id, row.stock_quantity) for row in drifted if row.ledger_quantity is None])
+            record_movements(
+                session,
+                [(row.id, row.stock_quantity - row.ledger_quantity) for row in drifted if row.ledger_quantity is not None],
+                "reconciliation",
+            )
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        print(f"🔧 Reconciled {len(drifted)} product(s).")
+    return len(drifted)
+
+
+def product_history(session, product_id, limit=HISTORY_LIMIT):
+    """A product's most recent movements, newest first."""
+    return session.execute(
+        select(movements)
+        .where(movements.c.product_id == product_id)
+        .order_by(movements.c.id.desc())
+        .limit(limit)
+    ).all()
+
+
+def find_product_id(session, sku):
+    product_id = session.query(Product.id).filter(Product.sku == sku).scalar()
+    if product_id is None:
+        raise SystemExit(f"❌ No product with SKU '{sku}'.")
+    return product_id
+
+
+def print_history(session, sku, limit):
+    print(f"\n--- 📒 Stock Movements for {sku} ---")
+    rows = product_history(session, find_product_id(session, sku), limit)
+    if not rows:
+        print(" (No movements recorded.)\n")
+        return
+    print("When                | Change | Reason         | Order")
+    print("--------------------|--------|----------------|------")
+    for row in rows:
+        order = f"#{row.order_id}" if row.order_id else "-"
+        print(f"{row.occurred_at:%Y-%m-%d %H:%M:%S} | {row.quantity_delta:>+6} | {row.reason.ljust(14)} | {order}")
+    print("-----------------------------------------------------\n")
+
+
+def print_stock_at(session, sku, at):
+    quantity = stock_at(session, find_product_id(session, sku), at)
+    if quantity is None:
+        print(f"❓ The ledger for {sku} does not reach back to {at:%Y-%m-%d %H:%M:%S}.")
+    else:
+        print(f"📦 {sku} had {quantity} unit(s) in stock at {at:%Y-%m-%d %H:%M:%S}.")
+
+
+def parse_datetime(value):
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date/time '{value}', expected e.g. 2026-10-17 or '2026-10-17 14:30'")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query and maintain the stock movement ledger.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    history = subparsers.add_parser("history", help="list a product's recent stock movements")
+    history.add_argument("sku")
+    history.add_argument("--limit", type=int, default=HISTORY_LIMIT)
+
+    at = subparsers.add_parser("stock-at", help="a product's stock at a point in time")
+    at.add_argument("sku")
+    at.add_argument("at", type=parse_datetime, help="date/time, e.g. '2026-10-17 14:30'")
+
+    compact = subparsers.add_parser("compact", help="fold long movement tails into snapshots")
+    compact.add_argument("--min-tail", type=int, default=DEFAULT_MIN_TAIL,
+                         help=f"snapshot products with at least this many movements since their last snapshot (default {DEFAULT_MIN_TAIL})")
+    compact.add_argument("--prune-before", type=parse_datetime, default=None, metavar="DATETIME",
+                         help="also delete history that is older than the newest snapshot at or before this time")
+
+    verify = subparsers.add_parser("verify", help="compare every product's stock with its ledger")
+    verify.add_argument("--fix", action="store_true", help="append reconciliation movements for any drift")
+
+    args = parser.parse_args(argv)
+    session = Session()
+    try:
+        if args.command == "history":
+            print_history(session, args.sku, args.limit)
+        elif args.command == "stock-at":
+            print_stock_at(session, args.sku, args.at)
+        elif args.command == "compact":
+            written, pruned = compact_ledger(session, args.min_tail, args.prune_before)
+            print(f"🗜️ Wrote {written} snapshot(s) and pruned {pruned} movement(s).")
+        elif args.command == "verify":
+            drifted = verify_ledger(session, fix=args.fix)
+            return 1 if drifted and not args.fix else 0
+    finally:
+        session.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+# lib/low_stock.py
+
+import argparse
+import sys
+import threading
+
+from sqlalchemy import event, inspect
+
+from lib.models import Session, Product
+
+PENDING_KEY = "low_stock_changes"
+
+LEVEL_COLUMNS = (
+    Product.id, Product.name, Product.sku, Product.stock_quantity, Product.reorder_point, Product.reorder_qty,
+)
+
+
+class StockLevel:
+    """Snapshot of a product's stock against its reorder point."""
+
+    __slots__ = ("id", "name", "sku", "stock_quantity", "reorder_point", "reorder_qty")
+
+    def __init__(self, id, name, sku, stock_quantity, reorder_point, reorder_qty):
+        self.id = id
+        self.name = name
+        self.sku = sku
+        self.stock_quantity = stock_quantity
+        self.reorder_point = reorder_point
+        self.reorder_qty = reorder_qty
+
+    def __repr__(self):
+        return f"<StockLevel(id={self.id}, sku='{self.sku}', stock={self.stock_quantity}, reorder_point={self.reorder_point})>"
+
+    @property
+    def is_low(self):
+        return self.stock_quantity <= self.reorder_point
+
+    @property
+    def shortfall(self):
+        """Units needed to get back above the reorder point."""
+        return self.reorder_point - self.stock_quantity + 1
+
+
+class LowStockWatchlist:
+    """
+    The set of products at or below their reorder point, kept up to date
+    incrementally instead of by rescanning products.
+
+    Stock changes are collected per session while a transaction runs: ORM
+    changes to products from the after_flush history, and the conditional
+    stock reservation reports its RETURNING row through record(). On commit
+    the set is updated and alert hooks fire for every product that crossed
+    its threshold; on rollback the collected changes are dropped. The set
+    itself is loaded on first use from the ix_products_low_stock partial
+    index. Changes made by other processes are not seen until invalidate().
+    """
+
+    def __init__(self):
+        self._levels = {}
+        self._loaded = False
+        self._lock = threading.RLock()
+        self._hooks = []
+        self.alerts = 0
+
+    def add_alert_hook(self, hook):
+        """Call hook(level, session) whenever a product drops to or below its reorder point. Adding a hook twice is a no-op."""
+        if hook not in self._hooks:
+            self._hooks.append(hook)
+        return hook
+
+    def remove_alert_hook(self, hook):
+        self._hooks.remove(hook)
+
+    def load(self, session):
+        """(Re)build the set from the partial index."""
+        rows = session.query(*LEVEL_COLUMNS).filter(Product.stock_quantity <= Product.reorder_point).all()
+        with self._lock:
+            self._levels = {row.id: StockLevel(*row) for row in rows}
+            self._loaded = True
+
+    def invalidate(self):
+        """Forget the set so the next read reloads it, e.g. after a bulk import."""
+        with self._lock:
+            self._levels = {}
+            self._loaded = False
+
+    def levels(self, session):
+        """Products at or below their reorder point, largest shortfall first."""
+        if not self._loaded:
+            self.load(session)
+        with self._lock:
+            levels = list(self._levels.values())
+        return sorted(levels, key=lambda level: (-level.shortfall, level.id))
+
+    def record(self, session, level, was_low):
+        """Note a change to a product's stock or threshold made in the session's current transaction."""
+        pending = session.info.setdefault(PENDING_KEY, {})
+        if level.id in pending:
+            # Keep the state from before the transaction so a crossing is seen once.
+            was_low = pending[level.id][0]
+        pending[level.id] = (was_low, level)
+
+    def record_deleted(self, session, product_id):
+        pending = session.info.setdefault(PENDING_KEY, {})
+        pending[product_id] = (pending.get(product_id, (False,))[0], None)
+
+    def attach(self, session_factory):
+        """Track stock changes made by sessions from this factory."""
+        event.listen(session_factory, "after_flush", self._after_flush)
+        event.listen(session_factory, "after_commit", self._after_commit)
+        event.listen(session_factory, "after_rollback", self._after_rollback)
+        return self
+
+    def _after_flush(self, session, flush_context):
+        for obj in list(session.new) + list(session.dirty):
+            if not isinstance(obj, Product):
+                continue
+            attrs = inspect(obj).attrs
+            stock, point = attrs.stock_quantity.history, attrs.reorder_point.history
+            if obj in session.new:
+                was_low = False
+            elif stock.has_changes() or point.has_changes():
+                previous_stock = stock.deleted[0] if stock.deleted else obj.stock_quantity
+                previous_point = point.deleted[0] if point.deleted else obj.reorder_point
+                was_low = previous_stock is not None and previous_point is not None and previous_stock <= previous_point
+            else:
+                continue
+            if isinstance(obj.stock_quantity, int) and isinstance(obj.reorder_point, int):
+                level = StockLevel(obj.id, obj.name, obj.sku, obj.stock_quantity, obj.reorder_point, obj.reorder_qty)
+                self.record(session, level, was_low)
+        for obj in session.deleted:
+            if isinstance(obj, Product):
+                self.record_deleted(session, obj.id)
+
+    def _after_rollback(self, session):
+        session.info.pop(PENDING_KEY, None)
+
+    def _after_commit(self, session):
+        pending = session.info.pop(PENDING_KEY, None)
+        if not pending:
+            return
+        crossed = []
+        with self._lock:
+            for product_id, (was_low, level) in pending.items():
+                if level is None or not level.is_low:
+                    self._levels.pop(product_id, None)
+                    continue
+                if self._loaded:
+                    self._levels[product_id] = level
+                if not was_low:
+                    crossed.append(level)
+        for level in crossed:
+            self.alerts += 1
+            for hook in list(self._hooks):
+                try:
+                    hook(level, session)
+                except Exception as e:
+                    print(f"⚠️ Low-stock alert hook {getattr(hook, '__name__', hook)!r} failed: {e}")
+
+
+def print_low_stock_alert(level, session=None):
+    """Alert hook that prints a warning line."""
+    print(
+        f"🚨 Low stock: '{level.name}' (SKU: {level.sku}) is down to {level.stock_quantity} unit(s), "
+        f"at or below its reorder point of {level.reorder_point}. Suggested reorder: {level.reorder_qty} unit(s)."
+    )
+
+
+def print_low_stock_rows(levels):
+    """Print low-stock rows as a table and return how many were printed."""
+    count = 0
+    for level in levels:
+        if count == 0:
+            print("ID | Product Name           | SKU        | Stock | Reorder Pt | Reorder Qty | Short")
+            print("---|------------------------|------------|-------|------------|-------------|------")
+        print(
+            f"{str(level.id).ljust(2)} | {level.name.ljust(22)[:22]} | {level.sku.ljust(10)[:10]} | "
+            f"{str(level.stock_quantity).ljust(5)} | {str(level.reorder_point).ljust(10)} | "
+            f"{str(level.reorder_qty).ljust(11)} | {level.shortfall}"
+        )
+        count += 1
+    if count:
+        print("-------------------------------------------------------------------------------\n")
+    return count
+
+
+def print_low_stock(session, limit=None):
+    """Print the low-stock report."""
+    print("\n--- 🚨 Low Stock (at or below reorder point) ---")
+    levels = low_stock_watchlist.levels(session)
+    if not print_low_stock_rows(levels[:limit] if limit else levels):
+        print(" (Every product is above its reorder point.)\n")
+    return levels
+
+
+low_stock_watchlist = LowStockWatchlist().attach(Session)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="List products at or below their reorder point.")
+    parser.add_argument("--limit", type=int, default=None, help="show at most this many products")
+    args = parser.parse_args(argv)
+    session = Session()
+    try:
+        levels = print_low_stock(session, args.limit)
+    finally:
+        session.close()
+    return 1 if levels else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
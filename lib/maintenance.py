@@ -0,0 +1,68 @@
+# lib/maintenance.py
+
+import argparse
+import sys
+
+from sqlalchemy import bindparam, update
+
+from lib.models import Session, Order
+from lib.helpers import order_item_totals_query, STREAM_BATCH_SIZE
+
+TOTAL_TOLERANCE = 0.01
+
+
+def find_order_total_drift(session):
+    """Yield orders whose stored item_count/total_amount disagree with their order_items."""
+    for row in order_item_totals_query(session).yield_per(STREAM_BATCH_SIZE):
+        if row.item_count != row.actual_item_count or abs(row.total_amount - row.actual_total) > TOTAL_TOLERANCE:
+            yield row
+
+
+def verify_order_totals(fix=False, max_report=20):
+    """Report (and optionally repair) drift in the denormalized order totals. Returns the number of drifted orders."""
+    session = Session()
+    try:
+        drifted = list(find_order_total_drift(session))
+        print("\n--- 🧮 Order Totals Check ---")
+        if not drifted:
+            print("✅ Every order's item_count and total_amount match its items.")
+            return 0
+
+        print(f"⚠️ {len(drifted)} order(s) have drifted (showing up to {max_report}):")
+        for row in drifted[:max_report]:
+            print(f"  - Order #{row.id}: items {row.item_count} vs {row.actual_item_count}, "
+                  f"total KSH-{row.total_amount:.2f} vs KSH-{row.actual_total:.2f}")
+        if fix:
+            orders = Order.__table__
+            session.execute(
+                update(orders)
+                .where(orders.c.id == bindparam("order_id"))
+                .values(item_count=bindparam("actual_item_count"), total_amount=bindparam("actual_total")),
+                [
+                    {"order_id": row.id, "actual_item_count": row.actual_item_count, "actual_total": row.actual_total}
+                    for row in drifted
+                ],
+            )
+            session.commit()
+            print(f"🔧 Repaired {len(drifted)} order(s).")
+        return len(drifted)
+    finally:
+        session.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Maintenance jobs for the warehouse database.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    verify = subparsers.add_parser("verify-totals", help="detect drift in denormalized order totals")
+    verify.add_argument("--fix", action="store_true", help="rewrite drifted orders from their items")
+
+    args = parser.parse_args(argv)
+    if args.command == "verify-totals":
+        drifted = verify_order_totals(fix=args.fix)
+        return 1 if drifted and not args.fix else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,10 @@
 # lib/models/__init__.py
 
-from .models import Base, engine, Session
-from .models import Product, Order, OrderItem, Shipment
+from .models import Base, Session, get_engine
+from .models import Product, Order, OrderItem, Shipment, StockMovement, StockSnapshot
+
+
+def __getattr__(name):
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -7,11 +7,16 @@ from sqlalchemy import (
     MetaData,
     Enum,
     Float,
-    CheckConstraint
+    CheckConstraint,
+    Index,
+    text,
+    DDL,
+    event,
 )
 from sqlalchemy.orm import declarative_base, relationship, sessionmaker
-from sqlalchemy import create_engine
 from datetime import datetime
+from threading import Lock
+from lib.config import make_engine
 
 convention = {
     "ix": "ix_%(column_0_label)s",
@@ -24,13 +29,44 @@ metadata = MetaData(naming_convention=convention)
 
 Base = declarative_base(metadata=metadata)
 
-DATABASE_URL = "sqlite:///db/warehouse.db"
-engine = create_engine(DATABASE_URL, echo=False)
+_engine = None
+_engine_lock = Lock()
 
-Session = sessionmaker(bind=engine)
+
+def get_engine():
+    """Create the engine for the configured database on first use and return it."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = make_engine()
+    return _engine
+
+
+class LazySessionmaker(sessionmaker):
+    """A sessionmaker that binds to the engine only when the first session is opened."""
+
+    def __call__(self, **local_kw):
+        if self.kw.get("bind") is None:
+            self.configure(bind=get_engine())
+        return super().__call__(**local_kw)
+
+
+Session = LazySessionmaker()
+
+
+def __getattr__(name):
+    # `from lib.models.models import engine` keeps working; the engine is only built when asked for.
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 ORDER_STATUSES = ("pending", "fulfilled", "cancelled")
 DELIVERY_STATUSES = ("not shipped", "in transit", "delivered")
+MOVEMENT_REASONS = (
+    "order placed", "item added", "item removed", "order deleted", "cancelled",
+    "fulfilled", "adjustment", "import", "reconciliation", "simulation",
+)
 
 
 class Product(Base):
@@ -41,10 +77,26 @@ class Product(Base):
     sku = Column(String(100), unique=True, nullable=False)
     stock_quantity = Column(Integer, nullable=False, default=0)
     price_per_unit = Column(Float, nullable=False)
-    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now, index=True)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    reorder_point = Column(Integer, nullable=False, default=0, server_default="0")
+    reorder_qty = Column(Integer, nullable=False, default=0, server_default="0")
 
     order_items = relationship("OrderItem", backref="product", cascade="all, delete-orphan")
 
+    # Partial index holding only products at or below their reorder point, so
+    # the low-stock report reads a few index entries instead of the whole table.
+    __table_args__ = (
+        Index(
+            "ix_products_low_stock", "stock_quantity",
+            sqlite_where=text("stock_quantity <= reorder_point"),
+            postgresql_where=text("stock_quantity <= reorder_point"),
+        ),
+    )
+
+    # Optimistic locking: ORM updates only apply if nobody changed the row since it was read.
+    __mapper_args__ = {"version_id_col": version}
+
     def __repr__(self):
         return (
             f"<Product(id={self.id}, name='{self.name}', "
@@ -57,19 +109,54 @@ class Product(Base):
     def is_in_stock(self, quantity):
         return self.stock_quantity >= quantity
 
+    def is_low_stock(self):
+        return self.stock_quantity <= self.reorder_point
+
+
+# Full-text search over product names and SKUs: an external-content FTS5
+# table kept in sync by triggers. Only name and SKU changes touch the index,
+# so stock updates stay cheap. The migration creates the same objects; these
+# listeners cover databases built with Base.metadata.create_all().
+PRODUCT_SEARCH_DDL = (
+    "CREATE VIRTUAL TABLE products_fts USING fts5("
+    "name, sku, content='products', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    "CREATE TRIGGER products_fts_insert AFTER INSERT ON products BEGIN "
+    "INSERT INTO products_fts (rowid, name, sku) VALUES (new.id, new.name, new.sku); END",
+    "CREATE TRIGGER products_fts_delete AFTER DELETE ON products BEGIN "
+    "INSERT INTO products_fts (products_fts, rowid, name, sku) VALUES ('delete', old.id, old.name, old.sku); END",
+    "CREATE TRIGGER products_fts_update AFTER UPDATE OF name, sku ON products BEGIN "
+    "INSERT INTO products_fts (products_fts, rowid, name, sku) VALUES ('delete', old.id, old.name, old.sku); "
+    "INSERT INTO products_fts (rowid, name, sku) VALUES (new.id, new.name, new.sku); END",
+)
+for statement in PRODUCT_SEARCH_DDL:
+    event.listen(Product.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+event.listen(
+    Product.__table__, "before_drop", DDL("DROP TABLE IF EXISTS products_fts").execute_if(dialect="sqlite")
+)
+
 
 class Order(Base):
     __tablename__ = "orders"
 
     id = Column(Integer, primary_key=True, nullable=False)
     customer_name = Column(String(255), nullable=False)
-    order_date = Column(DateTime, nullable=False, default=datetime.now)
-    status = Column(Enum(*ORDER_STATUSES, name="order_status"), nullable=False, default="pending")
+    order_date = Column(DateTime, nullable=False, default=datetime.now, index=True)
+    status = Column(Enum(*ORDER_STATUSES, name="order_status"), nullable=False, default="pending", index=True)
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+    # Denormalized from order_items and kept up to date by the order services.
+    item_count = Column(Integer, nullable=False, default=0, server_default="0")
+    total_amount = Column(Float, nullable=False, default=0.0, server_default="0")
 
     order_items = relationship("OrderItem", backref="order", cascade="all, delete-orphan")
     shipment = relationship("Shipment", backref="order", uselist=False, cascade="all, delete-orphan")
 
+    # IDs are never reused, so a new row cannot collide with an archived one.
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    # True on the detached, read-only copies loaded from the archive database.
+    archived = False
+
     def __repr__(self):
         return (
             f"<Order(id={self.id}, customer='{self.customer_name}', "
@@ -79,21 +166,19 @@ class Order(Base):
     def __str__(self):
         return f"Order #{self.id} - {self.customer_name} - {self.status}"
 
-    def total_amount(self):
-        return sum(item.unit_price * item.quantity for item in self.order_items)
-
 
 class OrderItem(Base):
     __tablename__ = "order_items"
 
     id = Column(Integer, primary_key=True, nullable=False)
-    order_id = Column(Integer, ForeignKey("orders.id", ondelete="CASCADE"), nullable=False)
-    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
+    order_id = Column(Integer, ForeignKey("orders.id", ondelete="CASCADE"), nullable=False, index=True)
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), nullable=False, index=True)
     quantity = Column(Integer, nullable=False, default=1)
     unit_price = Column(Float, nullable=False)
 
     __table_args__ = (
         CheckConstraint('quantity > 0', name='ck_order_items_quantity_positive'),
+        {"sqlite_autoincrement": True},
     )
 
     def __repr__(self):
@@ -111,11 +196,13 @@ class Shipment(Base):
     __tablename__ = "shipments"
 
     id = Column(Integer, primary_key=True, nullable=False)
-    order_id = Column(Integer, ForeignKey("orders.id", ondelete="CASCADE"), nullable=False)
-    shipped_date = Column(DateTime, default=None)
-    delivery_status = Column(Enum(*DELIVERY_STATUSES, name="delivery_status"), nullable=False, default="not shipped")
+    order_id = Column(Integer, ForeignKey("orders.id", ondelete="CASCADE"), nullable=False, index=True, unique=True)
+    shipped_date = Column(DateTime, default=None, index=True)
+    delivery_status = Column(Enum(*DELIVERY_STATUSES, name="delivery_status"), nullable=False, default="not shipped", index=True)
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
 
+    __table_args__ = {"sqlite_autoincrement": True}
+
     def __repr__(self):
         return (
             f"<Shipment(id={self.id}, order_id={self.order_id}, "
@@ -129,4 +216,52 @@ class Shipment(Base):
         self.shipped_date = datetime.now()
         self.delivery_status = "in transit"
     def mark_delivered(self):
-        self.delivery_status = "delivered"
\ No newline at end of file
+        self.delivery_status = "delivered"
+
+
+class StockMovement(Base):
+    """One signed change to a product's stock, appended in the same transaction as the change."""
+
+    __tablename__ = "stock_movements"
+
+    id = Column(Integer, primary_key=True, nullable=False)
+    # No foreign keys: the ledger keeps the history of deleted products and orders.
+    product_id = Column(Integer, nullable=False, index=True)
+    occurred_at = Column(DateTime, nullable=False, default=datetime.now)
+    quantity_delta = Column(Integer, nullable=False)
+    reason = Column(Enum(*MOVEMENT_REASONS, name="movement_reason"), nullable=False)
+    order_id = Column(Integer)
+
+    # Snapshots refer to movements by ID, so IDs must never be reused after a prune.
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    def __repr__(self):
+        return (
+            f"<StockMovement(id={self.id}, product_id={self.product_id}, "
+            f"delta={self.quantity_delta}, reason='{self.reason}', at={self.occurred_at})>"
+        )
+
+
+class StockSnapshot(Base):
+    """
+    A product's stock as of its movement last_movement_id, which occurred at
+    taken_at. Every product gets an opening snapshot when it enters the ledger.
+    """
+
+    __tablename__ = "stock_snapshots"
+
+    id = Column(Integer, primary_key=True, nullable=False)
+    product_id = Column(Integer, nullable=False)
+    taken_at = Column(DateTime, nullable=False)
+    stock_quantity = Column(Integer, nullable=False)
+    last_movement_id = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("ix_stock_snapshots_product_id_taken_at", "product_id", "taken_at"),
+    )
+
+    def __repr__(self):
+        return (
+            f"<StockSnapshot(product_id={self.product_id}, stock={self.stock_quantity}, "
+            f"taken_at={self.taken_at}, last_movement_id={self.last_movement_id})>"
+        )
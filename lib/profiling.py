@@ -0,0 +1,219 @@
+# lib/profiling.py
+
+import cProfile
+import io
+import os
+import pstats
+import re
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import wraps
+
+PROFILE_ENV = "WAREHOUSE_PROFILE"
+N_PLUS_ONE_ENV = "WAREHOUSE_PROFILE_N_PLUS_ONE"
+DEFAULT_N_PLUS_ONE_THRESHOLD = 10
+DEFAULT_TOP_STATEMENTS = 3
+DEFAULT_TOP_FUNCTIONS = 15
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+_SELECT_LIST = re.compile(r"^SELECT .+? FROM ", re.IGNORECASE)
+SHAPE_DISPLAY_WIDTH = 140
+
+
+def statement_shape(statement):
+    """Reduce a SQL statement to its shape: literals become ?, IN lists collapse, whitespace is normalized."""
+    shape = _STRING_LITERAL.sub("?", statement)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = _PLACEHOLDER_LIST.sub("(?...)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+def display_shape(shape):
+    """Shorten a statement shape for printing, dropping the SELECT column list."""
+    shape = _SELECT_LIST.sub("SELECT … FROM ", shape, count=1)
+    return shape if len(shape) <= SHAPE_DISPLAY_WIDTH else shape[:SHAPE_DISPLAY_WIDTH - 1] + "…"
+
+
+class CountingCursor:
+    """Wraps a DBAPI cursor and adds the rows fetched through it to a profile."""
+
+    __slots__ = ("_cursor", "_profile")
+
+    def __init__(self, cursor, profile):
+        self._cursor = cursor
+        self._profile = profile
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._profile.rows += 1
+        return row
+
+    def fetchmany(self, *args):
+        rows = self._cursor.fetchmany(*args)
+        self._profile.rows += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._profile.rows += len(rows)
+        return rows
+
+    def __iter__(self):
+        for row in self._cursor:
+            self._profile.rows += 1
+            yield row
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class ActionProfile:
+    """SQL statistics gathered while one CLI action or service call ran."""
+
+    def __init__(self, name):
+        self.name = name
+        self.statements = 0
+        self.db_time = 0.0
+        self.rows = 0
+        self.wall_time = 0.0
+        self.shape_counts = defaultdict(int)
+        self.shape_times = defaultdict(float)
+        self.cprofile_stats = None
+
+    def record(self, statement, elapsed):
+        self.statements += 1
+        self.db_time += elapsed
+        shape = statement_shape(statement)
+        self.shape_counts[shape] += 1
+        self.shape_times[shape] += elapsed
+
+    def repeated_statements(self, threshold):
+        """Statement shapes run more than threshold times: the usual signature of an N+1 query."""
+        return sorted(
+            ((count, shape) for shape, count in self.shape_counts.items() if count > threshold),
+            reverse=True,
+        )
+
+    def slowest_statements(self, limit=DEFAULT_TOP_STATEMENTS):
+        return sorted(self.shape_times.items(), key=lambda entry: entry[1], reverse=True)[:limit]
+
+
+class SqlProfiler:
+    """
+    Collects per-action SQL statistics from an engine's cursor events.
+    Listeners are only attached while an action is being profiled, so an
+    idle profiler costs nothing. Actions nest: a statement run inside an
+    inner action counts towards every action enclosing it.
+    """
+
+    def __init__(self, engine, n_plus_one_threshold=DEFAULT_N_PLUS_ONE_THRESHOLD, use_cprofile=False):
+        self.engine = engine
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.use_cprofile = use_cprofile
+        self.active = []
+
+    def before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        # Kept on the execution context, so a statement that raises leaves nothing behind.
+        if context is not None:
+            context.profile_started = time.perf_counter()
+
+    def after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "profile_started", None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        for profile in self.active:
+            profile.record(statement, elapsed)
+            if cursor.description is None:
+                profile.rows += max(cursor.rowcount, 0)
+            else:
+                # The result object reads rows from context.cursor after this hook returns.
+                context.cursor = CountingCursor(context.cursor, profile)
+
+    @contextmanager
+    def action(self, name):
+        """Profile the SQL run inside the block and yield its ActionProfile."""
+        from sqlalchemy import event
+        profile = ActionProfile(name)
+        outermost = not self.active
+        if outermost:
+            event.listen(self.engine, "before_cursor_execute", self.before_cursor_execute)
+            event.listen(self.engine, "after_cursor_execute", self.after_cursor_execute)
+        self.active.append(profile)
+        # Only one cProfile.Profile can be enabled at a time, so nested actions go without.
+        profiler = cProfile.Profile() if self.use_cprofile and outermost else None
+        started = time.perf_counter()
+        try:
+            if profiler:
+                profiler.enable()
+            yield profile
+        finally:
+            if profiler:
+                profiler.disable()
+                profile.cprofile_stats = pstats.Stats(profiler)
+            profile.wall_time = time.perf_counter() - started
+            self.active.remove(profile)
+            if outermost:
+                event.remove(self.engine, "before_cursor_execute", self.before_cursor_execute)
+                event.remove(self.engine, "after_cursor_execute", self.after_cursor_execute)
+
+    def profiled(self, name=None):
+        """Decorator that profiles every call of a function, e.g. a service call."""
+
+        def decorate(func):
+            label = name or func.__name__
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                profile = None
+                try:
+                    with self.action(label) as profile:
+                        return func(*args, **kwargs)
+                finally:
+                    if profile is not None:
+                        print_profile(profile, self.n_plus_one_threshold)
+
+            return wrapper
+
+        return decorate
+
+
+def print_profile(profile, n_plus_one_threshold=DEFAULT_N_PLUS_ONE_THRESHOLD, top_functions=DEFAULT_TOP_FUNCTIONS):
+    """Print the summary of one profiled action."""
+    print(
+        f"\n📊 Profile of '{profile.name}': {profile.statements} SQL statement(s), "
+        f"{profile.db_time * 1000:.1f} ms in the database, {profile.rows:,} row(s), "
+        f"{profile.wall_time * 1000:.1f} ms total"
+    )
+    for shape, elapsed in profile.slowest_statements():
+        print(f"   {profile.shape_counts[shape]:>5}× {elapsed * 1000:8.1f} ms  {display_shape(shape)}")
+    for count, shape in profile.repeated_statements(n_plus_one_threshold):
+        print(f"⚠️ Possible N+1: the same statement ran {count} times: {display_shape(shape)}")
+    if profile.cprofile_stats is not None:
+        out = io.StringIO()
+        profile.cprofile_stats.stream = out
+        profile.cprofile_stats.sort_stats("cumulative").print_stats(top_functions)
+        print(out.getvalue().rstrip())
+
+
+def profiler_from_env(enabled=False, use_cprofile=False, n_plus_one_threshold=None, engine=None):
+    """
+    Build a SqlProfiler when profiling is switched on, by argument or by
+    WAREHOUSE_PROFILE=1 (or =cprofile), otherwise return None.
+    Without an explicit engine the application's engine is used.
+    """
+    setting = os.environ.get(PROFILE_ENV, "").strip().lower()
+    enabled = enabled or use_cprofile or setting not in ("", "0", "false", "no", "off")
+    if not enabled:
+        return None
+    if n_plus_one_threshold is None:
+        n_plus_one_threshold = int(os.environ.get(N_PLUS_ONE_ENV, DEFAULT_N_PLUS_ONE_THRESHOLD))
+    if engine is None:
+        from lib.models import get_engine
+        engine = get_engine()
+    return SqlProfiler(engine, n_plus_one_threshold, use_cprofile or setting == "cprofile")
@@ -0,0 +1,300 @@
+# lib/reports.py
+
+import argparse
+import csv
+import gc
+import sys
+import time
+from datetime import datetime
+from itertools import chain
+
+import numpy as np
+
+from lib.models import get_engine
+from lib.models.models import ORDER_STATUSES
+
+DEFAULT_CHUNK_SIZE = 100000
+DEFAULT_TOP = 10
+DEFAULT_COVER_WINDOW = 30
+REPORTS = ("summary", "top", "products", "daily", "status")
+
+# Statuses whose items count as sold for per-product revenue, sell-through and cover.
+SOLD_STATUSES = tuple(status for status in ORDER_STATUSES if status != "cancelled")
+
+# Days since 1970-01-01, computed by SQLite so no datetime parsing happens in Python.
+EPOCH_DAY_SQL = "CAST(julianday(o.order_date) - 2440587.5 AS INTEGER)"
+STATUS_CODE_SQL = "CASE o.status {} END".format(
+    " ".join(f"WHEN '{status}' THEN {code}" for code, status in enumerate(ORDER_STATUSES))
+)
+
+
+def date_filter_sql(since=None, until=None):
+    """Build the WHERE clause and parameters restricting orders to [since, until)."""
+    clauses, params = [], []
+    if since is not None:
+        clauses.append("o.order_date >= ?")
+        params.append(since.isoformat(" "))
+    if until is not None:
+        clauses.append("o.order_date < ?")
+        params.append(until.isoformat(" "))
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), tuple(params)
+
+
+def iter_chunks(conn, sql, params, num_columns, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Run a query on the raw DBAPI cursor and yield its rows as float arrays of at most chunk_size rows.
+    The garbage collector is paused while each chunk is fetched: the row tuples
+    are freed right away, and scanning them every few thousand allocations
+    would otherwise cost more than the conversion itself.
+    """
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(sql, params)
+        while True:
+            gc_was_enabled = gc.isenabled()
+            gc.disable()
+            try:
+                rows = cursor.fetchmany(chunk_size)
+                chunk = np.fromiter(chain.from_iterable(rows), dtype=np.float64, count=len(rows) * num_columns)
+            finally:
+                if gc_was_enabled:
+                    gc.enable()
+            if not rows:
+                return
+            yield chunk.reshape(len(rows), num_columns)
+    finally:
+        cursor.close()
+
+
+def fetch_products(conn):
+    """Load product IDs, SKUs, names and stock levels as arrays sorted by ID."""
+    rows = conn.exec_driver_sql("SELECT id, sku, name, stock_quantity FROM products ORDER BY id").all()
+    product_ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+    stock = np.fromiter((row[3] for row in rows), dtype=np.float64, count=len(rows))
+    skus = [row[1] for row in rows]
+    names = [row[2] for row in rows]
+    return product_ids, skus, names, stock
+
+
+def fetch_orders(conn, since=None, until=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Return two arrays indexed by order ID: the order's day (days since the epoch)
+    and its status code, with -1 for IDs that are missing or outside [since, until).
+    """
+    max_id = conn.exec_driver_sql("SELECT MAX(id) FROM orders").scalar() or 0
+    days = np.zeros(max_id + 1, dtype=np.int32)
+    statuses = np.full(max_id + 1, -1, dtype=np.int8)
+    where, params = date_filter_sql(since, until)
+    sql = f"SELECT o.id, {EPOCH_DAY_SQL}, {STATUS_CODE_SQL} FROM orders o{where}"
+    for chunk in iter_chunks(conn, sql, params, 3, chunk_size):
+        ids = chunk[:, 0].astype(np.int64)
+        days[ids] = chunk[:, 1]
+        statuses[ids] = chunk[:, 2]
+    return days, statuses
+
+
+def iter_item_chunks(conn, since=None, until=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Stream order_items as arrays of order_id, product_id, quantity and unit_price.
+    Without a date range this is a plain table scan; with one, the orders in
+    range are found through the order_date index and only their items are read.
+    """
+    where, params = date_filter_sql(since, until)
+    if where:
+        sql = ("SELECT oi.order_id, oi.product_id, oi.quantity, oi.unit_price "
+               f"FROM orders o JOIN order_items oi ON oi.order_id = o.id{where}")
+    else:
+        sql = "SELECT order_id, product_id, quantity, unit_price FROM order_items"
+    return iter_chunks(conn, sql, params, 4, chunk_size)
+
+
+class SalesReport:
+    """Running sales aggregates over streamed order item chunks, plus derived inventory metrics."""
+
+    def __init__(self, product_ids, skus, names, stock, order_days, order_statuses,
+                 cover_window=DEFAULT_COVER_WINDOW):
+        self.product_ids = product_ids
+        self.skus = skus
+        self.names = names
+        self.stock = stock
+        self.order_statuses = order_statuses
+        in_range = order_days[order_statuses >= 0]
+        self.first_day = int(in_range.min())
+        last_day = int(in_range.max())
+        self.order_days = order_days - self.first_day
+        self.num_days = last_day - self.first_day + 1
+        self.cover_window = cover_window
+        self.cover_start = last_day - self.first_day - cover_window + 1
+        self.sold = np.zeros(len(ORDER_STATUSES), dtype=bool)
+        self.sold[[ORDER_STATUSES.index(status) for status in SOLD_STATUSES]] = True
+
+        num_products, num_statuses = len(product_ids), len(ORDER_STATUSES)
+        self.units = np.zeros(num_products)
+        self.revenue = np.zeros(num_products)
+        self.recent_units = np.zeros(num_products)
+        self.daily_revenue = np.zeros((self.num_days, num_statuses))
+        self.status_lines = np.zeros(num_statuses)
+        self.status_units = np.zeros(num_statuses)
+        self.status_revenue = np.zeros(num_statuses)
+        self.rows = 0
+
+    def add_chunk(self, chunk):
+        """Fold one (order_id, product_id, quantity, unit_price) chunk into the totals."""
+        order_id = chunk[:, 0].astype(np.int64)
+        # Items of orders created after the orders were loaded, or outside the date range, are skipped.
+        order_id[order_id >= len(self.order_statuses)] = 0
+        status = self.order_statuses[order_id].astype(np.int64)
+        keep = status >= 0
+        chunk, order_id, status = chunk[keep], order_id[keep], status[keep]
+        product_id, quantity, unit_price = chunk[:, 1], chunk[:, 2], chunk[:, 3]
+        day = self.order_days[order_id].astype(np.int64)
+        amount = quantity * unit_price
+        num_products, num_statuses = len(self.product_ids), len(ORDER_STATUSES)
+        self.rows += len(chunk)
+
+        self.status_lines += np.bincount(status, minlength=num_statuses)
+        self.status_units += np.bincount(status, weights=quantity, minlength=num_statuses)
+        self.status_revenue += np.bincount(status, weights=amount, minlength=num_statuses)
+        self.daily_revenue += np.bincount(
+            day * num_statuses + status, weights=amount, minlength=self.num_days * num_statuses
+        ).reshape(self.num_days, num_statuses)
+
+        if not num_products:
+            return
+        position = np.searchsorted(self.product_ids, product_id.astype(np.int64))
+        position = np.minimum(position, num_products - 1)
+        sold = self.sold[status] & (self.product_ids[position] == product_id)
+        position, quantity, amount, day = position[sold], quantity[sold], amount[sold], day[sold]
+        self.units += np.bincount(position, weights=quantity, minlength=num_products)
+        self.revenue += np.bincount(position, weights=amount, minlength=num_products)
+        recent = day >= self.cover_start
+        self.recent_units += np.bincount(position[recent], weights=quantity[recent], minlength=num_products)
+
+    @property
+    def sell_through(self):
+        """Share of available units that sold in the period: sold / (sold + on hand)."""
+        available = self.units + np.maximum(self.stock, 0)
+        return np.divide(self.units, available, out=np.zeros_like(available), where=available > 0)
+
+    @property
+    def stock_cover(self):
+        """Days of inventory left at the average daily sales rate of the last cover_window days."""
+        daily_rate = self.recent_units / self.cover_window
+        return np.divide(self.stock, daily_rate, out=np.full_like(daily_rate, np.inf), where=daily_rate > 0)
+
+    def top_positions(self, n=None):
+        """Product positions ordered by revenue, highest first, limited to n."""
+        if n is not None and n < len(self.revenue):
+            candidates = np.argpartition(-self.revenue, n)[:n]
+            return candidates[np.argsort(-self.revenue[candidates], kind="stable")]
+        return np.argsort(-self.revenue, kind="stable")
+
+    def product_rows(self, n=None):
+        sell_through, cover = self.sell_through, self.stock_cover
+        for i in self.top_positions(n):
+            yield [
+                self.skus[i], self.names[i], int(self.units[i]), round(self.revenue[i], 2),
+                int(self.stock[i]), round(sell_through[i] * 100, 2),
+                "inf" if np.isinf(cover[i]) else round(cover[i], 1),
+            ]
+
+    def daily_rows(self):
+        totals = self.daily_revenue.sum(axis=1)
+        for offset in np.flatnonzero(self.daily_revenue.any(axis=1)):
+            day = str(np.datetime64(int(self.first_day + offset), "D"))
+            yield [day] + [round(v, 2) for v in self.daily_revenue[offset]] + [round(totals[offset], 2)]
+
+    def status_rows(self):
+        for code, status in enumerate(ORDER_STATUSES):
+            yield [status, int(self.status_lines[code]), int(self.status_units[code]), round(self.status_revenue[code], 2)]
+
+
+PRODUCT_HEADERS = ["sku", "name", "units_sold", "revenue", "stock", "sell_through_pct", "cover_days"]
+DAILY_HEADERS = ["date"] + list(ORDER_STATUSES) + ["total"]
+STATUS_HEADERS = ["status", "lines", "units", "revenue"]
+
+
+def build_sales_report(since=None, until=None, cover_window=DEFAULT_COVER_WINDOW,
+                       chunk_size=DEFAULT_CHUNK_SIZE, engine=None):
+    """
+    Aggregate every order item in [since, until) chunk by chunk. Returns None when there are no orders.
+    Memory is bounded by one chunk of items plus a few bytes per order and per product.
+    """
+    with (engine or get_engine()).connect() as conn:
+        order_days, order_statuses = fetch_orders(conn, since, until, chunk_size)
+        if not (order_statuses >= 0).any():
+            return None
+        report = SalesReport(*fetch_products(conn), order_days, order_statuses, cover_window=cover_window)
+        for chunk in iter_item_chunks(conn, since, until, chunk_size):
+            report.add_chunk(chunk)
+    return report
+
+
+def print_table(title, headers, rows):
+    rows = [[f"{v:,.2f}" if isinstance(v, float) else str(v) for v in row] for row in rows]
+    widths = [max([len(h)] + [len(row[i]) for row in rows]) for i, h in enumerate(headers)]
+    print(f"\n--- {title} ---")
+    print(" | ".join(h.ljust(w) for h, w in zip(headers, widths)))
+    print("-|-".join("-" * w for w in widths))
+    for row in rows:
+        print(" | ".join(v.ljust(w) for v, w in zip(row, widths)))
+    if not rows:
+        print(" (No rows.)")
+
+
+def write_report(report, name, top=DEFAULT_TOP, output_format="table", out=None):
+    sections = {
+        "status": ("📊 Revenue by Order Status", STATUS_HEADERS, report.status_rows),
+        "daily": ("📅 Revenue by Day", DAILY_HEADERS, report.daily_rows),
+        "products": ("📦 Sales and Stock by Product", PRODUCT_HEADERS, lambda: report.product_rows()),
+        "top": (f"🏆 Top {top} SKUs by Revenue", PRODUCT_HEADERS, lambda: report.product_rows(top)),
+    }
+    names = ("status", "top") if name == "summary" else (name,)
+    for index, section in enumerate(names):
+        title, headers, rows = sections[section]
+        if output_format == "csv":
+            writer = csv.writer(out or sys.stdout)
+            if index:
+                writer.writerow([])
+            writer.writerow(headers)
+            writer.writerows(rows())
+        else:
+            print_table(title, headers, list(rows()))
+
+
+def parse_date(value):
+    return datetime.strptime(value, "%Y-%m-%d")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sales and inventory reports computed from order items.")
+    parser.add_argument("report", nargs="?", default="summary", choices=REPORTS, help="which report to print")
+    parser.add_argument("--since", type=parse_date, help="only orders on or after this date (YYYY-MM-DD)")
+    parser.add_argument("--until", type=parse_date, help="only orders before this date (YYYY-MM-DD)")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help="SKUs in the top report")
+    parser.add_argument("--cover-window", type=int, default=DEFAULT_COVER_WINDOW,
+                        help="days of sales used for the stock cover rate")
+    parser.add_argument("--format", dest="output_format", choices=("table", "csv"), default="table")
+    parser.add_argument("--output", help="write CSV to this file instead of stdout")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="order items per chunk")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    report = build_sales_report(args.since, args.until, args.cover_window, args.chunk_size)
+    if report is None:
+        print("📭 No orders in range.")
+        return
+    elapsed = time.perf_counter() - started
+
+    if args.output:
+        with open(args.output, "w", newline="") as f:
+            write_report(report, args.report, args.top, "csv", f)
+        print(f"💾 {args.report} report written to {args.output}")
+    else:
+        write_report(report, args.report, args.top, args.output_format)
+    if args.output_format == "table" or args.output:
+        print(f"\n⏱️ {report.rows:,} order items aggregated in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# lib/search.py
+
+import argparse
+import re
+import sys
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, or_, text
+
+from lib.models import Session, Product
+
+DEFAULT_SEARCH_LIMIT = 10
+# bm25 column weights (name, sku): a SKU hit is a much stronger signal than a word in a name.
+RANK = text("bm25(products_fts, 1.0, 4.0)")
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+# Not in Base.metadata: the virtual table is created by migration (or the
+# after_create listeners on products), never by create_all itself.
+products_fts = Table(
+    "products_fts", MetaData(),
+    Column("rowid", Integer, primary_key=True),
+    Column("name", String),
+    Column("sku", String),
+)
+
+
+def fts_query(terms):
+    """
+    Turn free text into an FTS5 query where every word is a prefix match and
+    all words must match. Punctuation inside a word is kept as a phrase, so
+    'LS-00004' matches SKU LS-0000412 but not a name containing 'ls' and '00004'
+    far apart. Returns None when there is nothing to search for.
+    """
+    phrases = []
+    for word in terms.split():
+        tokens = _TOKEN.findall(word)
+        if tokens:
+            phrases.append('"' + " ".join(tokens) + '"*')
+    return " ".join(phrases) or None
+
+
+def search_products(session, terms, limit=DEFAULT_SEARCH_LIMIT):
+    """Products whose name or SKU matches every word of terms as a prefix, best match first."""
+    query = fts_query(terms)
+    if query is None:
+        return []
+    if session.get_bind().dialect.name != "sqlite":
+        patterns = [f"%{word}%" for word in terms.split()]
+        return (
+            session.query(Product)
+            .filter(*(or_(Product.name.ilike(p), Product.sku.ilike(p)) for p in patterns))
+            .order_by(Product.sku)
+            .limit(limit)
+            .all()
+        )
+    return (
+        session.query(Product)
+        .join(products_fts, products_fts.c.rowid == Product.id)
+        .filter(text("products_fts MATCH :fts_query"))
+        .order_by(RANK)
+        .limit(limit)
+        .params(fts_query=query)
+        .all()
+    )
+
+
+def rebuild_search_index(session):
+    """Re-index every product, e.g. after products were changed with triggers disabled."""
+    session.execute(text("INSERT INTO products_fts (products_fts) VALUES ('rebuild')"))
+    session.commit()
+
+
+def print_search_results(session, terms, limit=DEFAULT_SEARCH_LIMIT):
+    """Print the products matching terms and return them."""
+    from lib.helpers import print_product_rows
+    products = search_products(session, terms, limit)
+    print(f"\n--- 🔎 Products matching '{terms}' ---")
+    if not print_product_rows(products):
+        print(" (No products match. Try fewer or shorter words.)\n")
+    return products
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Search products by name or SKU prefix.")
+    parser.add_argument("terms", nargs="*", help="words to match, e.g. 'laptop stand' or 'LS-00004'")
+    parser.add_argument("--limit", type=int, default=DEFAULT_SEARCH_LIMIT, help="show at most this many products")
+    parser.add_argument("--rebuild", action="store_true", help="rebuild the search index from the products table")
+    args = parser.parse_args(argv)
+    session = Session()
+    try:
+        if args.rebuild:
+            rebuild_search_index(session)
+            print("✅ Search index rebuilt.")
+        if args.terms:
+            return 0 if print_search_results(session, " ".join(args.terms), args.limit) else 1
+    finally:
+        session.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,131 +1,303 @@
 #lib/seed.py
 
-from lib.models import Session, Product, Order, OrderItem, Shipment
+import argparse
+import os
+import random
+import time
+from contextlib import contextmanager
 from datetime import datetime
+from itertools import accumulate
 
-def seed_database():
+import numpy as np
+from faker import Faker
+
+from lib.config import get_archive_path, get_sqlite_pragmas
+from lib.models import get_engine, Product, Order, OrderItem, Shipment, StockMovement, StockSnapshot
+
+DEFAULT_PRODUCTS = 50
+DEFAULT_ORDERS = 200
+DEFAULT_ITEMS_PER_ORDER = (1, 8)
+DEFAULT_SEED = 42
+ORDER_BATCH_SIZE = 50000
+NAME_POOL_SIZE = 5000
+BRAND_POOL_SIZE = 500
+SEED_REORDER_POINT = 20
+SEED_REORDER_QTY = 100
+ORDER_HISTORY_START = datetime(2025, 1, 1)
+SECONDS_IN_YEAR = 365 * 24 * 3600
+
+PRODUCT_CATEGORIES = [
+    ("Mouse", "MS", 800, 6000),
+    ("Keyboard", "KB", 1500, 15000),
+    ("Monitor", "MON", 12000, 90000),
+    ("USB-C Hub", "HUB", 1200, 6000),
+    ("Headphones", "HP", 2000, 30000),
+    ("External SSD", "SSD", 5000, 25000),
+    ("Webcam", "CAM", 2500, 12000),
+    ("Power Bank", "PB", 1500, 7000),
+    ("Laptop Stand", "LS", 1000, 5000),
+    ("HDMI Cable", "HDMI", 300, 2000),
+]
+
+ORDER_STATUS_WEIGHTS = (("fulfilled", 70), ("pending", 20), ("cancelled", 10))
+DELIVERY_STATUS_WEIGHTS = (("delivered", 75), ("in transit", 15), ("not shipped", 10))
+
+ORDER_COLUMNS = ("id", "customer_name", "order_date", "status", "updated_at", "item_count", "total_amount")
+ORDER_ITEM_COLUMNS = ("id", "order_id", "product_id", "quantity", "unit_price")
+SHIPMENT_COLUMNS = ("order_id", "shipped_date", "delivery_status", "updated_at")
+
+
+def parse_range(value):
+    """Parse an 'a..b' range (or a single number) into a (low, high) tuple."""
+    low, _, high = value.partition("..")
+    low, high = int(low), int(high or low)
+    if low < 1 or high < low:
+        raise argparse.ArgumentTypeError(f"invalid range '{value}', expected e.g. 1..8")
+    return low, high
+
+
+def zipf_cum_weights(n, exponent=1.1):
+    """Cumulative Zipf weights so a handful of SKUs account for most sales."""
+    return list(accumulate(1.0 / (rank ** exponent) for rank in range(1, n + 1)))
+
+
+@contextmanager
+def deferred_indexes(conn, tables):
     """
-    Populates the database with sample data for products, orders, order items, and shipments.
-    It clears existing data before adding new records.
+    Drop the secondary indexes and triggers of the given tables for the
+    duration of a bulk load and recreate them from their saved SQL at the
+    end. Building an index once over the loaded rows is far cheaper than
+    updating it row by row, and the FTS index is rebuilt from products in
+    one pass instead of through its triggers.
     """
-    session = Session()
+    names = [table.name for table in tables]
+    placeholders = ", ".join("?" for _ in names)
+    with conn.begin():
+        saved = conn.exec_driver_sql(
+            f"SELECT type, name, sql FROM sqlite_master WHERE type IN ('index', 'trigger') "
+            f"AND sql IS NOT NULL AND tbl_name IN ({placeholders})",
+            tuple(names),
+        ).all()
+        for kind, name, _ in saved:
+            conn.exec_driver_sql(f"DROP {kind.upper()} {name}")
     try:
-        print("--- 🌱 Starting database seeding process ---")
-
-        print("\n🗑️ Clearing all existing data from tables...")
-        session.query(Shipment).delete()
-        session.query(OrderItem).delete()
-        session.query(Order).delete()
-        session.query(Product).delete()
-        session.commit()
-        print("✅ All previous data successfully deleted.")
-
-        print("\n➕ Adding sample products to inventory...")
-        products_data = [
-            {"name": "Wireless Ergonomic Mouse", "sku": "WM-ERGO-001", "price_per_unit": 2500.00, "stock_quantity": 100},
-            {"name": "Mechanical Gaming Keyboard", "sku": "KB-MECH-G", "price_per_unit": 8500.00, "stock_quantity": 50},
-            {"name": "Ultra HD 4K Monitor 27''", "sku": "MON-UHD-27", "price_per_unit": 35000.00, "stock_quantity": 30},
-            {"name": "USB-C Hub 7-in-1", "sku": "HUB-USBC-7", "price_per_unit": 1800.00, "stock_quantity": 200},
-            {"name": "Noise-Cancelling Headphones", "sku": "HP-NC-AUDIO", "price_per_unit": 12000.00, "stock_quantity": 75},
-            {"name": "External SSD 1TB", "sku": "SSD-EXT-1TB", "price_per_unit": 9000.00, "stock_quantity": 60},
-            {"name": "Webcam Full HD 1080p", "sku": "CAM-HD-1080", "price_per_unit": 4000.00, "stock_quantity": 90},
-            {"name": "Portable Power Bank 20000mAh", "sku": "PB-20K-MAH", "price_per_unit": 3000.00, "stock_quantity": 150}
-        ]
-        seeded_products = []
-        for p_data in products_data:
-            product = Product(**p_data)
-            session.add(product)
-            seeded_products.append(product)
-        session.commit() 
-        print(f"✅ Added {len(seeded_products)} products.")
-
-        print("\n🛒 Adding sample orders and their items...")
-
-      
-        order1 = Order(customer_name="Jane Doe", order_date=datetime(2025, 5, 20, 10, 30), status="fulfilled")
-        session.add(order1)
-        session.commit() 
-
-        
-        qty1_1 = 2
-        seeded_products[0].stock_quantity -= qty1_1 
-        order_item1_1 = OrderItem(order_id=order1.id, product_id=seeded_products[0].id, quantity=qty1_1, unit_price=seeded_products[0].price_per_unit)
-        session.add(order_item1_1)
-        
-        qty1_2 = 1
-        seeded_products[2].stock_quantity -= qty1_2 
-        order_item1_2 = OrderItem(order_id=order1.id, product_id=seeded_products[2].id, quantity=qty1_2, unit_price=seeded_products[2].price_per_unit)
-        session.add(order_item1_2)
-
-        order2 = Order(customer_name="John Smith", order_date=datetime(2025, 5, 22, 14, 00), status="pending")
-        session.add(order2)
-        session.commit()
-
-        
-        qty2_1 = 1
-        seeded_products[1].stock_quantity -= qty2_1 
-        order_item2_1 = OrderItem(order_id=order2.id, product_id=seeded_products[1].id, quantity=qty2_1, unit_price=seeded_products[1].price_per_unit)
-        session.add(order_item2_1)
-        
-        qty2_2 = 3
-        seeded_products[3].stock_quantity -= qty2_2 
-        order_item2_2 = OrderItem(order_id=order2.id, product_id=seeded_products[3].id, quantity=qty2_2, unit_price=seeded_products[3].price_per_unit)
-        session.add(order_item2_2)
-
-        order3 = Order(customer_name="Alice Brown", order_date=datetime(2025, 5, 25, 9, 00), status="cancelled")
-        session.add(order3)
-        session.commit()
-
-        
-        qty3_1 = 1
-        order_item3_1 = OrderItem(order_id=order3.id, product_id=seeded_products[4].id, quantity=qty3_1, unit_price=seeded_products[4].price_per_unit)
-        session.add(order_item3_1)
-
-        order4 = Order(customer_name="Bob White", order_date=datetime(2025, 5, 28, 16, 45), status="fulfilled")
-        session.add(order4)
-        session.commit()
-
-        
-        qty4_1 = 1
-        seeded_products[5].stock_quantity -= qty4_1
-        order_item4_1 = OrderItem(order_id=order4.id, product_id=seeded_products[5].id, quantity=qty4_1, unit_price=seeded_products[5].price_per_unit)
-        session.add(order_item4_1)
-       
-        qty4_2 = 1
-        seeded_products[6].stock_quantity -= qty4_2
-        order_item4_2 = OrderItem(order_id=order4.id, product_id=seeded_products[6].id, quantity=qty4_2, unit_price=seeded_products[6].price_per_unit)
-        session.add(order_item4_2)
-       
-        qty4_3 = 2
-        seeded_products[7].stock_quantity -= qty4_3
-        order_item4_3 = OrderItem(order_id=order4.id, product_id=seeded_products[7].id, quantity=qty4_3, unit_price=seeded_products[7].price_per_unit)
-        session.add(order_item4_3)
-
-        session.commit() 
-        print(f"✅ Added {session.query(Order).count()} orders and their items.")
-
-        
-        print("\n🚚 Adding sample shipments...")
-
-       
-        shipment1 = Shipment(order_id=order1.id, delivery_status="delivered", shipped_date=datetime(2025, 5, 21, 9, 00))
-        session.add(shipment1)
-
-        
-        shipment2 = Shipment(order_id=order4.id, delivery_status="in transit", shipped_date=datetime(2025, 5, 29, 10, 00))
-        session.add(shipment2)
-
-        session.commit()
-        print(f"✅ Added {session.query(Shipment).count()} shipments.")
-
-        print("\n--- 🎉 Database seeding complete! You're ready to go! ---")
-
-    except Exception as e:
-        session.rollback()
-        print(f"\n❌ An error occurred during seeding: {e}. All changes have been rolled back.")
+        yield
     finally:
-        session.close()
+        conn.rollback()
+        with conn.begin():
+            for _, _, sql in saved:
+                conn.exec_driver_sql(sql)
+            has_search = conn.exec_driver_sql(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'products_fts'"
+            ).first()
+            if Product.__table__.name in names and has_search:
+                conn.exec_driver_sql("INSERT INTO products_fts (products_fts) VALUES ('rebuild')")
+
+
+def clear_tables(conn):
+    for table in (StockMovement.__table__, StockSnapshot.__table__,
+                  Shipment.__table__, OrderItem.__table__, Order.__table__, Product.__table__):
+        conn.execute(table.delete())
+
+
+def clear_archive():
+    """Delete the order archive, whose orders would otherwise reappear under reused IDs."""
+    archive_path = get_archive_path()
+    if archive_path and os.path.exists(archive_path):
+        os.remove(archive_path)
+        print(f"🗑️ Removed the order archive {archive_path}.")
+
+
+def generate_products(rng, fake, count):
+    """Build product rows with unique SKUs and category-appropriate prices."""
+    now = datetime.now()
+    brands = [fake.company().split()[0].strip(",") for _ in range(min(BRAND_POOL_SIZE, count))]
+    models = [word.title() for word in fake.words(nb=NAME_POOL_SIZE, unique=False)]
+    rows = []
+    for product_id in range(1, count + 1):
+        category, prefix, low, high = rng.choice(PRODUCT_CATEGORIES)
+        rows.append({
+            "id": product_id,
+            "name": f"{rng.choice(brands)} {category} {rng.choice(models)}"[:255],
+            "sku": f"{prefix}-{product_id:07d}",
+            "stock_quantity": rng.randint(0, 500),
+            "price_per_unit": round(rng.uniform(low, high), 2),
+            "reorder_point": SEED_REORDER_POINT,
+            "reorder_qty": SEED_REORDER_QTY,
+            "updated_at": now,
+        })
+    return rows
+
+
+def format_datetime(value):
+    """Render a datetime the way SQLAlchemy's SQLite DateTime type stores it."""
+    return value.isoformat(" ", "microseconds") if value is not None else None
+
+
+def bulk_insert(conn, table, columns, rows):
+    """Insert positional row tuples with a single executemany, skipping per-row bind processing."""
+    stmt = table.insert().compile(dialect=conn.dialect, column_keys=list(columns))
+    conn.exec_driver_sql(str(stmt), rows)
+
+
+def format_datetimes(values):
+    """format_datetime for a NumPy datetime64 array, returned as a list of strings."""
+    return np.char.replace(np.datetime_as_string(values, unit="us"), "T", " ").tolist()
+
+
+def draw_distinct_products(rng, order_index, ranked_ids, popularity):
+    """
+    Draw a Zipf-distributed product for every item, where order_index maps
+    items to orders. An order lists a product once, so repeated picks within
+    an order are redrawn until none are left.
+    """
+    def draw(size):
+        return ranked_ids[np.searchsorted(popularity, rng.random(size) * popularity[-1], side="right")]
+
+    products = draw(len(order_index))
+    pending = np.arange(len(order_index))
+    while True:
+        # Only the items of orders that had a repeat in the last round are checked again.
+        orders, picks = order_index[pending], products[pending]
+        by_order = np.lexsort((picks, orders))
+        sorted_orders, sorted_products = orders[by_order], picks[by_order]
+        repeated = (sorted_orders[1:] == sorted_orders[:-1]) & (sorted_products[1:] == sorted_products[:-1])
+        repeats = pending[by_order[1:][repeated]]
+        if not len(repeats):
+            return products
+        products[repeats] = draw(len(repeats))
+        redrawn = np.zeros(order_index[-1] + 1, dtype=bool)
+        redrawn[order_index[repeats]] = True
+        pending = np.flatnonzero(redrawn[order_index])
+
+
+def generate_order_batch(rng, first_order_id, count, first_item_id, prices, ranked_ids, popularity, customers, items_per_order, start_date):
+    """
+    Build order, order item and shipment row tuples for one batch of orders,
+    drawn with NumPy a batch at a time. prices is indexed by product ID.
+    """
+    statuses, status_weights = zip(*ORDER_STATUS_WEIGHTS)
+    delivery_statuses, delivery_weights = zip(*DELIVERY_STATUS_WEIGHTS)
+    max_items = min(items_per_order[1], len(ranked_ids))
+    min_items = min(items_per_order[0], max_items)
+
+    order_ids = np.arange(first_order_id, first_order_id + count)
+    order_statuses = rng.choice(len(statuses), size=count, p=np.divide(status_weights, sum(status_weights)))
+    item_counts = rng.integers(min_items, max_items + 1, count)
+    order_index = np.repeat(np.arange(count), item_counts)
+    products = draw_distinct_products(rng, order_index, ranked_ids, popularity)
+    quantities = rng.integers(1, 6, len(products))
+    unit_prices = prices[products]
+    total_amounts = np.bincount(order_index, weights=quantities * unit_prices, minlength=count)
+    customer_names = [customers[i] for i in rng.integers(0, len(customers), count).tolist()]
+    order_dates = np.datetime64(start_date, "us") + rng.integers(0, SECONDS_IN_YEAR, count).astype("timedelta64[s]")
+    order_date_strs = format_datetimes(order_dates)
+
+    orders = list(zip(
+        order_ids.tolist(), customer_names, order_date_strs, [statuses[i] for i in order_statuses.tolist()],
+        order_date_strs, item_counts.tolist(), total_amounts.tolist(),
+    ))
+    items = list(zip(
+        range(first_item_id, first_item_id + len(products)), order_ids[order_index].tolist(), products.tolist(),
+        quantities.tolist(), unit_prices.tolist(),
+    ))
+
+    fulfilled = np.flatnonzero(order_statuses == statuses.index("fulfilled"))
+    delivery = rng.choice(len(delivery_statuses), size=len(fulfilled), p=np.divide(delivery_weights, sum(delivery_weights)))
+    shipped_dates = order_dates[fulfilled] + rng.integers(2, 72, len(fulfilled)).astype("timedelta64[h]")
+    shipments = []
+    for offset, status, shipped_date_str in zip(fulfilled.tolist(), delivery.tolist(), format_datetimes(shipped_dates)):
+        delivery_status = delivery_statuses[status]
+        if delivery_status == "not shipped":
+            shipped_date_str = None
+        shipments.append((first_order_id + offset, shipped_date_str, delivery_status,
+                          shipped_date_str or order_date_strs[offset]))
+    return orders, items, shipments
+
+
+def generate_database(num_products=DEFAULT_PRODUCTS, num_orders=DEFAULT_ORDERS,
+                      items_per_order=DEFAULT_ITEMS_PER_ORDER, seed=DEFAULT_SEED, target_engine=None):
+    """
+    Replaces all data with a deterministic synthetic dataset.
+    Rows are written with Core bulk inserts, one transaction per batch of
+    orders, while the loaded tables' secondary indexes and triggers are
+    dropped; they are recreated once the load finishes or fails.
+    """
+    rng = random.Random(seed)
+    fake = Faker()
+    fake.seed_instance(seed)
+    started = time.perf_counter()
+
+    print("--- 🌱 Starting synthetic data generation ---")
+    products = generate_products(rng, fake, num_products)
+    customers = [fake.name() for _ in range(min(NAME_POOL_SIZE, max(num_orders, 1)))]
+    ranked_ids = list(range(1, num_products + 1))
+    rng.shuffle(ranked_ids)
+    order_rng = np.random.default_rng(seed)
+    ranked = np.array(ranked_ids)
+    popularity = np.array(zipf_cum_weights(num_products))
+    prices = np.zeros(num_products + 1)
+    prices[[row["id"] for row in products]] = [row["price_per_unit"] for row in products]
+    start_date = ORDER_HISTORY_START
+
+    if target_engine is None:
+        target_engine = get_engine()
+        clear_archive()
+    with target_engine.connect() as conn:
+        # The generated rows are consistent by construction, so skip the
+        # per-row foreign key lookups and fsyncs for the load.
+        conn.exec_driver_sql("PRAGMA synchronous=OFF")
+        conn.exec_driver_sql("PRAGMA foreign_keys=OFF")
+        conn.commit()
+        loaded = (Product.__table__, StockSnapshot.__table__, Order.__table__, OrderItem.__table__, Shipment.__table__)
+        with deferred_indexes(conn, loaded):
+            with conn.begin():
+                print("\n🗑️ Clearing all existing data from tables...")
+                clear_tables(conn)
+                conn.execute(Product.__table__.insert(), products)
+                conn.execute(StockSnapshot.__table__.insert(), [
+                    {"product_id": row["id"], "taken_at": row["updated_at"], "stock_quantity": row["stock_quantity"],
+                     "last_movement_id": 0}
+                    for row in products
+                ])
+            print(f"✅ Added {num_products} products.")
+
+            item_id = 1
+            for first_order_id in range(1, num_orders + 1, ORDER_BATCH_SIZE):
+                count = min(ORDER_BATCH_SIZE, num_orders - first_order_id + 1)
+                orders, items, shipments = generate_order_batch(
+                    order_rng, first_order_id, count, item_id, prices, ranked, popularity, customers,
+                    items_per_order, start_date,
+                )
+                with conn.begin():
+                    bulk_insert(conn, Order.__table__, ORDER_COLUMNS, orders)
+                    bulk_insert(conn, OrderItem.__table__, ORDER_ITEM_COLUMNS, items)
+                    if shipments:
+                        bulk_insert(conn, Shipment.__table__, SHIPMENT_COLUMNS, shipments)
+                item_id += len(items)
+                print(f"🛒 {first_order_id + count - 1}/{num_orders} orders written ({item_id - 1} items so far)...")
+            print("🗂️ Building indexes...")
+        pragmas = get_sqlite_pragmas()
+        conn.exec_driver_sql(f"PRAGMA synchronous={pragmas.get('synchronous', 'FULL')}")
+        conn.exec_driver_sql(f"PRAGMA foreign_keys={pragmas.get('foreign_keys', 'OFF')}")
+        conn.commit()
+
+    elapsed = time.perf_counter() - started
+    print(f"\n--- 🎉 Generated {num_orders} orders and {item_id - 1} items in {elapsed:.1f}s! ---")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Populate the database with deterministic synthetic data.")
+    parser.add_argument("--products", type=int, default=DEFAULT_PRODUCTS, help="number of products")
+    parser.add_argument("--orders", type=int, default=DEFAULT_ORDERS, help="number of orders")
+    parser.add_argument("--items-per-order", type=parse_range, default=DEFAULT_ITEMS_PER_ORDER,
+                        help="distinct items per order as MIN..MAX (default 1..8)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="random seed for reproducible data")
+    args = parser.parse_args(argv)
+    if args.products < 1:
+        parser.error("--products must be at least 1")
+    generate_database(args.products, args.orders, args.items_per_order, args.seed)
 
 
 if __name__ == "__main__":
-    seed_database()
\ No newline at end of file
+    main()
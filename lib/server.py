@@ -0,0 +1,525 @@
+# lib/server.py
+
+import argparse
+import asyncio
+import json
+import re
+import signal
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qs
+
+from lib.models import Session, get_engine
+from lib.cache import catalog_cache
+from lib.low_stock import low_stock_watchlist, print_low_stock_alert
+from lib.search import search_products, DEFAULT_SEARCH_LIMIT
+from lib import services
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+DEFAULT_READ_WORKERS = 8
+DEFAULT_MAX_PENDING_READS = 256
+DEFAULT_MAX_PENDING_WRITES = 64
+DEFAULT_PIPELINE_DEPTH = 16
+DEFAULT_SHUTDOWN_GRACE = 10.0
+MAX_BODY_BYTES = 1024 * 1024
+MAX_HEADERS = 100
+FULFILL_RETRIES = 3
+MAX_SEARCH_LIMIT = 100
+
+STATUS_REASONS = {
+    200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable",
+}
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class Overloaded(Exception):
+    """The executor's queue is full; the client should back off and retry."""
+
+
+class Request:
+    __slots__ = ("method", "path", "query", "headers", "body", "keep_alive")
+
+    def __init__(self, method, target, version, headers, body):
+        url = urlsplit(target)
+        self.method = method
+        self.path = url.path.rstrip("/") or "/"
+        self.query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        self.headers = headers
+        self.body = body
+        connection = headers.get("connection", "").lower()
+        self.keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+
+    def json(self):
+        try:
+            data = json.loads(self.body or b"{}")
+        except ValueError:
+            raise HttpError(400, "Request body is not valid JSON.")
+        if not isinstance(data, dict):
+            raise HttpError(400, "Request body must be a JSON object.")
+        return data
+
+
+class Response:
+    __slots__ = ("status", "payload", "close", "retry_after")
+
+    def __init__(self, status, payload, close=False, retry_after=None):
+        self.status = status
+        self.payload = payload
+        self.close = close
+        self.retry_after = retry_after
+
+    def encode(self, keep_alive=True):
+        body = json.dumps(self.payload, default=str).encode()
+        lines = [
+            f"HTTP/1.1 {self.status} {STATUS_REASONS.get(self.status, '')}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive and not self.close else 'close'}",
+        ]
+        if self.retry_after is not None:
+            lines.append(f"Retry-After: {self.retry_after}")
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+
+async def read_request(reader):
+    """Read one HTTP/1.1 request from the stream, or return None when the client closed it."""
+    line = await reader.readline()
+    if not line.strip():
+        return None
+    try:
+        method, target, version = line.decode("latin-1").split()
+    except ValueError:
+        raise HttpError(400, "Malformed request line.")
+    headers = {}
+    while True:
+        header = await reader.readline()
+        if header in (b"\r\n", b"\n", b""):
+            break
+        if len(headers) >= MAX_HEADERS:
+            raise HttpError(400, "Too many headers.")
+        name, _, value = header.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        raise HttpError(400, "Invalid Content-Length.")
+    if length > MAX_BODY_BYTES:
+        raise HttpError(413, "Request body too large.")
+    body = await reader.readexactly(length) if length else b""
+    return Request(method.upper(), target, version, headers, body)
+
+
+class BoundedExecutor:
+    """
+    A thread pool that refuses work once max_pending jobs are queued or running,
+    so a saturated database turns into fast 503s instead of unbounded latency.
+    """
+
+    def __init__(self, workers, max_pending, name):
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        self.max_pending = max_pending
+        self.pending = 0
+
+    def submit(self, fn, *args):
+        # Only called from the event loop thread, so the counter needs no lock.
+        if self.pending >= self.max_pending:
+            raise Overloaded()
+        self.pending += 1
+        future = asyncio.get_running_loop().run_in_executor(self.pool, fn, *args)
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future):
+        self.pending -= 1
+
+    def shutdown(self):
+        self.pool.shutdown(wait=True)
+
+
+def product_to_dict(product):
+    return {
+        "id": product.id, "name": product.name, "sku": product.sku,
+        "stock_quantity": product.stock_quantity, "price_per_unit": product.price_per_unit,
+    }
+
+
+def order_to_dict(order, with_items=False):
+    data = {
+        "id": order.id, "customer_name": order.customer_name, "order_date": order.order_date,
+        "status": order.status, "item_count": order.item_count, "total_amount": order.total_amount,
+        "archived": order.archived,
+    }
+    if with_items:
+        data["items"] = [
+            {"product_id": item.product_id, "quantity": item.quantity, "unit_price": item.unit_price}
+            for item in order.order_items
+        ]
+    return data
+
+
+def shipment_to_dict(shipment):
+    return {
+        "id": shipment.id, "order_id": shipment.order_id,
+        "delivery_status": shipment.delivery_status, "shipped_date": shipment.shipped_date,
+    }
+
+
+def require_int(value, field):
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise HttpError(400, f"'{field}' must be an integer.")
+    return value
+
+
+def get_product(session, request, product_id):
+    product = catalog_cache.get_by_id(session, int(product_id))
+    if product is None:
+        raise services.NotFoundError(f"Product with ID {product_id} not found.")
+    return 200, product_to_dict(product)
+
+
+def find_product(session, request):
+    terms = request.query.get("q")
+    if terms:
+        limit = request.query.get("limit", str(DEFAULT_SEARCH_LIMIT))
+        if not limit.isdigit() or not 1 <= int(limit) <= MAX_SEARCH_LIMIT:
+            raise HttpError(400, f"'limit' must be an integer from 1 to {MAX_SEARCH_LIMIT}.")
+        return 200, [product_to_dict(p) for p in search_products(session, terms, int(limit))]
+    sku = request.query.get("sku")
+    if not sku:
+        raise HttpError(400, "Pass ?sku=... to look a product up by SKU, or ?q=... to search by name or SKU.")
+    product = catalog_cache.get_by_sku(session, sku)
+    if product is None:
+        raise services.NotFoundError(f"Product with SKU '{sku}' not found.")
+    return 200, product_to_dict(product)
+
+
+def get_order(session, request, order_id):
+    return 200, order_to_dict(services.get_order(session, int(order_id), include_archived=True), with_items=True)
+
+
+def place_order(session, request):
+    data = request.json()
+    items = data.get("items")
+    if not isinstance(items, list) or not items:
+        raise HttpError(400, "'items' must be a non-empty list of {product_id, quantity}.")
+    basket = [
+        (require_int(item.get("product_id"), "product_id"), require_int(item.get("quantity"), "quantity"))
+        for item in items if isinstance(item, dict)
+    ]
+    if len(basket) != len(items):
+        raise HttpError(400, "Each item must be an object with product_id and quantity.")
+    order = services.place_order(session, data.get("customer_name"), basket)
+    return 201, order_to_dict(order)
+
+
+def fulfill_order(session, request, order_id):
+    for attempt in range(FULFILL_RETRIES):
+        try:
+            shipment = services.fulfill_order(session, int(order_id))
+            return 201, shipment_to_dict(shipment)
+        except services.ConcurrencyConflictError:
+            if attempt == FULFILL_RETRIES - 1:
+                raise
+
+
+def fulfill_orders(session, request):
+    order_ids = request.json().get("order_ids")
+    if not isinstance(order_ids, list) or not order_ids:
+        raise HttpError(400, "'order_ids' must be a non-empty list of integers.")
+    order_ids = [require_int(value, "order_ids") for value in order_ids]
+    for attempt in range(FULFILL_RETRIES):
+        try:
+            result = services.fulfill_wave(session, order_ids)
+            break
+        except services.ConcurrencyConflictError:
+            if attempt == FULFILL_RETRIES - 1:
+                raise
+    return 200, {
+        "shipments": {str(order_id): shipment_id for order_id, shipment_id in sorted(result.shipments.items())},
+        "short": {str(order_id): str(error) for order_id, error in sorted(result.short.items())},
+        "skipped": {str(order_id): reason for order_id, reason in sorted(result.skipped.items())},
+    }
+
+
+def update_shipment(session, request, shipment_id):
+    data = request.json()
+    status = data.get("status")
+    if not isinstance(status, str):
+        raise HttpError(400, "'status' is required.")
+    shipment = services.update_shipment_status(session, int(shipment_id), status)
+    return 200, shipment_to_dict(shipment)
+
+
+def update_shipments(session, request):
+    data = request.json()
+    status = data.get("status")
+    if not isinstance(status, str):
+        raise HttpError(400, "'status' is required.")
+    selection = {}
+    for field in ("shipment_ids", "order_ids"):
+        if field in data:
+            values = data[field]
+            if not isinstance(values, list):
+                raise HttpError(400, f"'{field}' must be a list of integers.")
+            selection[field] = [require_int(value, field) for value in values]
+    if "id_range" in data:
+        bounds = data["id_range"]
+        if not isinstance(bounds, list) or len(bounds) != 2:
+            raise HttpError(400, "'id_range' must be [first, last].")
+        selection["id_range"] = tuple(require_int(value, "id_range") for value in bounds)
+    updated = services.bulk_update_shipment_status(
+        session, status, clear_shipped_date=data.get("clear_shipped_date") is True, **selection
+    )
+    return 200, {"status": status.lower(), "updated": updated}
+
+
+def health(session, request):
+    return 200, {"status": "ok"}
+
+
+# (method, path pattern, handler, writes to the database)
+ROUTES = [
+    ("GET", re.compile(r"^/health$"), health, False),
+    ("GET", re.compile(r"^/products/(\d+)$"), get_product, False),
+    ("GET", re.compile(r"^/products$"), find_product, False),
+    ("GET", re.compile(r"^/orders/(\d+)$"), get_order, False),
+    ("POST", re.compile(r"^/orders$"), place_order, True),
+    ("POST", re.compile(r"^/orders/(\d+)/fulfill$"), fulfill_order, True),
+    ("POST", re.compile(r"^/orders/fulfill$"), fulfill_orders, True),
+    ("POST", re.compile(r"^/shipments/(\d+)$"), update_shipment, True),
+    ("POST", re.compile(r"^/shipments$"), update_shipments, True),
+]
+
+
+def match_route(method, path):
+    allowed = False
+    for route_method, pattern, handler, writes in ROUTES:
+        match = pattern.match(path)
+        if match:
+            if route_method == method:
+                return handler, match.groups(), writes
+            allowed = True
+    raise HttpError(405 if allowed else 404, f"No route for {method} {path}.")
+
+
+def writes_to_database(request):
+    """Whether the request's route writes; unroutable requests are answered without touching the database."""
+    try:
+        return match_route(request.method, request.path)[2]
+    except HttpError:
+        return False
+
+
+def error_response(error):
+    """Map a service error onto an HTTP status."""
+    if isinstance(error, services.NotFoundError):
+        return Response(404, {"error": str(error)})
+    if isinstance(error, services.DuplicateSkuError):
+        return Response(409, {"error": str(error)})
+    if isinstance(error, services.ValidationError):
+        return Response(400, {"error": str(error)})
+    if isinstance(error, services.InsufficientStockError):
+        return Response(409, {
+            "error": str(error), "product_id": error.product_id,
+            "requested": error.requested, "available": error.available,
+        })
+    if isinstance(error, services.ConcurrencyConflictError):
+        return Response(409, {"error": str(error), "retry": True})
+    return Response(409, {"error": str(error)})
+
+
+def run_handler(handler, request, params):
+    """Run a route handler in a worker thread with its own session."""
+    session = Session()
+    try:
+        status, payload = handler(session, request, *params)
+        return Response(status, payload)
+    except HttpError as e:
+        return Response(e.status, {"error": str(e)})
+    except services.ServiceError as e:
+        return error_response(e)
+    finally:
+        session.close()
+
+
+class WarehouseServer:
+    """
+    HTTP/1.1 JSON front end for the warehouse services.
+
+    Reads run on a pool of threads; writes go through a single writer thread,
+    since SQLite serializes writers anyway. Both pools are bounded, and a full
+    pool answers 503 with Retry-After. Requests pipelined on one connection
+    are answered in order, with at most pipeline_depth in flight before the
+    server stops reading that socket. Reads on a connection run concurrently,
+    but a write waits for the connection's earlier requests and every later
+    request waits for it, so a client sees its own writes in the order it
+    sent them.
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, read_workers=DEFAULT_READ_WORKERS,
+                 max_pending_reads=DEFAULT_MAX_PENDING_READS, max_pending_writes=DEFAULT_MAX_PENDING_WRITES,
+                 pipeline_depth=DEFAULT_PIPELINE_DEPTH):
+        self.host = host
+        self.port = port
+        self.reads = BoundedExecutor(read_workers, max_pending_reads, "read")
+        self.writes = BoundedExecutor(1, max_pending_writes, "write")
+        self.pipeline_depth = pipeline_depth
+        self.server = None
+        self.closing = False
+        self.connections = set()
+        self.in_flight = 0
+        self.idle = asyncio.Event()
+        self.idle.set()
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def dispatch(self, request, after=()):
+        """Run a request once the futures in after are done, returning its Response."""
+        self.in_flight += 1
+        self.idle.clear()
+        try:
+            if after:
+                await asyncio.wait(after)
+            handler, params, writes = match_route(request.method, request.path)
+            executor = self.writes if writes else self.reads
+            return await executor.submit(run_handler, handler, request, params)
+        except HttpError as e:
+            return Response(e.status, {"error": str(e)})
+        except Overloaded:
+            return Response(503, {"error": "Server busy, retry shortly."}, retry_after=1)
+        except Exception as e:
+            print(f"❌ {request.method} {request.path} failed: {e!r}")
+            return Response(500, {"error": "Internal server error."})
+        finally:
+            self.in_flight -= 1
+            if not self.in_flight:
+                self.idle.set()
+
+    async def handle_connection(self, reader, writer):
+        task = asyncio.current_task()
+        self.connections.add(task)
+        pending = asyncio.Queue(maxsize=self.pipeline_depth)
+        responder = asyncio.create_task(self.write_responses(pending, writer))
+        last_write = None  # the newest write dispatched on this connection
+        reads = []         # reads dispatched since then
+        try:
+            while not self.closing and not responder.done():
+                try:
+                    request = await read_request(reader)
+                except HttpError as e:
+                    await pending.put((asyncio.ensure_future(self.static(Response(e.status, {"error": str(e)}, close=True))), False))
+                    break
+                except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+                    break
+                if request is None:
+                    break
+                # Reads and writes run on different pools, so they would
+                # otherwise overtake each other: a write waits for every
+                # earlier request, anything else for the last write.
+                if writes_to_database(request):
+                    after = [future for future in reads + [last_write] if future is not None and not future.done()]
+                    last_write = future = asyncio.ensure_future(self.dispatch(request, after))
+                    reads = []
+                else:
+                    after = [last_write] if last_write is not None and not last_write.done() else []
+                    future = asyncio.ensure_future(self.dispatch(request, after))
+                    reads = [read for read in reads if not read.done()] + [future]
+                # Blocks once pipeline_depth responses are outstanding, which
+                # stops us reading from this client until it catches up.
+                await pending.put((future, request.keep_alive))
+                if not request.keep_alive:
+                    break
+        except asyncio.CancelledError:
+            pass
+        finally:
+            await pending.put(None)
+            await responder
+            writer.close()
+            self.connections.discard(task)
+
+    @staticmethod
+    async def static(response):
+        return response
+
+    async def write_responses(self, pending, writer):
+        """Write responses in request order; after a close, keep draining so the reader never blocks."""
+        open_ = True
+        while True:
+            item = await pending.get()
+            if item is None:
+                return
+            future, keep_alive = item
+            response = await future
+            if not open_:
+                continue
+            keep_alive = keep_alive and not self.closing
+            try:
+                writer.write(response.encode(keep_alive))
+                await writer.drain()
+            except ConnectionError:
+                open_ = False
+                continue
+            if response.close or not keep_alive:
+                open_ = False
+
+    async def shutdown(self, grace=DEFAULT_SHUTDOWN_GRACE):
+        """Stop accepting connections, let in-flight requests finish, then close idle connections."""
+        self.closing = True
+        self.server.close()
+        await self.server.wait_closed()
+        try:
+            await asyncio.wait_for(self.idle.wait(), grace)
+        except asyncio.TimeoutError:
+            print(f"⚠️ {self.in_flight} request(s) still running after {grace:.0f}s; closing anyway.")
+        for task in list(self.connections):
+            task.cancel()
+        await asyncio.gather(*self.connections, return_exceptions=True)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.reads.shutdown)
+        await loop.run_in_executor(None, self.writes.shutdown)
+        get_engine().dispose()
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, **options):
+    low_stock_watchlist.add_alert_hook(print_low_stock_alert)
+    server = await WarehouseServer(host, port, **options).start()
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    print(f"🌐 Warehouse API listening on http://{server.host}:{server.port} (Ctrl+C to stop)")
+    await stop.wait()
+    print("\n🛑 Shutting down: finishing in-flight requests...")
+    await server.shutdown()
+    print("👋 Server stopped.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the warehouse over HTTP/JSON.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--read-workers", type=int, default=DEFAULT_READ_WORKERS, help="threads serving reads")
+    parser.add_argument("--max-pending-reads", type=int, default=DEFAULT_MAX_PENDING_READS,
+                        help="queued reads before answering 503")
+    parser.add_argument("--max-pending-writes", type=int, default=DEFAULT_MAX_PENDING_WRITES,
+                        help="queued writes before answering 503")
+    parser.add_argument("--pipeline-depth", type=int, default=DEFAULT_PIPELINE_DEPTH,
+                        help="pipelined requests in flight per connection")
+    args = parser.parse_args(argv)
+    asyncio.run(serve(
+        args.host, args.port, read_workers=args.read_workers, max_pending_reads=args.max_pending_reads,
+        max_pending_writes=args.max_pending_writes, pipeline_depth=args.pipeline_depth,
+    ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+# lib/services/__init__.py
+
+from .errors import (
+    ServiceError, NotFoundError, ValidationError, DuplicateSkuError,
+    ProductInUseError, InvalidStateError, InsufficientStockError, ConcurrencyConflictError,
+)
+from .products import get_product, add_product, update_product, delete_product
+from .orders import (
+    get_order, create_order, place_order, reserve_stock, add_order_item, remove_order_item,
+    restore_order_stock, cancel_orders, delete_order, delete_orders, update_order,
+    check_fulfillable, fulfill_order, fulfill_wave, WaveResult,
+)
+from .shipments import get_shipment, update_shipment_status, bulk_update_shipment_status, delete_shipment
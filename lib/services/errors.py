@@ -0,0 +1,39 @@
+# lib/services/errors.py
+
+
+class ServiceError(Exception):
+    """Base class for errors raised by the warehouse services."""
+
+
+class NotFoundError(ServiceError):
+    """The requested product, order or shipment does not exist."""
+
+
+class ValidationError(ServiceError):
+    """An argument failed a business rule (e.g. a non-positive price)."""
+
+
+class DuplicateSkuError(ValidationError):
+    """A product with the same SKU already exists."""
+
+
+class ProductInUseError(ServiceError):
+    """The product is still referenced by order items."""
+
+
+class InvalidStateError(ServiceError):
+    """The operation is not allowed in the record's current status."""
+
+
+class InsufficientStockError(ServiceError):
+    """Not enough stock to satisfy the requested quantity."""
+
+    def __init__(self, message, product_id=None, requested=None, available=None):
+        super().__init__(message)
+        self.product_id = product_id
+        self.requested = requested
+        self.available = available
+
+
+class ConcurrencyConflictError(ServiceError):
+    """Another transaction changed the same rows first; the operation can be retried."""
@@ -0,0 +1,570 @@
+# lib/services/orders.py
+
+from datetime import datetime
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm.exc import StaleDataError
+
+from lib.models import Product, Order, OrderItem, Shipment
+from lib.models.models import ORDER_STATUSES
+from lib.helpers import get_order_by_id, get_product_by_id, commit_or_rollback
+from lib.cache import catalog_cache
+from lib.low_stock import low_stock_watchlist, StockLevel
+from lib.ledger import record_movements, record_order_movements
+from lib.archive import get_archived_order
+from lib.services.errors import (
+    NotFoundError, ValidationError, InvalidStateError, InsufficientStockError, ConcurrencyConflictError,
+)
+from lib.services.products import get_product
+
+# Keeps every IN list of a wave well under SQLite's bound-parameter limit.
+MAX_WAVE_SIZE = 10000
+
+
+def get_order(session, order_id, include_archived=False):
+    """
+    Return the order with the given ID or raise NotFoundError.
+    IDs that are no longer hot are looked up in the archive: with
+    include_archived a read-only copy is returned, otherwise the caller is
+    told the order is archived.
+    """
+    order = get_order_by_id(session, order_id)
+    if order:
+        return order
+    archived = get_archived_order(order_id)
+    if archived is None:
+        raise NotFoundError(f"Order with ID {order_id} not found.")
+    if not include_archived:
+        raise InvalidStateError(f"Order #{order_id} is archived and can no longer be changed.")
+    return archived
+
+
+def create_order(session, customer_name):
+    """Open an empty pending order for a customer."""
+    if not customer_name:
+        raise ValidationError("Customer name cannot be empty.")
+    order = Order(customer_name=customer_name, order_date=datetime.now(), status="pending")
+    session.add(order)
+    commit_or_rollback(session)
+    return order
+
+
+def reserve_stock(session, product_id, quantity, order_id=None, reason="order placed"):
+    """
+    Atomically take quantity units of a product out of stock and record the movement.
+    The decrement only applies while enough stock remains, so two clerks
+    selling the last units cannot both succeed.
+    """
+    products = Product.__table__
+    result = session.execute(
+        update(products)
+        .where(products.c.id == product_id, products.c.stock_quantity >= quantity)
+        .values(
+            stock_quantity=products.c.stock_quantity - quantity,
+            version=products.c.version + 1,
+            updated_at=datetime.now(),
+        )
+        .returning(
+            products.c.name, products.c.sku, products.c.stock_quantity,
+            products.c.reorder_point, products.c.reorder_qty,
+        )
+    )
+    row = result.first()
+    if row is not None:
+        catalog_cache.invalidate_on_commit(session, product_id)
+        record_movements(session, [(product_id, -quantity)], reason, order_id)
+        level = StockLevel(product_id, *row)
+        low_stock_watchlist.record(session, level, was_low=level.stock_quantity + quantity <= level.reorder_point)
+        return
+    row = session.query(Product.name, Product.stock_quantity).filter(Product.id == product_id).first()
+    if row is None:
+        raise NotFoundError(f"Product with ID {product_id} not found.")
+    raise InsufficientStockError(
+        f"Only {row.stock_quantity} units of '{row.name}' are available.",
+        product_id=product_id, requested=quantity, available=row.stock_quantity,
+    )
+
+
+def normalize_basket(basket):
+    """Merge a basket of (product_id, quantity) pairs or a {product_id: quantity} mapping."""
+    pairs = basket.items() if hasattr(basket, "items") else basket
+    quantities = {}
+    for product_id, quantity in pairs:
+        if quantity <= 0:
+            raise ValidationError("Quantity must be greater than zero.")
+        quantities[product_id] = quantities.get(product_id, 0) + quantity
+    if not quantities:
+        raise ValidationError("An order needs at least one item.")
+    return quantities
+
+
+def place_order(session, customer_name, basket):
+    """
+    Create a pending order for a whole basket in a single transaction.
+    The order is flushed first so the ledger can refer to it, then stock for
+    every line is reserved with a conditional UPDATE; if any line cannot be
+    met the transaction is rolled back and nothing is written.
+    """
+    if not customer_name:
+        raise ValidationError("Customer name cannot be empty.")
+    quantities = normalize_basket(basket)
+    try:
+        prices = dict(
+            session.query(Product.id, Product.price_per_unit).filter(Product.id.in_(list(quantities)))
+        )
+        missing = [product_id for product_id in quantities if product_id not in prices]
+        if missing:
+            raise NotFoundError(f"Product with ID {missing[0]} not found.")
+        order = Order(customer_name=customer_name, order_date=datetime.now(), status="pending")
+        session.add(order)
+        session.flush()
+        for product_id in sorted(quantities):
+            reserve_stock(session, product_id, quantities[product_id], order_id=order.id)
+
+        order.order_items = [
+            OrderItem(product_id=product_id, quantity=quantity, unit_price=prices[product_id])
+            for product_id, quantity in quantities.items()
+        ]
+        order.item_count = len(quantities)
+        order.total_amount = sum(quantity * prices[product_id] for product_id, quantity in quantities.items())
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    return order
+
+
+def add_order_item(session, order_id, product_id, quantity):
+    """Reserve stock and add it to a pending order, merging with an existing line for the same product."""
+    if quantity <= 0:
+        raise ValidationError("Quantity must be greater than zero.")
+    order = get_order(session, order_id)
+    if order.status != "pending":
+        raise InvalidStateError(f"Order #{order.id} is '{order.status}'; items can only be added to pending orders.")
+    product = get_product(session, product_id)
+    try:
+        reserve_stock(session, product.id, quantity, order_id=order.id, reason="item added")
+    except Exception:
+        session.rollback()
+        raise
+
+    item = next((i for i in order.order_items if i.product_id == product.id), None)
+    if item:
+        item.quantity += quantity
+        adjust_order_totals(order, 0, quantity * item.unit_price)
+    else:
+        item = OrderItem(order_id=order.id, product_id=product.id, quantity=quantity, unit_price=product.price_per_unit)
+        order.order_items.append(item)
+        adjust_order_totals(order, 1, quantity * item.unit_price)
+    commit_or_rollback(session)
+    return item
+
+
+def remove_order_item(session, order_id, product_id):
+    """Take a product off a pending order and put its quantity back in stock."""
+    order = get_order(session, order_id)
+    if order.status != "pending":
+        raise InvalidStateError(f"Order #{order.id} is '{order.status}'; items can only be removed from pending orders.")
+    item = next((i for i in order.order_items if i.product_id == product_id), None)
+    if not item:
+        raise NotFoundError(f"Order #{order.id} has no item for product ID {product_id}.")
+
+    product = get_product_by_id(session, product_id)
+    if product:
+        product.stock_quantity += item.quantity
+        record_movements(session, [(product.id, item.quantity)], "item removed", order.id)
+    adjust_order_totals(order, -1, -item.quantity * item.unit_price)
+    order.order_items.remove(item)
+    commit_or_rollback(session)
+    return item
+
+
+def adjust_order_totals(order, item_count_delta, amount_delta):
+    """
+    Apply a change to an order's denormalized item_count/total_amount.
+    The update is expressed relative to the stored values, so concurrent
+    adjustments to the same order add up instead of overwriting each other.
+    """
+    if item_count_delta:
+        order.item_count = Order.item_count + item_count_delta
+    if amount_delta:
+        order.total_amount = Order.total_amount + amount_delta
+
+
+def order_demand(order_ids):
+    """Subquery of the total quantity per product over the items of the selected orders."""
+    items = OrderItem.__table__
+    return (
+        select(items.c.product_id, func.sum(items.c.quantity).label("quantity"))
+        .where(items.c.order_id.in_(order_ids))
+        .group_by(items.c.product_id)
+        .subquery("demand")
+    )
+
+
+def restore_order_stock(session, order_ids, reason="order deleted"):
+    """
+    Put every item of the selected orders back in stock with one UPDATE
+    joined against their order_items, summed per product, and record the
+    movements in the ledger. order_ids is a list of IDs or a SELECT of them.
+    Runs in the caller's transaction. Returns the number of products restocked.
+    """
+    products = Product.__table__
+    returned = order_demand(order_ids)
+    record_order_movements(session, order_ids, reason)
+    rows = session.execute(
+        update(products)
+        .where(products.c.id == returned.c.product_id)
+        .values(
+            stock_quantity=products.c.stock_quantity + returned.c.quantity,
+            version=products.c.version + 1,
+            updated_at=datetime.now(),
+        )
+        .returning(
+            products.c.id, products.c.name, products.c.sku, products.c.stock_quantity,
+            products.c.reorder_point, products.c.reorder_qty,
+        )
+    ).all()
+    for row in rows:
+        catalog_cache.invalidate_on_commit(session, row.id)
+        level = StockLevel(*row)
+        # Stock only went up, so a product that is low now was low before.
+        low_stock_watchlist.record(session, level, was_low=level.is_low)
+    return len(rows)
+
+
+def order_selection(order_ids=None, placed_before=None):
+    """A condition on orders matching exactly one of: a list of order IDs, or orders placed before a date."""
+    if (order_ids is None) == (placed_before is None):
+        raise ValidationError("Select orders by exactly one of: order IDs or a placed-before date.")
+    orders = Order.__table__
+    if order_ids is not None:
+        return orders.c.id.in_(list(order_ids))
+    return orders.c.order_date < placed_before
+
+
+def cancel_pending_orders(session, condition):
+    """Cancel the pending orders matching condition and restock their items, in the caller's transaction."""
+    orders = Order.__table__
+    pending = condition & (orders.c.status == "pending")
+    restore_order_stock(session, select(orders.c.id).where(pending), reason="cancelled")
+    cancelled = session.execute(
+        update(orders).where(pending).values(status="cancelled", updated_at=datetime.now()).returning(orders.c.id)
+    )
+    return sorted(row.id for row in cancelled)
+
+
+def cancel_orders(session, order_ids=None, placed_before=None):
+    """
+    Cancel pending orders and put their stock back, e.g. every cart abandoned
+    before a date, in a fixed number of statements however many orders match.
+    Orders that are not pending are left alone. Returns the IDs cancelled.
+    """
+    condition = order_selection(order_ids, placed_before)
+    try:
+        cancelled = cancel_pending_orders(session, condition)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    return cancelled
+
+
+def delete_orders(session, order_ids=None, placed_before=None):
+    """
+    Delete orders with their items and shipments, returning the stock of
+    those not cancelled (cancelling already returned it), all in one
+    transaction. Returns the IDs deleted.
+    """
+    condition = order_selection(order_ids, placed_before)
+    orders = Order.__table__
+    try:
+        restore_order_stock(session, select(orders.c.id).where(condition, orders.c.status != "cancelled"))
+        selected = select(orders.c.id).where(condition)
+        # Cascades do this already when foreign keys are enforced.
+        session.execute(delete(Shipment.__table__).where(Shipment.__table__.c.order_id.in_(selected)))
+        session.execute(delete(OrderItem.__table__).where(OrderItem.__table__.c.order_id.in_(selected)))
+        deleted = session.execute(delete(orders).where(condition).returning(orders.c.id))
+        deleted = sorted(row.id for row in deleted)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    return deleted
+
+
+def delete_order(session, order_id):
+    """Delete an order and return its items to stock, unless cancelling it already did."""
+    order = get_order(session, order_id)
+    try:
+        if order.status != "cancelled":
+            restore_order_stock(session, [order.id])
+        session.delete(order)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    return order
+
+
+def update_order(session, order_id, customer_name=None, status=None):
+    """
+    Change an order's customer name and/or status. Arguments left as None are kept.
+    Cancelling a pending order puts its stock back in the same transaction; a
+    cancelled order cannot be reopened, because its stock is no longer held.
+    """
+    order = get_order(session, order_id)
+    if status is not None:
+        status = status.lower()
+        if status not in ORDER_STATUSES:
+            raise ValidationError(f"Invalid status '{status}'. Valid statuses: {', '.join(ORDER_STATUSES)}.")
+        if order.status == "cancelled" and status != "cancelled":
+            raise InvalidStateError(f"Order #{order.id} is cancelled and its stock was returned; place a new order instead.")
+    try:
+        if status == "cancelled" and order.status == "pending":
+            if not cancel_pending_orders(session, Order.__table__.c.id == order.id):
+                raise InvalidStateError(f"Order #{order.id} is no longer pending.")
+            session.expire(order, ["status", "updated_at"])
+        elif status is not None:
+            order.status = status
+        if customer_name:
+            order.customer_name = customer_name
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    return order
+
+
+def load_order_products(session, order):
+    """Map each product ID on the order to its Product, holding them for the rest of the transaction."""
+    return {item.product_id: get_product_by_id(session, item.product_id) for item in order.order_items}
+
+
+def ensure_fulfillable(order, products):
+    """Raise the reason an order cannot be fulfilled with the given product rows, if any."""
+    if order.status == "fulfilled":
+        raise InvalidStateError(f"Order #{order.id} is already marked as 'fulfilled'.")
+    if order.status == "cancelled":
+        raise InvalidStateError(f"Order #{order.id} is 'cancelled' and cannot be fulfilled.")
+    for item in order.order_items:
+        product = products.get(item.product_id)
+        if not product or product.stock_quantity < item.quantity:
+            available = product.stock_quantity if product else 0
+            raise InsufficientStockError(
+                f"Insufficient stock for '{product.name if product else item.product_id}' (needed: {item.quantity}, available: {available}).",
+                product_id=item.product_id, requested=item.quantity, available=available,
+            )
+
+
+def check_fulfillable(session, order_id):
+    """
+    Return the order if it can be fulfilled now, otherwise raise the reason.
+    This is a quick pre-check against the catalog cache; fulfill_order checks
+    again against the rows it actually decrements.
+    """
+    order = get_order(session, order_id)
+    products = {item.product_id: catalog_cache.get_by_id(session, item.product_id) for item in order.order_items}
+    ensure_fulfillable(order, products)
+    return order
+
+
+def claim_pending_order(session, order_id):
+    """Atomically flip a pending order to fulfilled, so only one worker can fulfill it."""
+    orders = Order.__table__
+    result = session.execute(
+        update(orders)
+        .where(orders.c.id == order_id, orders.c.status == "pending")
+        .values(status="fulfilled", updated_at=datetime.now())
+    )
+    return result.rowcount == 1
+
+
+def fulfill_order(session, order_id):
+    """
+    Mark a pending order fulfilled, take its items out of stock and open a shipment.
+    Products are versioned, so if another transaction changed one of them after
+    it was read the whole fulfillment is rolled back with ConcurrencyConflictError
+    and can be retried against fresh stock levels.
+    """
+    order = get_order(session, order_id)
+    products = load_order_products(session, order)
+    ensure_fulfillable(order, products)
+    try:
+        if not claim_pending_order(session, order.id):
+            raise InvalidStateError(f"Order #{order.id} is no longer pending.")
+        for item in order.order_items:
+            products[item.product_id].stock_quantity -= item.quantity
+        record_movements(session, [(item.product_id, -item.quantity) for item in order.order_items], "fulfilled", order.id)
+        shipment = Shipment(order_id=order.id, delivery_status="not shipped")
+        session.add(shipment)
+        session.commit()
+    except StaleDataError as e:
+        session.rollback()
+        raise ConcurrencyConflictError(f"Stock for order #{order_id} changed concurrently.") from e
+    except OperationalError as e:
+        session.rollback()
+        if "locked" in str(e):
+            raise ConcurrencyConflictError(f"Database busy while fulfilling order #{order_id}.") from e
+        raise
+    except Exception:
+        session.rollback()
+        raise
+    session.expire(order, ["status"])
+    return shipment
+
+
+class WaveResult:
+    """What fulfill_wave did with each order of a wave."""
+
+    def __init__(self):
+        self.shipments = {}  # order ID -> ID of its new shipment
+        self.short = {}      # order ID -> InsufficientStockError for the first line that could not be met
+        self.skipped = {}    # order ID -> why it was not considered (not found, not pending)
+
+    @property
+    def fulfilled(self):
+        return sorted(self.shipments)
+
+
+def load_wave(session, order_ids):
+    """
+    Read the orders of a wave with their lines in one query. Returns
+    ({order_id: {product_id: quantity}} for the pending orders, {order_id:
+    reason} for the rest).
+    """
+    orders = Order.__table__
+    items = OrderItem.__table__
+    rows = session.execute(
+        select(orders.c.id, orders.c.status, items.c.product_id, items.c.quantity)
+        .outerjoin(items, items.c.order_id == orders.c.id)
+        .where(orders.c.id.in_(order_ids))
+        .order_by(orders.c.id)
+    )
+    lines, skipped = {}, {}
+    for order_id, status, product_id, quantity in rows:
+        if status != "pending":
+            skipped[order_id] = f"Order #{order_id} is '{status}', not pending."
+            continue
+        order_lines = lines.setdefault(order_id, {})
+        if product_id is not None:
+            order_lines[product_id] = order_lines.get(product_id, 0) + quantity
+    for order_id in order_ids:
+        if order_id not in lines and order_id not in skipped:
+            skipped[order_id] = f"Order with ID {order_id} not found."
+    return lines, skipped
+
+
+def fulfill_wave(session, order_ids, partial=True):
+    """
+    Fulfill a wave of pending orders in one transaction: every product the
+    wave needs is read with one IN query, availability is checked in memory
+    in order ID order, and then the orders are claimed, stock is decremented
+    once per product, the ledger is written and all shipments are inserted
+    in a handful of set-based statements. With partial, orders that cannot be
+    met are left pending and reported in the result; without it the first
+    shortfall raises InsufficientStockError and nothing is written.
+    Stock that changed since it was read raises ConcurrencyConflictError, and
+    the wave can be retried as a whole.
+    """
+    result = WaveResult()
+    order_ids = sorted(set(order_ids))
+    if len(order_ids) > MAX_WAVE_SIZE:
+        raise ValidationError(f"A wave can hold at most {MAX_WAVE_SIZE} orders; got {len(order_ids)}.")
+    try:
+        lines, result.skipped = load_wave(session, order_ids)
+        needed = {product_id for order_lines in lines.values() for product_id in order_lines}
+        available = {
+            row.id: row for row in
+            session.query(Product.id, Product.name, Product.stock_quantity).filter(Product.id.in_(needed))
+        } if needed else {}
+        stock = {product_id: row.stock_quantity for product_id, row in available.items()}
+
+        accepted = []
+        for order_id, order_lines in lines.items():
+            shortfall = next(
+                ((product_id, quantity) for product_id, quantity in order_lines.items()
+                 if stock.get(product_id, 0) < quantity),
+                None,
+            )
+            if shortfall is None:
+                for product_id, quantity in order_lines.items():
+                    stock[product_id] -= quantity
+                accepted.append(order_id)
+                continue
+            product_id, quantity = shortfall
+            row = available.get(product_id)
+            error = InsufficientStockError(
+                f"Insufficient stock for '{row.name if row else product_id}' on order #{order_id} "
+                f"(needed: {quantity}, available: {stock.get(product_id, 0)}).",
+                product_id=product_id, requested=quantity, available=stock.get(product_id, 0),
+            )
+            if not partial:
+                raise error
+            result.short[order_id] = error
+
+        if accepted:
+            result.shipments = apply_wave(session, accepted, lines)
+            session.commit()
+        else:
+            session.rollback()
+    except OperationalError as e:
+        session.rollback()
+        if "locked" in str(e):
+            raise ConcurrencyConflictError("Database busy while fulfilling the wave.") from e
+        raise
+    except Exception:
+        session.rollback()
+        raise
+    return result
+
+
+def apply_wave(session, order_ids, lines):
+    """Claim, decrement, record and ship the accepted orders of a wave. Returns {order_id: shipment_id}."""
+    orders = Order.__table__
+    products = Product.__table__
+    now = datetime.now()
+    claimed = session.execute(
+        update(orders)
+        .where(orders.c.id.in_(order_ids), orders.c.status == "pending")
+        .values(status="fulfilled", updated_at=now)
+        .returning(orders.c.id)
+    ).scalars().all()
+    if len(claimed) != len(order_ids):
+        raise ConcurrencyConflictError("Orders in the wave were changed concurrently.")
+
+    demand = {}
+    for order_id in order_ids:
+        for product_id, quantity in lines[order_id].items():
+            demand[product_id] = demand.get(product_id, 0) + quantity
+    if demand:
+        wave = order_demand(order_ids)
+        rows = session.execute(
+            update(products)
+            .where(products.c.id == wave.c.product_id, products.c.stock_quantity >= wave.c.quantity)
+            .values(
+                stock_quantity=products.c.stock_quantity - wave.c.quantity,
+                version=products.c.version + 1,
+                updated_at=now,
+            )
+            .returning(
+                products.c.id, products.c.name, products.c.sku, products.c.stock_quantity,
+                products.c.reorder_point, products.c.reorder_qty,
+            )
+        ).all()
+        if len(rows) != len(demand):
+            raise ConcurrencyConflictError("Stock for the wave changed concurrently.")
+        for row in rows:
+            catalog_cache.invalidate_on_commit(session, row.id)
+            level = StockLevel(*row)
+            was_low = level.stock_quantity + demand[level.id] <= level.reorder_point
+            low_stock_watchlist.record(session, level, was_low=was_low)
+        record_order_movements(session, order_ids, "fulfilled", sign=-1)
+
+    shipments = Shipment.__table__
+    created = session.execute(
+        insert(shipments).returning(shipments.c.order_id, shipments.c.id),
+        [{"order_id": order_id, "delivery_status": "not shipped", "updated_at": now} for order_id in order_ids],
+    )
+    return dict(created.all())
@@ -0,0 +1,96 @@
+# lib/services/products.py
+
+from lib.models import Product, OrderItem
+from lib.helpers import get_product_by_id, get_product_by_sku, commit_or_rollback
+from lib.ledger import record_movements, open_ledger
+from lib.services.errors import NotFoundError, ValidationError, DuplicateSkuError, ProductInUseError
+
+
+def get_product(session, product_id):
+    """Return the product with the given ID or raise NotFoundError."""
+    product = get_product_by_id(session, product_id)
+    if not product:
+        raise NotFoundError(f"Product with ID {product_id} not found.")
+    return product
+
+
+def validate_price(price_per_unit):
+    if price_per_unit <= 0:
+        raise ValidationError("Price must be greater than zero.")
+
+
+def validate_stock(stock_quantity):
+    if stock_quantity < 0:
+        raise ValidationError("Stock quantity cannot be negative.")
+
+
+def validate_reorder(reorder_point=None, reorder_qty=None):
+    if reorder_point is not None and reorder_point < 0:
+        raise ValidationError("Reorder point cannot be negative.")
+    if reorder_qty is not None and reorder_qty < 0:
+        raise ValidationError("Reorder quantity cannot be negative.")
+
+
+def add_product(session, name, sku, price_per_unit, stock_quantity, reorder_point=0, reorder_qty=0):
+    """Create a product with a unique SKU, open its stock ledger and return it."""
+    validate_price(price_per_unit)
+    validate_stock(stock_quantity)
+    validate_reorder(reorder_point, reorder_qty)
+    if get_product_by_sku(session, sku):
+        raise DuplicateSkuError(f"A product with SKU '{sku}' already exists.")
+
+    product = Product(
+        name=name, sku=sku, price_per_unit=price_per_unit, stock_quantity=stock_quantity,
+        reorder_point=reorder_point, reorder_qty=reorder_qty,
+    )
+    session.add(product)
+    try:
+        session.flush()
+        open_ledger(session, [(product.id, stock_quantity)])
+    except Exception:
+        session.rollback()
+        raise
+    commit_or_rollback(session)
+    return product
+
+
+def update_product(session, product_id, name=None, price_per_unit=None, stock_quantity=None,
+                   reorder_point=None, reorder_qty=None):
+    """Change any of a product's name, price, stock or reorder settings. Arguments left as None are kept."""
+    product = get_product(session, product_id)
+    if price_per_unit is not None:
+        validate_price(price_per_unit)
+    if stock_quantity is not None:
+        validate_stock(stock_quantity)
+    validate_reorder(reorder_point, reorder_qty)
+
+    if name:
+        product.name = name
+    if price_per_unit is not None:
+        product.price_per_unit = price_per_unit
+    if stock_quantity is not None:
+        record_movements(session, [(product.id, stock_quantity - product.stock_quantity)], "adjustment")
+        product.stock_quantity = stock_quantity
+    if reorder_point is not None:
+        product.reorder_point = reorder_point
+    if reorder_qty is not None:
+        product.reorder_qty = reorder_qty
+    commit_or_rollback(session)
+    return product
+
+
+def count_linked_order_items(session, product_id):
+    return session.query(OrderItem).filter_by(product_id=product_id).count()
+
+
+def delete_product(session, product_id):
+    """Delete a product that no order item refers to and return it."""
+    product = get_product(session, product_id)
+    linked_items_count = count_linked_order_items(session, product_id)
+    if linked_items_count > 0:
+        raise ProductInUseError(
+            f"Cannot delete '{product.name}'. It's currently linked to {linked_items_count} existing order item(s)."
+        )
+    session.delete(product)
+    commit_or_rollback(session)
+    return product
@@ -0,0 +1,94 @@
+# lib/services/shipments.py
+
+from datetime import datetime
+
+from sqlalchemy import func, null, update
+
+from lib.models import Shipment
+from lib.models.models import DELIVERY_STATUSES
+from lib.helpers import commit_or_rollback
+from lib.services.errors import NotFoundError, ValidationError
+
+
+def get_shipment(session, shipment_id):
+    """Return the shipment with the given ID or raise NotFoundError."""
+    shipment = session.get(Shipment, shipment_id)
+    if not shipment:
+        raise NotFoundError(f"Shipment with ID {shipment_id} not found.")
+    return shipment
+
+
+SHIPPED_STATUSES = ("in transit", "delivered")
+
+
+def validate_delivery_status(status):
+    status = status.lower()
+    if status not in DELIVERY_STATUSES:
+        raise ValidationError(f"Invalid delivery status '{status}'. Valid statuses: {', '.join(DELIVERY_STATUSES)}.")
+    return status
+
+
+def update_shipment_status(session, shipment_id, status, clear_shipped_date=False):
+    """
+    Move a shipment to a new delivery status.
+    Shipments going in transit or delivered get a shipped date if they lack
+    one. Any status but delivered can instead drop it (e.g. when re-routing).
+    """
+    status = validate_delivery_status(status)
+    shipment = get_shipment(session, shipment_id)
+    shipment.delivery_status = status
+    if clear_shipped_date and status != "delivered":
+        shipment.shipped_date = None
+    elif status in SHIPPED_STATUSES and not shipment.shipped_date:
+        shipment.shipped_date = datetime.now()
+    commit_or_rollback(session)
+    return shipment
+
+
+def bulk_update_shipment_status(session, status, shipment_ids=None, id_range=None, order_ids=None,
+                                clear_shipped_date=False):
+    """
+    Move many shipments to a new delivery status with a single UPDATE, e.g. a
+    whole truck at once. Select them by exactly one of: a list of shipment
+    IDs, an inclusive (first, last) shipment ID range, or a list of order IDs.
+    Shipped dates are handled as in update_shipment_status. Returns the IDs
+    of the shipments updated, in ascending order.
+    """
+    status = validate_delivery_status(status)
+    selectors = [selector for selector in (shipment_ids, id_range, order_ids) if selector is not None]
+    if len(selectors) != 1:
+        raise ValidationError("Select shipments by exactly one of: shipment IDs, an ID range or order IDs.")
+
+    shipments = Shipment.__table__
+    if shipment_ids is not None:
+        condition = shipments.c.id.in_(list(shipment_ids))
+    elif order_ids is not None:
+        condition = shipments.c.order_id.in_(list(order_ids))
+    else:
+        first, last = id_range
+        if first > last:
+            raise ValidationError(f"Invalid shipment ID range {first}-{last}.")
+        condition = shipments.c.id.between(first, last)
+
+    now = datetime.now()
+    values = {"delivery_status": status, "updated_at": now}
+    if clear_shipped_date and status != "delivered":
+        values["shipped_date"] = null()
+    elif status in SHIPPED_STATUSES:
+        values["shipped_date"] = func.coalesce(shipments.c.shipped_date, now)
+    try:
+        updated = session.execute(update(shipments).where(condition).values(**values).returning(shipments.c.id))
+        shipment_ids = sorted(row.id for row in updated)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    return shipment_ids
+
+
+def delete_shipment(session, shipment_id):
+    """Delete a shipment record and return it."""
+    shipment = get_shipment(session, shipment_id)
+    session.delete(shipment)
+    commit_or_rollback(session)
+    return shipment
@@ -0,0 +1,593 @@
+# lib/simulation.py
+
+import argparse
+import heapq
+import random
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from itertools import count
+
+import numpy as np
+from sqlalchemy import bindparam, update
+from sqlalchemy.dialects.sqlite import insert
+
+from lib.ledger import record_movements
+from lib.models import get_engine, Product, Order, OrderItem, Shipment
+from lib.seed import zipf_cum_weights, format_datetime, parse_range, bulk_insert
+
+HOUR = 3600.0
+DAY = 24 * HOUR
+ARRIVAL_BLOCK = 65536
+RESTOCK_POLICIES = ("reorder-point", "periodic", "none")
+SIMULATED_CUSTOMER = "Simulated Customer"
+
+# Event kinds kept on the heap. Order arrivals form a renewal process, so only
+# the next one is tracked, outside the heap; queued events due at the same
+# instant fire first, so a restock lands before an order that needs it.
+RESTOCK, REVIEW, PICKED, SHIPPED, DELIVERED, FLUSH = range(6)
+
+ORDER_COLUMNS = ("id", "customer_name", "order_date", "status", "updated_at", "item_count", "total_amount")
+ORDER_ITEM_COLUMNS = ("order_id", "product_id", "quantity", "unit_price")
+SHIPMENT_COLUMNS = ("order_id", "shipped_date", "delivery_status", "updated_at")
+
+
+class SimulationConfig:
+    """Knobs for one simulation run. Times are given in the units named by each argument."""
+
+    __slots__ = (
+        "days", "arrivals_per_hour", "hourly_profile", "items_per_order", "max_quantity",
+        "pickers", "pick_minutes", "pick_minutes_per_line", "dispatch_hours", "transit_days",
+        "restock_policy", "reorder_point", "reorder_qty", "order_up_to", "review_days", "lead_time_days",
+        "flush_days", "seed",
+    )
+
+    def __init__(self, days=365, arrivals_per_hour=40.0, hourly_profile=None, items_per_order=(1, 4),
+                 max_quantity=3, pickers=6, pick_minutes=3.0, pick_minutes_per_line=1.0, dispatch_hours=6.0,
+                 transit_days=2.0, restock_policy="reorder-point", reorder_point=20, reorder_qty=200,
+                 order_up_to=300, review_days=7.0, lead_time_days=5.0, flush_days=0.0, seed=42):
+        if restock_policy not in RESTOCK_POLICIES:
+            raise ValueError(f"Unknown restock policy '{restock_policy}'. Choose from {', '.join(RESTOCK_POLICIES)}.")
+        if hourly_profile is not None and len(hourly_profile) != 24:
+            raise ValueError("An hourly profile needs exactly 24 multipliers.")
+        self.days = days
+        self.arrivals_per_hour = arrivals_per_hour
+        self.hourly_profile = hourly_profile
+        self.items_per_order = items_per_order
+        self.max_quantity = max_quantity
+        self.pickers = pickers
+        self.pick_minutes = pick_minutes
+        self.pick_minutes_per_line = pick_minutes_per_line
+        self.dispatch_hours = dispatch_hours
+        self.transit_days = transit_days
+        self.restock_policy = restock_policy
+        self.reorder_point = reorder_point
+        self.reorder_qty = reorder_qty
+        self.order_up_to = order_up_to
+        self.review_days = review_days
+        self.lead_time_days = lead_time_days
+        self.flush_days = flush_days
+        self.seed = seed
+
+
+class SimProduct:
+    __slots__ = ("id", "sku", "price", "stock", "flushed_stock", "on_order", "units_sold", "stockouts", "dirty")
+
+    def __init__(self, product_id, sku, price, stock):
+        self.id = product_id
+        self.sku = sku
+        self.price = price
+        self.stock = stock
+        # Stock as of the last flush, so each flush can record its change in the ledger.
+        self.flushed_stock = stock
+        self.on_order = 0
+        self.units_sold = 0
+        self.stockouts = 0
+        self.dirty = False
+
+
+class SimOrder:
+    __slots__ = ("id", "placed_at", "status", "lines", "total_amount", "pick_started_at", "shipment", "dirty")
+
+    def __init__(self, order_id, placed_at, lines, total_amount):
+        self.id = order_id
+        self.placed_at = placed_at
+        self.status = "pending"
+        self.lines = lines
+        self.total_amount = total_amount
+        self.pick_started_at = None
+        self.shipment = None
+        self.dirty = False
+
+
+class SimShipment:
+    """In-memory counterpart of Shipment; mark_shipped/mark_delivered take the simulated time."""
+
+    __slots__ = ("order", "shipped_at", "delivery_status", "dirty")
+
+    def __init__(self, order):
+        self.order = order
+        self.shipped_at = None
+        self.delivery_status = "not shipped"
+        self.dirty = False
+
+    def mark_shipped(self, now):
+        self.shipped_at = now
+        self.delivery_status = "in transit"
+
+    def mark_delivered(self, now):
+        self.delivery_status = "delivered"
+
+
+class SimulationStats:
+    __slots__ = (
+        "events", "placed", "lost", "fulfilled", "shipped", "delivered", "restocks", "units_received",
+        "picker_busy", "max_backlog", "ship_hours", "wait_hours", "flushes",
+    )
+
+    def __init__(self):
+        self.events = self.placed = self.lost = self.fulfilled = self.shipped = self.delivered = 0
+        self.restocks = self.units_received = self.max_backlog = self.flushes = 0
+        self.picker_busy = 0.0
+        self.ship_hours = []
+        self.wait_hours = []
+
+
+class ArrivalStream:
+    """
+    Order arrivals and their baskets, pre-drawn with NumPy a block at a time.
+    The event loop then only pops plain Python values, which keeps the cost of
+    an arrival close to the cost of its stock bookkeeping.
+    """
+
+    __slots__ = ("config", "rng", "popularity", "clock", "times", "starts", "products", "quantities", "index")
+
+    def __init__(self, config, popularity, seed=None):
+        self.config = config
+        self.rng = np.random.default_rng(seed)
+        self.popularity = np.asarray(popularity)
+        self.clock = 0.0
+        self.index = 0
+        self.times = []
+        self.refill()
+
+    def refill(self):
+        config, rng = self.config, self.rng
+        profile = config.hourly_profile
+        peak = max(profile) if profile is not None else 1.0
+        times = self.clock + np.cumsum(rng.exponential(HOUR / (config.arrivals_per_hour * peak), ARRIVAL_BLOCK))
+        self.clock = float(times[-1])
+        if profile is not None:
+            # Thinning: keep each candidate with probability profile[hour] / peak.
+            hours = (times // HOUR).astype(np.int64) % 24
+            times = times[rng.random(len(times)) * peak <= np.asarray(profile)[hours]]
+        low, high = config.items_per_order
+        sizes = rng.integers(low, high + 1, len(times))
+        ends = np.cumsum(sizes)
+        picks = np.searchsorted(self.popularity, rng.random(int(ends[-1])) * self.popularity[-1], side="right")
+        self.times = times.tolist()
+        self.starts = np.concatenate(([0], ends)).tolist()
+        self.products = picks.tolist()
+        self.quantities = rng.integers(1, config.max_quantity + 1, len(picks)).tolist()
+        self.index = 0
+
+    def peek(self):
+        """Time of the next arrival."""
+        if self.index == len(self.times):
+            self.refill()
+        return self.times[self.index]
+
+    def pop(self):
+        """Return the next arrival's product ranks and quantities, in draw order."""
+        i = self.index
+        self.index = i + 1
+        start, end = self.starts[i], self.starts[i + 1]
+        return self.products[start:end], self.quantities[start:end]
+
+
+class WarehouseSimulation:
+    """
+    Discrete-event simulation of the order lifecycle over simulated time.
+
+    Orders arrive as a Poisson process and reserve stock on arrival, the way
+    services.place_order does; an order that cannot be met is a lost sale.
+    Placed orders queue for a fixed pool of pickers, are fulfilled when picked,
+    shipped after a dispatch delay and delivered after a transit time.
+    Stock is replenished by a reorder-point or periodic-review policy.
+    """
+
+    def __init__(self, products, config=None, start=None, first_order_id=1, flusher=None):
+        self.config = config or SimulationConfig()
+        self.products = products
+        self.start = start or datetime.now().replace(microsecond=0)
+        self.rng = random.Random(self.config.seed)
+        self.stats = SimulationStats()
+        self.next_order_id = first_order_id
+        self.flusher = flusher
+        self.queue = []
+        self.sequence = count()
+        self.backlog = deque()
+        self.free_pickers = self.config.pickers
+        self.dirty_orders = []
+        self.dirty_shipments = []
+        self.new_orders = []
+
+        ranked = list(products)
+        self.rng.shuffle(ranked)
+        self.ranked_products = ranked
+        self.arrivals = ArrivalStream(self.config, zipf_cum_weights(len(ranked)), self.config.seed)
+
+    def schedule(self, at, kind, payload=None):
+        heapq.heappush(self.queue, (at, next(self.sequence), kind, payload))
+
+    def run(self):
+        """Process events until the horizon and return the stats."""
+        config = self.config
+        horizon = config.days * DAY
+        if config.restock_policy == "periodic":
+            self.schedule(0.0, REVIEW)
+        if self.flusher is not None and config.flush_days > 0:
+            self.schedule(config.flush_days * DAY, FLUSH)
+
+        queue, heappop, stats = self.queue, heapq.heappop, self.stats
+        handlers = {
+            RESTOCK: self.on_restock,
+            REVIEW: self.on_review,
+            PICKED: self.on_picked,
+            SHIPPED: self.on_shipped,
+            DELIVERED: self.on_delivered,
+            FLUSH: self.on_flush,
+        }
+        arrival, picked = self.on_arrival, self.on_picked
+        arrivals = self.arrivals
+        arrival_at = arrivals.peek()
+        events = 0
+        while True:
+            if queue and queue[0][0] <= arrival_at:
+                now, _, kind, payload = heappop(queue)
+                if now > horizon:
+                    break
+                if kind == PICKED:
+                    picked(now, payload)
+                else:
+                    handlers[kind](now, payload)
+            else:
+                now = arrival_at
+                if now > horizon:
+                    break
+                arrival(now, *arrivals.pop())
+                arrival_at = arrivals.peek()
+            events += 1
+        stats.events = events
+        if self.flusher is not None:
+            self.flusher.flush(self, horizon)
+            stats.flushes += 1
+        return stats
+
+    def on_arrival(self, now, ranks, quantities):
+        stats, ranked = self.stats, self.ranked_products
+        basket = {}
+        for rank, quantity in zip(ranks, quantities):
+            product = ranked[rank]
+            if product not in basket:
+                basket[product] = quantity
+        short = [product for product, quantity in basket.items() if product.stock < quantity]
+        if short:
+            stats.lost += 1
+            for product in short:
+                product.stockouts += 1
+            return
+
+        lines = list(basket.items())
+        total_amount = 0.0
+        for product, quantity in lines:
+            product.stock -= quantity
+            product.units_sold += quantity
+            total_amount += quantity * product.price
+            self.stock_changed(product, now)
+        if self.flusher is not None:
+            # The database hands out the ID when the order is flushed.
+            order = SimOrder(None, now, lines, total_amount)
+            self.new_orders.append(order)
+            self.order_changed(order)
+        else:
+            order = SimOrder(self.next_order_id, now, lines, total_amount)
+            self.next_order_id += 1
+        stats.placed += 1
+
+        if self.free_pickers:
+            self.free_pickers -= 1
+            self.start_pick(order, now)
+        else:
+            self.backlog.append(order)
+            if len(self.backlog) > stats.max_backlog:
+                stats.max_backlog = len(self.backlog)
+
+    def start_pick(self, order, now):
+        config = self.config
+        order.pick_started_at = now
+        duration = (config.pick_minutes + config.pick_minutes_per_line * len(order.lines)) * 60.0
+        duration *= 0.5 + self.rng.random()
+        self.stats.picker_busy += duration
+        self.schedule(now + duration, PICKED, order)
+
+    def on_picked(self, now, order):
+        stats = self.stats
+        order.status = "fulfilled"
+        order.shipment = SimShipment(order)
+        stats.fulfilled += 1
+        stats.wait_hours.append((order.pick_started_at - order.placed_at) / HOUR)
+        if self.flusher is not None:
+            self.order_changed(order)
+            self.shipment_changed(order.shipment)
+        self.schedule(now + self.config.dispatch_hours * HOUR, SHIPPED, order.shipment)
+
+        if self.backlog:
+            self.start_pick(self.backlog.popleft(), now)
+        else:
+            self.free_pickers += 1
+
+    def on_shipped(self, now, shipment):
+        shipment.mark_shipped(now)
+        self.stats.shipped += 1
+        self.stats.ship_hours.append((now - shipment.order.placed_at) / HOUR)
+        if self.flusher is not None:
+            self.shipment_changed(shipment)
+        transit = self.config.transit_days * DAY * (0.5 + self.rng.random())
+        self.schedule(now + transit, DELIVERED, shipment)
+
+    def on_delivered(self, now, shipment):
+        shipment.mark_delivered(now)
+        self.stats.delivered += 1
+        if self.flusher is not None:
+            self.shipment_changed(shipment)
+
+    def stock_changed(self, product, now):
+        config = self.config
+        if config.restock_policy == "reorder-point" and not product.on_order and product.stock <= config.reorder_point:
+            self.place_purchase_order(product, config.reorder_qty, now)
+        if self.flusher is not None:
+            product.dirty = True
+
+    def place_purchase_order(self, product, quantity, now):
+        product.on_order = quantity
+        self.schedule(now + self.config.lead_time_days * DAY, RESTOCK, product)
+
+    def on_restock(self, now, product):
+        product.stock += product.on_order
+        self.stats.restocks += 1
+        self.stats.units_received += product.on_order
+        product.on_order = 0
+        if self.flusher is not None:
+            product.dirty = True
+
+    def on_review(self, now, payload=None):
+        config = self.config
+        for product in self.products:
+            if not product.on_order and product.stock < config.order_up_to:
+                self.place_purchase_order(product, config.order_up_to - product.stock, now)
+        self.schedule(now + config.review_days * DAY, REVIEW)
+
+    def on_flush(self, now, payload=None):
+        self.flusher.flush(self, now)
+        self.stats.flushes += 1
+        self.schedule(now + self.config.flush_days * DAY, FLUSH)
+
+    def order_changed(self, order):
+        if not order.dirty:
+            order.dirty = True
+            self.dirty_orders.append(order)
+
+    def shipment_changed(self, shipment):
+        if not shipment.dirty:
+            shipment.dirty = True
+            self.dirty_shipments.append(shipment)
+
+    def timestamp(self, seconds):
+        return format_datetime(self.start + timedelta(seconds=seconds))
+
+
+def executemany_compiled(conn, stmt, rows):
+    """Run a statement with named bindparams once per dict in rows, skipping per-row bind processing."""
+    compiled = stmt.compile(dialect=conn.dialect)
+    # Literals in the statement, such as version + 1, are bound parameters too.
+    fixed = compiled.construct_params(rows[0])
+    keys = compiled.positiontup
+    conn.exec_driver_sql(str(compiled), [tuple(row.get(key, fixed[key]) for key in keys) for row in rows])
+
+
+class DatabaseFlusher:
+    """Writes simulated orders, items, shipments and stock levels to the database, one transaction per flush."""
+
+    def __init__(self, engine=None):
+        self.engine = engine or get_engine()
+        orders = Order.__table__
+        self.order_update = (
+            update(orders)
+            .where(orders.c.id == bindparam("order_id"))
+            .values(status=bindparam("status"), updated_at=bindparam("stamp"))
+        )
+        shipments = insert(Shipment.__table__)
+        self.shipment_upsert = shipments.on_conflict_do_update(
+            index_elements=[Shipment.order_id],
+            set_={
+                "shipped_date": shipments.excluded.shipped_date,
+                "delivery_status": shipments.excluded.delivery_status,
+                "updated_at": shipments.excluded.updated_at,
+            },
+        )
+        products = Product.__table__
+        self.stock_update = (
+            update(products)
+            .where(products.c.id == bindparam("product_id"))
+            .values(stock_quantity=bindparam("stock"), version=products.c.version + 1,
+                    updated_at=bindparam("stamp"))
+        )
+
+    def flush(self, simulation, now):
+        # Simulated time goes into order_date and shipped_date only. updated_at
+        # is wall-clock time, since the catalog cache and the archive compare it
+        # against the real clock.
+        stamp = simulation.timestamp
+        updated_at = format_datetime(datetime.now())
+        changed_orders = [
+            {"order_id": o.id, "status": o.status, "stamp": updated_at}
+            for o in simulation.dirty_orders if o.id is not None
+        ]
+        dirty_products = [p for p in simulation.products if p.dirty]
+        products = [{"product_id": p.id, "stock": p.stock, "stamp": updated_at} for p in dirty_products]
+        new_orders = simulation.new_orders
+        with self.engine.begin() as conn:
+            if new_orders:
+                # Continue after every ID SQLite has handed out, including those of
+                # deleted and archived orders. A plain INSERT makes an order written
+                # concurrently by the app fail this flush instead of being overwritten.
+                first_id = conn.exec_driver_sql(
+                    "SELECT max(coalesce((SELECT seq FROM sqlite_sequence WHERE name = 'orders'), 0), "
+                    "coalesce((SELECT max(id) FROM orders), 0)) + 1"
+                ).scalar()
+                for order_id, o in enumerate(new_orders, start=first_id):
+                    o.id = order_id
+                bulk_insert(conn, Order.__table__, ORDER_COLUMNS, [
+                    (o.id, SIMULATED_CUSTOMER, stamp(o.placed_at), o.status, updated_at, len(o.lines), o.total_amount)
+                    for o in new_orders
+                ])
+                bulk_insert(conn, OrderItem.__table__, ORDER_ITEM_COLUMNS, [
+                    (o.id, product.id, quantity, product.price) for o in new_orders for product, quantity in o.lines
+                ])
+            if changed_orders:
+                executemany_compiled(conn, self.order_update, changed_orders)
+            shipments = [
+                (s.order.id, stamp(s.shipped_at) if s.shipped_at is not None else None, s.delivery_status, updated_at)
+                for s in simulation.dirty_shipments
+            ]
+            if shipments:
+                sql = str(self.shipment_upsert.compile(dialect=conn.dialect, column_keys=list(SHIPMENT_COLUMNS)))
+                conn.exec_driver_sql(sql, shipments)
+            if products:
+                executemany_compiled(conn, self.stock_update, products)
+                record_movements(conn, [(p.id, p.stock - p.flushed_stock) for p in dirty_products], "simulation")
+
+        for o in simulation.dirty_orders:
+            o.dirty = False
+        for s in simulation.dirty_shipments:
+            s.dirty = False
+        for p in dirty_products:
+            p.flushed_stock = p.stock
+            p.dirty = False
+        simulation.dirty_orders.clear()
+        simulation.dirty_shipments.clear()
+        simulation.new_orders.clear()
+
+
+def load_catalog(conn):
+    """Read products from the database into simulation state."""
+    rows = conn.exec_driver_sql("SELECT id, sku, price_per_unit, stock_quantity FROM products ORDER BY id")
+    return [SimProduct(*row) for row in rows]
+
+
+def synthetic_catalog(count, config, seed=None):
+    """Build an in-memory catalog of count products stocked between the reorder point and order-up-to level."""
+    rng = random.Random(seed)
+    return [
+        SimProduct(product_id, f"SIM-{product_id:07d}", round(rng.uniform(300, 90000), 2),
+                   rng.randint(config.reorder_point, max(config.reorder_point, config.order_up_to)))
+        for product_id in range(1, count + 1)
+    ]
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(pct / 100.0 * len(ordered)))]
+
+
+def print_simulation_report(simulation, elapsed):
+    stats, config = simulation.stats, simulation.config
+    capacity = config.pickers * config.days * DAY
+    demand = stats.placed + stats.lost
+    print(f"\n--- 🏭 Simulated {config.days:g} day(s) with {config.pickers} picker(s) ---")
+    print(f"🛒 Orders placed:       {stats.placed:,} ({stats.lost:,} lost to stockouts, "
+          f"{stats.lost / demand if demand else 0:.1%} of demand)")
+    print(f"✅ Fulfilled:           {stats.fulfilled:,}  🚚 Shipped: {stats.shipped:,}  📬 Delivered: {stats.delivered:,}")
+    print(f"⏳ Pick queue wait:     p50 {percentile(stats.wait_hours, 50):.2f}h, "
+          f"p95 {percentile(stats.wait_hours, 95):.2f}h (max backlog {stats.max_backlog:,})")
+    print(f"📦 Order to ship:       p50 {percentile(stats.ship_hours, 50):.2f}h, p95 {percentile(stats.ship_hours, 95):.2f}h")
+    print(f"👷 Picker utilization:  {min(stats.picker_busy / capacity, 1.0) if capacity else 0:.1%}")
+    print(f"🔄 Restocks:            {stats.restocks:,} ({stats.units_received:,} units received)")
+    out_of_stock = sum(1 for p in simulation.products if p.stock == 0)
+    print(f"📉 Out of stock at end: {out_of_stock:,} of {len(simulation.products):,} product(s)")
+    if stats.flushes:
+        print(f"💾 Flushed to the database {stats.flushes} time(s)")
+    print(f"⏱️ {stats.events:,} events in {elapsed:.2f}s ({stats.events / elapsed if elapsed else 0:,.0f} events/sec)")
+
+
+def parse_profile(value):
+    try:
+        return tuple(float(v) for v in value.split(","))
+    except ValueError:
+        raise argparse.ArgumentTypeError("the hourly profile must be 24 comma-separated numbers")
+
+
+def main(argv=None):
+    defaults = SimulationConfig()
+    parser = argparse.ArgumentParser(description="Discrete-event simulation of warehouse operations for capacity planning.")
+    parser.add_argument("--days", type=float, default=defaults.days, help="simulated days")
+    parser.add_argument("--arrivals-per-hour", type=float, default=defaults.arrivals_per_hour, help="mean order arrival rate")
+    parser.add_argument("--hourly-profile", type=parse_profile,
+                        help="24 comma-separated multipliers shaping arrivals over the day")
+    parser.add_argument("--items-per-order", type=parse_range, default=defaults.items_per_order,
+                        help="distinct items per order as MIN..MAX")
+    parser.add_argument("--pickers", type=int, default=defaults.pickers, help="orders picked in parallel")
+    parser.add_argument("--pick-minutes", type=float, default=defaults.pick_minutes, help="mean base pick time per order")
+    parser.add_argument("--pick-minutes-per-line", type=float, default=defaults.pick_minutes_per_line,
+                        help="mean extra pick time per order line")
+    parser.add_argument("--dispatch-hours", type=float, default=defaults.dispatch_hours, help="delay from pick to carrier pickup")
+    parser.add_argument("--transit-days", type=float, default=defaults.transit_days, help="mean delivery time")
+    parser.add_argument("--restock-policy", choices=RESTOCK_POLICIES, default=defaults.restock_policy)
+    parser.add_argument("--reorder-point", type=int, default=defaults.reorder_point, help="reorder when stock falls to this")
+    parser.add_argument("--reorder-qty", type=int, default=defaults.reorder_qty, help="units per reorder-point purchase")
+    parser.add_argument("--order-up-to", type=int, default=defaults.order_up_to, help="periodic review target stock")
+    parser.add_argument("--review-days", type=float, default=defaults.review_days, help="periodic review interval")
+    parser.add_argument("--lead-time-days", type=float, default=defaults.lead_time_days, help="supplier lead time")
+    parser.add_argument("--products", type=int,
+                        help="simulate a synthetic catalog of this many products instead of the database's")
+    parser.add_argument("--flush-days", type=float, default=0.0,
+                        help="write simulated orders to the database every N simulated days (0 = never)")
+    parser.add_argument("--start", type=lambda v: datetime.strptime(v, "%Y-%m-%d"),
+                        help="simulated start date, YYYY-MM-DD (default: now)")
+    parser.add_argument("--seed", type=int, default=defaults.seed, help="random seed")
+    args = parser.parse_args(argv)
+    if args.products is not None and args.products < 1:
+        parser.error("--products must be at least 1")
+    if args.products and args.flush_days:
+        parser.error("--flush-days writes into the database, so it needs the database's own catalog (drop --products)")
+
+    config = SimulationConfig(
+        days=args.days, arrivals_per_hour=args.arrivals_per_hour, hourly_profile=args.hourly_profile,
+        items_per_order=args.items_per_order, pickers=args.pickers, pick_minutes=args.pick_minutes,
+        pick_minutes_per_line=args.pick_minutes_per_line, dispatch_hours=args.dispatch_hours,
+        transit_days=args.transit_days, restock_policy=args.restock_policy, reorder_point=args.reorder_point,
+        reorder_qty=args.reorder_qty, order_up_to=args.order_up_to, review_days=args.review_days,
+        lead_time_days=args.lead_time_days, flush_days=args.flush_days, seed=args.seed,
+    )
+    flusher = None
+    if args.products:
+        products = synthetic_catalog(args.products, config, args.seed)
+    else:
+        with get_engine().connect() as conn:
+            products = load_catalog(conn)
+        if not products:
+            parser.error("the database has no products; seed it first or pass --products")
+        if args.flush_days:
+            flusher = DatabaseFlusher()
+
+    simulation = WarehouseSimulation(products, config, start=args.start, flusher=flusher)
+    started = time.perf_counter()
+    simulation.run()
+    print_simulation_report(simulation, time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    main()
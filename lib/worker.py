@@ -0,0 +1,193 @@
+# lib/worker.py
+
+import argparse
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+
+from lib.models import Session, get_engine, Product, Order
+from lib import services
+
+DEFAULT_WORKERS = 4
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BACKOFF = 0.005
+
+
+class FulfillmentStats:
+    """Counters for one fulfillment run (or one batch of it)."""
+
+    FIELDS = ("fulfilled", "insufficient_stock", "skipped", "conflicts", "failed")
+
+    def __init__(self, **counts):
+        for field in self.FIELDS:
+            setattr(self, field, counts.get(field, 0))
+
+    def merge(self, other):
+        for field in self.FIELDS:
+            setattr(self, field, getattr(self, field) + getattr(other, field))
+
+    def as_dict(self):
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    @property
+    def attempts(self):
+        return self.fulfilled + self.insufficient_stock + self.skipped + self.failed + self.conflicts
+
+
+def fulfill_with_retry(order_id, stats, max_retries=DEFAULT_MAX_RETRIES, backoff=DEFAULT_BACKOFF):
+    """Fulfill one order in its own transaction, retrying with jittered exponential backoff on conflicts."""
+    for attempt in range(max_retries + 1):
+        session = Session()
+        try:
+            services.fulfill_order(session, order_id)
+            stats.fulfilled += 1
+            return
+        except services.ConcurrencyConflictError:
+            stats.conflicts += 1
+            if attempt == max_retries:
+                stats.failed += 1
+                return
+            time.sleep(backoff * (2 ** attempt) * (0.5 + random.random()))
+        except services.InsufficientStockError:
+            stats.insufficient_stock += 1
+            return
+        except (services.InvalidStateError, services.NotFoundError):
+            stats.skipped += 1
+            return
+        finally:
+            session.close()
+
+
+def fulfill_wave_with_retry(order_ids, stats, max_retries=DEFAULT_MAX_RETRIES, backoff=DEFAULT_BACKOFF):
+    """Fulfill a batch as one wave in a single transaction, retrying the whole wave on conflicts."""
+    for attempt in range(max_retries + 1):
+        session = Session()
+        try:
+            result = services.fulfill_wave(session, order_ids)
+            stats.fulfilled += len(result.shipments)
+            stats.insufficient_stock += len(result.short)
+            stats.skipped += len(result.skipped)
+            return
+        except services.ConcurrencyConflictError:
+            stats.conflicts += 1
+            if attempt == max_retries:
+                stats.failed += len(order_ids)
+                return
+            time.sleep(backoff * (2 ** attempt) * (0.5 + random.random()))
+        finally:
+            session.close()
+
+
+def fulfill_batch(order_ids, max_retries=DEFAULT_MAX_RETRIES, backoff=DEFAULT_BACKOFF, waves=False):
+    """Fulfill a claimed batch of orders one by one, or as one wave; returns the batch counters as a dict."""
+    stats = FulfillmentStats()
+    if waves:
+        fulfill_wave_with_retry(order_ids, stats, max_retries, backoff)
+        return stats.as_dict()
+    for order_id in order_ids:
+        fulfill_with_retry(order_id, stats, max_retries, backoff)
+    return stats.as_dict()
+
+
+def reset_engine_in_child():
+    """Forked processes must not reuse the parent's pooled SQLite connections."""
+    get_engine().dispose(close=False)
+
+
+def pending_order_batches(batch_size, limit=None):
+    """Yield lists of pending order IDs in ascending order using keyset pagination."""
+    session = Session()
+    try:
+        last_id, claimed = 0, 0
+        while limit is None or claimed < limit:
+            size = batch_size if limit is None else min(batch_size, limit - claimed)
+            ids = [
+                row.id for row in
+                session.query(Order.id)
+                .filter(Order.status == "pending", Order.id > last_id)
+                .order_by(Order.id)
+                .limit(size)
+            ]
+            if not ids:
+                return
+            last_id = ids[-1]
+            claimed += len(ids)
+            yield ids
+    finally:
+        session.close()
+
+
+def count_oversold_products():
+    session = Session()
+    try:
+        return session.query(Product).filter(Product.stock_quantity < 0).count()
+    finally:
+        session.close()
+
+
+def fulfill_pending(workers=DEFAULT_WORKERS, batch_size=DEFAULT_BATCH_SIZE, use_processes=False,
+                    limit=None, max_retries=DEFAULT_MAX_RETRIES, backoff=DEFAULT_BACKOFF, waves=False):
+    """
+    Fulfill pending orders in batches across a thread or process pool and
+    return the totals. With waves, each batch is fulfilled as one wave in a
+    single transaction instead of one transaction per order.
+    """
+    if use_processes:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=reset_engine_in_child)
+    else:
+        pool = ThreadPoolExecutor(max_workers=workers)
+
+    totals = FulfillmentStats()
+    started = time.perf_counter()
+    with pool:
+        futures = [
+            pool.submit(fulfill_batch, ids, max_retries, backoff, waves)
+            for ids in pending_order_batches(batch_size, limit)
+        ]
+        for future in as_completed(futures):
+            totals.merge(FulfillmentStats(**future.result()))
+    return totals, time.perf_counter() - started
+
+
+def print_fulfillment_report(stats, elapsed):
+    throughput = stats.fulfilled / elapsed if elapsed else 0.0
+    conflict_rate = stats.conflicts / stats.attempts if stats.attempts else 0.0
+    print("\n--- 🏭 Fulfillment Run ---")
+    print(f"✅ Fulfilled:          {stats.fulfilled}")
+    print(f"⚠️ Insufficient stock: {stats.insufficient_stock}")
+    print(f"⏭️ Skipped:            {stats.skipped} (no longer pending)")
+    print(f"🔁 Conflicts retried:  {stats.conflicts} ({conflict_rate:.1%} of attempts)")
+    print(f"❗ Gave up:            {stats.failed}")
+    print(f"⏱️ {elapsed:.2f}s, {throughput:,.0f} orders/sec")
+    oversold = count_oversold_products()
+    if oversold:
+        print(f"🛑 {oversold} product(s) have negative stock!")
+    else:
+        print("📦 No product is oversold.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Background workers for the warehouse.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    fulfill = subparsers.add_parser("fulfill-pending", help="fulfill pending orders in parallel")
+    fulfill.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="pool size")
+    fulfill.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="orders claimed per task")
+    fulfill.add_argument("--processes", action="store_true", help="use a process pool instead of threads")
+    fulfill.add_argument("--limit", type=int, help="stop after this many pending orders")
+    fulfill.add_argument("--max-retries", type=int, default=DEFAULT_MAX_RETRIES, help="retries per order (or wave) on conflicts")
+    fulfill.add_argument("--waves", action="store_true",
+                         help="fulfill each batch as one wave: one stock read and one commit per batch")
+
+    args = parser.parse_args(argv)
+    if args.command == "fulfill-pending":
+        stats, elapsed = fulfill_pending(
+            workers=args.workers, batch_size=args.batch_size, use_processes=args.processes,
+            limit=args.limit, max_retries=args.max_retries, waves=args.waves,
+        )
+        print_fulfillment_report(stats, elapsed)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ from sqlalchemy import pool
 from alembic import context
 
 from lib.models import Base 
+from lib.config import get_database_url
 
 import os
 import sys
@@ -20,12 +21,24 @@ config = context.config
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
+# Use the same database URL as the application (WAREHOUSE_DATABASE_URL or
+# warehouse.ini), so migrations never target a different file than the CLI.
+config.set_main_option("sqlalchemy.url", get_database_url())
+
 # add your model's MetaData object here
 # for 'autogenerate' support
 # from myapp import mymodel
 # target_metadata = mymodel.Base.metadata
 target_metadata = Base.metadata
 
+# products_fts and its shadow tables are created by hand in a migration and
+# are not part of the models, so autogenerate must not try to drop them.
+SEARCH_INDEX_PREFIX = "products_fts"
+
+
+def include_name(name, type_, parent_names):
+    return not (type_ == "table" and name.startswith(SEARCH_INDEX_PREFIX))
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -71,7 +84,7 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata, include_name=include_name
         )
 
         with context.begin_transaction():
@@ -0,0 +1,28 @@
+"""add indexes on shipments.delivery_status and shipments.shipped_date
+
+Revision ID: 0b5e7d2a9c14
+Revises: f1c9e4b7a358
+Create Date: 2026-10-17 16:10:37.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b5e7d2a9c14'
+down_revision: Union[str, None] = 'f1c9e4b7a358'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f('ix_shipments_delivery_status'), 'shipments', ['delivery_status'], unique=False)
+    op.create_index(op.f('ix_shipments_shipped_date'), 'shipments', ['shipped_date'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_shipments_shipped_date'), table_name='shipments')
+    op.drop_index(op.f('ix_shipments_delivery_status'), table_name='shipments')
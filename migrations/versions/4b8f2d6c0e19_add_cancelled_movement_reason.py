@@ -0,0 +1,43 @@
+"""add 'cancelled' to movement_reason
+
+Revision ID: 4b8f2d6c0e19
+Revises: 9d4e6b1f3a75
+Create Date: 2026-10-17 19:40:23.118604
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b8f2d6c0e19'
+down_revision: Union[str, None] = '9d4e6b1f3a75'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+OLD_REASONS = (
+    'order placed', 'item added', 'item removed', 'order deleted',
+    'fulfilled', 'adjustment', 'import', 'reconciliation',
+)
+NEW_REASONS = (
+    'order placed', 'item added', 'item removed', 'order deleted', 'cancelled',
+    'fulfilled', 'adjustment', 'import', 'reconciliation',
+)
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('stock_movements', table_kwargs={'sqlite_autoincrement': True}) as batch_op:
+        batch_op.alter_column('reason',
+               existing_type=sa.Enum(*OLD_REASONS, name='movement_reason'),
+               type_=sa.Enum(*NEW_REASONS, name='movement_reason'),
+               existing_nullable=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('stock_movements', table_kwargs={'sqlite_autoincrement': True}) as batch_op:
+        batch_op.alter_column('reason',
+               existing_type=sa.Enum(*NEW_REASONS, name='movement_reason'),
+               type_=sa.Enum(*OLD_REASONS, name='movement_reason'),
+               existing_nullable=False)
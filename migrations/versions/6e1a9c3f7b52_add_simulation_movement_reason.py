@@ -0,0 +1,40 @@
+"""add 'simulation' to movement_reason
+
+Revision ID: 6e1a9c3f7b52
+Revises: 4b8f2d6c0e19
+Create Date: 2026-10-17 20:05:51.602337
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6e1a9c3f7b52'
+down_revision: Union[str, None] = '4b8f2d6c0e19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+OLD_REASONS = (
+    'order placed', 'item added', 'item removed', 'order deleted', 'cancelled',
+    'fulfilled', 'adjustment', 'import', 'reconciliation',
+)
+NEW_REASONS = OLD_REASONS + ('simulation',)
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('stock_movements', table_kwargs={'sqlite_autoincrement': True}) as batch_op:
+        batch_op.alter_column('reason',
+               existing_type=sa.Enum(*OLD_REASONS, name='movement_reason'),
+               type_=sa.Enum(*NEW_REASONS, name='movement_reason'),
+               existing_nullable=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('stock_movements', table_kwargs={'sqlite_autoincrement': True}) as batch_op:
+        batch_op.alter_column('reason',
+               existing_type=sa.Enum(*NEW_REASONS, name='movement_reason'),
+               type_=sa.Enum(*OLD_REASONS, name='movement_reason'),
+               existing_nullable=False)
@@ -0,0 +1,52 @@
+"""add products_fts full-text search table with sync triggers
+
+Revision ID: 7c2f5a9d1e83
+Revises: 0b5e7d2a9c14
+Create Date: 2026-10-17 17:05:12.840331
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c2f5a9d1e83'
+down_revision: Union[str, None] = '0b5e7d2a9c14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute(
+        "CREATE VIRTUAL TABLE products_fts USING fts5("
+        "name, sku, content='products', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    )
+    op.execute(
+        "CREATE TRIGGER products_fts_insert AFTER INSERT ON products BEGIN "
+        "INSERT INTO products_fts (rowid, name, sku) VALUES (new.id, new.name, new.sku); END"
+    )
+    op.execute(
+        "CREATE TRIGGER products_fts_delete AFTER DELETE ON products BEGIN "
+        "INSERT INTO products_fts (products_fts, rowid, name, sku) VALUES ('delete', old.id, old.name, old.sku); END"
+    )
+    op.execute(
+        "CREATE TRIGGER products_fts_update AFTER UPDATE OF name, sku ON products BEGIN "
+        "INSERT INTO products_fts (products_fts, rowid, name, sku) VALUES ('delete', old.id, old.name, old.sku); "
+        "INSERT INTO products_fts (rowid, name, sku) VALUES (new.id, new.name, new.sku); END"
+    )
+    # Index the products that already exist.
+    op.execute("INSERT INTO products_fts (products_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute("DROP TRIGGER IF EXISTS products_fts_update")
+    op.execute("DROP TRIGGER IF EXISTS products_fts_delete")
+    op.execute("DROP TRIGGER IF EXISTS products_fts_insert")
+    op.execute("DROP TABLE IF EXISTS products_fts")
@@ -0,0 +1,39 @@
+"""recreate orders, order_items and shipments with AUTOINCREMENT ids
+
+Revision ID: 9d4e6b1f3a75
+Revises: 7c2f5a9d1e83
+Create Date: 2026-10-17 19:12:08.415927
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d4e6b1f3a75'
+down_revision: Union[str, None] = '7c2f5a9d1e83'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('orders', 'order_items', 'shipments')
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    # SQLite hands out max(id) + 1 without AUTOINCREMENT, so the IDs of
+    # archived rows could be reused. Migrations run without PRAGMA
+    # foreign_keys, so recreating orders does not cascade to its children.
+    for table in TABLES:
+        with op.batch_alter_table(table, recreate='always', table_kwargs={'sqlite_autoincrement': True}):
+            pass
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for table in TABLES:
+        with op.batch_alter_table(table, recreate='always', table_kwargs={'sqlite_autoincrement': False}):
+            pass
@@ -0,0 +1,40 @@
+"""add indexes on foreign keys and filter columns
+
+Revision ID: a41c7d2e9b10
+Revises: 5f9560968902
+Create Date: 2026-10-17 09:12:44.318205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a41c7d2e9b10'
+down_revision: Union[str, None] = '5f9560968902'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # A shipment belongs to exactly one order. Drop any duplicates (keeping the
+    # oldest shipment per order) so the unique index below can be built.
+    op.execute(
+        "DELETE FROM shipments WHERE id NOT IN "
+        "(SELECT MIN(id) FROM shipments GROUP BY order_id)"
+    )
+    op.create_index(op.f('ix_order_items_order_id'), 'order_items', ['order_id'], unique=False)
+    op.create_index(op.f('ix_order_items_product_id'), 'order_items', ['product_id'], unique=False)
+    op.create_index(op.f('ix_orders_order_date'), 'orders', ['order_date'], unique=False)
+    op.create_index(op.f('ix_orders_status'), 'orders', ['status'], unique=False)
+    op.create_index(op.f('ix_shipments_order_id'), 'shipments', ['order_id'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_shipments_order_id'), table_name='shipments')
+    op.drop_index(op.f('ix_orders_status'), table_name='orders')
+    op.drop_index(op.f('ix_orders_order_date'), table_name='orders')
+    op.drop_index(op.f('ix_order_items_product_id'), table_name='order_items')
+    op.drop_index(op.f('ix_order_items_order_id'), table_name='order_items')
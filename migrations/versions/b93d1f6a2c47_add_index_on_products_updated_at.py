@@ -0,0 +1,26 @@
+"""add index on products.updated_at for catalog cache refreshes
+
+Revision ID: b93d1f6a2c47
+Revises: e2b86f04c93a
+Create Date: 2026-10-17 14:12:08.431975
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b93d1f6a2c47'
+down_revision: Union[str, None] = 'e2b86f04c93a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f('ix_products_updated_at'), 'products', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_products_updated_at'), table_name='products')
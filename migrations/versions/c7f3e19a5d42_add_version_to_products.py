@@ -0,0 +1,27 @@
+"""add version to products for optimistic locking
+
+Revision ID: c7f3e19a5d42
+Revises: a41c7d2e9b10
+Create Date: 2026-10-17 10:05:31.902114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7f3e19a5d42'
+down_revision: Union[str, None] = 'a41c7d2e9b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('products', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('products') as batch_op:
+        batch_op.drop_column('version')
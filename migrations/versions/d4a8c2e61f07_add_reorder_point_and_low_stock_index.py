@@ -0,0 +1,35 @@
+"""add reorder_point and reorder_qty to products with a partial low-stock index
+
+Revision ID: d4a8c2e61f07
+Revises: b93d1f6a2c47
+Create Date: 2026-10-17 12:20:14.418305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a8c2e61f07'
+down_revision: Union[str, None] = 'b93d1f6a2c47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('products', sa.Column('reorder_point', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('products', sa.Column('reorder_qty', sa.Integer(), server_default='0', nullable=False))
+    op.create_index(
+        'ix_products_low_stock', 'products', ['stock_quantity'], unique=False,
+        sqlite_where=sa.text('stock_quantity <= reorder_point'),
+        postgresql_where=sa.text('stock_quantity <= reorder_point'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_products_low_stock', table_name='products')
+    with op.batch_alter_table('products') as batch_op:
+        batch_op.drop_column('reorder_qty')
+        batch_op.drop_column('reorder_point')
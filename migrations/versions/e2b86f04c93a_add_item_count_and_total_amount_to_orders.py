@@ -0,0 +1,36 @@
+"""add item_count and total_amount to orders
+
+Revision ID: e2b86f04c93a
+Revises: c7f3e19a5d42
+Create Date: 2026-10-17 11:02:17.553860
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b86f04c93a'
+down_revision: Union[str, None] = 'c7f3e19a5d42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('orders', sa.Column('item_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('orders', sa.Column('total_amount', sa.Float(), server_default='0', nullable=False))
+    # Backfill from the existing order items.
+    op.execute(
+        "UPDATE orders SET "
+        "item_count = (SELECT COUNT(*) FROM order_items WHERE order_items.order_id = orders.id), "
+        "total_amount = (SELECT COALESCE(SUM(quantity * unit_price), 0) "
+        "FROM order_items WHERE order_items.order_id = orders.id)"
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('orders') as batch_op:
+        batch_op.drop_column('total_amount')
+        batch_op.drop_column('item_count')
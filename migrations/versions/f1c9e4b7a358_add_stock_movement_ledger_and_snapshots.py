@@ -0,0 +1,56 @@
+"""add stock_movements ledger and stock_snapshots with opening snapshots
+
+Revision ID: f1c9e4b7a358
+Revises: d4a8c2e61f07
+Create Date: 2026-10-17 15:02:41.773910
+
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c9e4b7a358'
+down_revision: Union[str, None] = 'd4a8c2e61f07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('stock_movements',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('occurred_at', sa.DateTime(), nullable=False),
+    sa.Column('quantity_delta', sa.Integer(), nullable=False),
+    sa.Column('reason', sa.Enum('order placed', 'item added', 'item removed', 'order deleted', 'fulfilled', 'adjustment', 'import', 'reconciliation', name='movement_reason'), nullable=False),
+    sa.Column('order_id', sa.Integer(), nullable=True),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_stock_movements')),
+    sqlite_autoincrement=True
+    )
+    op.create_index(op.f('ix_stock_movements_product_id'), 'stock_movements', ['product_id'], unique=False)
+    op.create_table('stock_snapshots',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('taken_at', sa.DateTime(), nullable=False),
+    sa.Column('stock_quantity', sa.Integer(), nullable=False),
+    sa.Column('last_movement_id', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_stock_snapshots'))
+    )
+    op.create_index('ix_stock_snapshots_product_id_taken_at', 'stock_snapshots', ['product_id', 'taken_at'], unique=False)
+    # Open the ledger of every existing product at its current stock.
+    op.execute(
+        sa.text(
+            "INSERT INTO stock_snapshots (product_id, taken_at, stock_quantity, last_movement_id) "
+            "SELECT id, :taken_at, stock_quantity, 0 FROM products"
+        ).bindparams(sa.bindparam('taken_at', datetime.now(), type_=sa.DateTime()))
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_stock_snapshots_product_id_taken_at', table_name='stock_snapshots')
+    op.drop_table('stock_snapshots')
+    op.drop_index(op.f('ix_stock_movements_product_id'), table_name='stock_movements')
+    op.drop_table('stock_movements')
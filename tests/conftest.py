@@ -0,0 +1,85 @@
+# tests/conftest.py
+
+from datetime import datetime
+
+import pytest
+
+from lib.cache import catalog_cache
+from lib.config import make_engine
+from lib.low_stock import low_stock_watchlist
+from lib.models import Base, Session, Product, Order, OrderItem, Shipment
+from lib.models import models
+from lib.services import add_product
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    """A fresh SQLite file with the production pragmas, bound to the global Session for the test."""
+    engine = make_engine(f"sqlite:///{tmp_path / 'warehouse.db'}")
+    Base.metadata.create_all(engine)
+    monkeypatch.setattr(models, "_engine", engine)
+    monkeypatch.setenv("WAREHOUSE_ARCHIVE_PATH", str(tmp_path / "warehouse_archive.db"))
+    Session.configure(bind=engine)
+    catalog_cache.invalidate()
+    low_stock_watchlist.invalidate()
+    yield engine
+    Session.configure(bind=None)
+    catalog_cache.invalidate()
+    low_stock_watchlist.invalidate()
+    engine.dispose()
+
+
+@pytest.fixture
+def session(engine):
+    session = Session()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def make_product(session):
+    """Create products through the service, so each one opens its stock ledger."""
+    created = []
+
+    def make(stock_quantity=100, price_per_unit=10.0, reorder_point=0, reorder_qty=0):
+        n = len(created) + 1
+        product = add_product(
+            session, f"Product {n}", f"SKU-{n:05d}", price_per_unit, stock_quantity,
+            reorder_point=reorder_point, reorder_qty=reorder_qty,
+        )
+        created.append(product)
+        return product
+
+    return make
+
+
+@pytest.fixture
+def make_order(session):
+    """Insert an order with its items directly, without reserving stock. lines maps product to quantity."""
+
+    def make(lines, status="pending", delivery_status=None, order_date=None):
+        order = Order(customer_name="Test Customer", order_date=order_date or datetime.now(), status=status)
+        order.order_items = [
+            OrderItem(product_id=product.id, quantity=quantity, unit_price=product.price_per_unit)
+            for product, quantity in lines.items()
+        ]
+        order.item_count = len(lines)
+        order.total_amount = sum(product.price_per_unit * quantity for product, quantity in lines.items())
+        if delivery_status is not None:
+            order.shipment = Shipment(delivery_status=delivery_status, shipped_date=datetime.now())
+        session.add(order)
+        session.commit()
+        return order
+
+    return make
+
+
+@pytest.fixture
+def stock_of(session):
+    """Read a product's stock level from the database, past the session's identity map."""
+
+    def read(product):
+        session.expire_all()
+        return session.query(Product.stock_quantity).filter(Product.id == product.id).scalar()
+
+    return read
@@ -0,0 +1,36 @@
+# tests/test_archive.py
+
+from datetime import datetime, timedelta
+
+from lib.archive import archive_orders, get_archived_order
+from lib.helpers import get_order_by_id
+from lib.services import get_order
+
+
+def columns(obj):
+    return {column.name: getattr(obj, column.name) for column in obj.__table__.columns}
+
+
+def test_archived_order_matches_the_original(session, engine, make_product, make_order):
+    first, second = make_product(price_per_unit=2.5), make_product(price_per_unit=4.0)
+    order = make_order({first: 2, second: 1}, status="fulfilled", delivery_status="delivered",
+                       order_date=datetime(2024, 1, 2))
+    kept = make_order({first: 1}, status="fulfilled", delivery_status="in transit", order_date=datetime(2024, 1, 3))
+    original = (
+        columns(order),
+        sorted((columns(item) for item in order.order_items), key=lambda item: item["id"]),
+        columns(order.shipment),
+    )
+    order_id, kept_id = order.id, kept.id
+    session.close()
+
+    result = archive_orders(datetime(2025, 1, 1), engine=engine, vacuum=False)
+    assert (result.orders, result.skipped) == (1, 0)
+
+    archived = get_archived_order(order_id)
+    assert archived.archived
+    assert (columns(archived), [columns(item) for item in archived.order_items], columns(archived.shipment)) == original
+    assert get_order_by_id(session, order_id) is None
+    assert get_order_by_id(session, kept_id) is not None
+    assert get_archived_order(kept_id) is None
+    assert columns(get_order(session, order_id, include_archived=True)) == original[0]
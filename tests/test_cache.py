@@ -0,0 +1,51 @@
+# tests/test_cache.py
+
+import pytest
+
+from lib.cache import catalog_cache
+from lib.low_stock import low_stock_watchlist
+from lib.services import place_order, reserve_stock
+
+
+@pytest.fixture(autouse=True)
+def no_refresh(monkeypatch):
+    # Only commit hooks may drop entries here, not the periodic updated_at check.
+    monkeypatch.setattr(catalog_cache, "refresh_interval", 3600)
+    monkeypatch.setattr(catalog_cache, "_next_refresh", float("inf"))
+
+
+def test_cached_product_is_dropped_on_commit(session, make_product):
+    product = make_product(stock_quantity=10)
+    cached = catalog_cache.get_by_id(session, product.id)
+
+    reserve_stock(session, product.id, 4)
+    assert catalog_cache.get_by_id(session, product.id) is cached
+    session.commit()
+
+    reloaded = catalog_cache.get_by_id(session, product.id)
+    assert reloaded is not cached
+    assert reloaded.stock_quantity == 6
+
+
+def test_cached_product_survives_rollback(session, make_product):
+    product = make_product(stock_quantity=10)
+    cached = catalog_cache.get_by_id(session, product.id)
+
+    reserve_stock(session, product.id, 4)
+    session.rollback()
+
+    assert catalog_cache.get_by_id(session, product.id) is cached
+    assert cached.stock_quantity == 10
+
+
+def test_watchlist_follows_commits_only(session, make_product):
+    product = make_product(stock_quantity=10, reorder_point=5)
+    assert low_stock_watchlist.levels(session) == []
+
+    reserve_stock(session, product.id, 6)
+    assert low_stock_watchlist.levels(session) == []
+    session.rollback()
+    assert low_stock_watchlist.levels(session) == []
+
+    place_order(session, "Alice", {product.id: 6})
+    assert [(level.id, level.stock_quantity) for level in low_stock_watchlist.levels(session)] == [(product.id, 4)]
@@ -0,0 +1,21 @@
+# tests/test_cli.py
+
+import pytest
+
+from lib.cli import parse_id_selection
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("7", ([7], None)),
+    ("1, 4, 5", ([1, 4, 5], None)),
+    ("3-9", (None, (3, 9))),
+    ("4-4", (None, (4, 4))),
+])
+def test_parse_id_selection(raw, expected):
+    assert parse_id_selection(raw) == expected
+
+
+@pytest.mark.parametrize("raw", [",", " , ,", "9-3", "a", "1-", "-5", "1-2-3"])
+def test_parse_id_selection_rejects_empty_and_backward_selections(raw):
+    with pytest.raises(ValueError):
+        parse_id_selection(raw)
@@ -0,0 +1,32 @@
+# tests/test_helpers.py
+
+import io
+from contextlib import redirect_stdout
+
+from lib.checks import count_statements
+from lib.helpers import print_orders
+from lib.models import Session
+
+
+def statements_to_print_orders(engine):
+    session = Session()
+    try:
+        with count_statements(engine) as counter, redirect_stdout(io.StringIO()):
+            print_orders(session)
+    finally:
+        session.close()
+    return counter["count"]
+
+
+def test_print_orders_statement_count_does_not_grow_with_orders(engine, make_product, make_order):
+    products = [make_product() for _ in range(3)]
+
+    def add_orders(count):
+        for n in range(count):
+            make_order(dict.fromkeys(products, 1), **({"status": "fulfilled", "delivery_status": "in transit"} if n % 2 else {}))
+
+    add_orders(10)
+    few = statements_to_print_orders(engine)
+    add_orders(190)
+    many = statements_to_print_orders(engine)
+    assert few == many
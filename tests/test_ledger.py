@@ -0,0 +1,41 @@
+# tests/test_ledger.py
+
+import time
+from datetime import datetime
+
+from lib.ledger import compact_ledger, stock_at
+from lib.services import place_order, cancel_orders
+
+
+def checkpoint():
+    # Keep each checkpoint strictly between the movements around it.
+    time.sleep(0.002)
+    at = datetime.now()
+    time.sleep(0.002)
+    return at
+
+
+def test_stock_at_is_unchanged_by_compaction(session, make_product):
+    before_ledger = checkpoint()
+    product = make_product(stock_quantity=50)
+    checkpoints = [checkpoint()]
+    orders = []
+    for quantity in (5, 7, 3, 9):
+        orders.append(place_order(session, "Alice", {product.id: quantity}))
+        checkpoints.append(checkpoint())
+    cancel_orders(session, order_ids=[orders[1].id])
+    checkpoints.append(checkpoint())
+
+    expected = [50, 45, 38, 35, 26, 33]
+    assert [stock_at(session, product.id, at) for at in checkpoints] == expected
+
+    written, pruned = compact_ledger(session, min_tail=1)
+    assert (written, pruned) == (1, 0)
+    assert stock_at(session, product.id, before_ledger) is None
+    assert [stock_at(session, product.id, at) for at in checkpoints] == expected
+
+    place_order(session, "Bob", {product.id: 4})
+    now = checkpoint()
+    written, pruned = compact_ledger(session, min_tail=1, prune_before=now)
+    assert (written, pruned) == (1, 6)
+    assert stock_at(session, product.id, now) == 29
@@ -0,0 +1,121 @@
+# tests/test_orders.py
+
+import pytest
+from sqlalchemy import func
+
+from lib.models import Session, Order, OrderItem, StockMovement, Shipment
+from lib.services import (
+    place_order, reserve_stock, add_order_item, remove_order_item, restore_order_stock,
+    cancel_orders, fulfill_wave, InsufficientStockError,
+)
+
+
+def test_place_order_rolls_back_every_line_when_one_is_short(session, make_product, stock_of):
+    plenty, scarce = make_product(stock_quantity=5), make_product(stock_quantity=1)
+    movements = session.query(func.count(StockMovement.id)).scalar()
+
+    with pytest.raises(InsufficientStockError) as excinfo:
+        place_order(session, "Alice", {plenty.id: 2, scarce.id: 3})
+
+    assert (excinfo.value.product_id, excinfo.value.requested, excinfo.value.available) == (scarce.id, 3, 1)
+    assert (stock_of(plenty), stock_of(scarce)) == (5, 1)
+    assert session.query(func.count(Order.id)).scalar() == 0
+    assert session.query(func.count(OrderItem.id)).scalar() == 0
+    assert session.query(func.count(StockMovement.id)).scalar() == movements
+
+
+def test_reserve_stock_never_oversells_a_stale_read(session, make_product, stock_of):
+    product = make_product(stock_quantity=5)
+    other = Session()
+    try:
+        # The other clerk saw 5 in stock before this order took 3 of them.
+        assert other.get(type(product), product.id).stock_quantity == 5
+        place_order(session, "Alice", {product.id: 3})
+        with pytest.raises(InsufficientStockError) as excinfo:
+            reserve_stock(other, product.id, 3)
+        other.rollback()
+    finally:
+        other.close()
+
+    assert excinfo.value.available == 2
+    assert stock_of(product) == 2
+
+
+def test_cancel_orders_restores_exact_quantities_once(session, make_product, stock_of):
+    first, second = make_product(stock_quantity=10), make_product(stock_quantity=10)
+    order = place_order(session, "Alice", {first.id: 2, second.id: 3})
+    other = place_order(session, "Bob", {first.id: 4})
+    assert (stock_of(first), stock_of(second)) == (4, 7)
+
+    assert cancel_orders(session, order_ids=[order.id, other.id]) == sorted([order.id, other.id])
+    assert (stock_of(first), stock_of(second)) == (10, 10)
+    assert {o.status for o in session.query(Order)} == {"cancelled"}
+
+    assert cancel_orders(session, order_ids=[order.id, other.id]) == []
+    assert (stock_of(first), stock_of(second)) == (10, 10)
+
+
+def test_restore_order_stock_sums_lines_per_product(session, make_product, make_order, stock_of):
+    first, second = make_product(stock_quantity=10), make_product(stock_quantity=10)
+    orders = [make_order({first: 2, second: 1}), make_order({first: 5})]
+
+    assert restore_order_stock(session, [o.id for o in orders]) == 2
+    session.commit()
+    assert (stock_of(first), stock_of(second)) == (17, 11)
+
+
+def test_fulfill_wave_fulfills_what_it_can_and_reports_the_rest(session, make_product, make_order, stock_of):
+    scarce, plenty = make_product(stock_quantity=5), make_product(stock_quantity=10)
+    met = make_order({scarce: 3})
+    short = make_order({scarce: 3})
+    other = make_order({plenty: 2})
+    cancelled = make_order({plenty: 1}, status="cancelled")
+
+    result = fulfill_wave(session, [met.id, short.id, other.id, cancelled.id, 9999])
+
+    assert result.fulfilled == [met.id, other.id]
+    assert list(result.short) == [short.id]
+    assert result.short[short.id].available == 2
+    assert sorted(result.skipped) == [cancelled.id, 9999]
+    assert (stock_of(scarce), stock_of(plenty)) == (2, 8)
+    statuses = dict(session.query(Order.id, Order.status))
+    assert [statuses[o.id] for o in (met, short, other, cancelled)] == ["fulfilled", "pending", "fulfilled", "cancelled"]
+    shipments = dict(session.query(Shipment.order_id, Shipment.id))
+    assert shipments == result.shipments
+
+
+def test_fulfill_wave_without_partial_writes_nothing_on_a_shortfall(session, make_product, make_order, stock_of):
+    product = make_product(stock_quantity=5)
+    met, short = make_order({product: 3}), make_order({product: 3})
+
+    with pytest.raises(InsufficientStockError):
+        fulfill_wave(session, [met.id, short.id], partial=False)
+
+    assert stock_of(product) == 5
+    assert {o.status for o in session.query(Order)} == {"pending"}
+    assert session.query(func.count(Shipment.id)).scalar() == 0
+
+
+def test_order_totals_follow_item_edits(session, make_product):
+    first, second = make_product(price_per_unit=2.5), make_product(price_per_unit=4.0)
+    order = place_order(session, "Alice", {first.id: 2})
+
+    def assert_totals_match_items():
+        session.expire_all()
+        stored = session.query(Order.item_count, Order.total_amount).filter(Order.id == order.id).one()
+        summed = (
+            session.query(func.count(OrderItem.id), func.sum(OrderItem.quantity * OrderItem.unit_price))
+            .filter(OrderItem.order_id == order.id)
+            .one()
+        )
+        assert stored.item_count == summed[0]
+        assert stored.total_amount == pytest.approx(summed[1] or 0.0)
+
+    assert_totals_match_items()
+    add_order_item(session, order.id, second.id, 3)
+    assert_totals_match_items()
+    add_order_item(session, order.id, first.id, 1)
+    assert_totals_match_items()
+    remove_order_item(session, order.id, second.id)
+    assert_totals_match_items()
+    assert (order.item_count, order.total_amount) == (1, pytest.approx(7.5))
@@ -0,0 +1,79 @@
+# tests/test_server.py
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from lib import services
+from lib.server import WarehouseServer
+
+
+def request_bytes(method, path, payload=None):
+    body = json.dumps(payload).encode() if payload is not None else b""
+    head = f"{method} {path} HTTP/1.1\r\nHost: test\r\nContent-Length: {len(body)}\r\n\r\n"
+    return head.encode("latin-1") + body
+
+
+async def read_response(reader):
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while (line := await reader.readline()) != b"\r\n":
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    return status, json.loads(await reader.readexactly(int(headers["content-length"])))
+
+
+async def pipeline(*requests):
+    """Send every request on one connection before reading any response."""
+    server = await WarehouseServer(port=0).start()
+    try:
+        reader, writer = await asyncio.open_connection(server.host, server.port)
+        writer.write(b"".join(request_bytes(*request) for request in requests))
+        await writer.drain()
+        responses = [await read_response(reader) for _ in requests]
+        writer.close()
+        return responses
+    finally:
+        await server.shutdown(grace=5)
+
+
+@pytest.fixture
+def slow_place_order(monkeypatch):
+    """Hold every write long enough that a read racing it would finish first."""
+    place_order = services.place_order
+
+    def slow(*args, **kwargs):
+        time.sleep(0.2)
+        return place_order(*args, **kwargs)
+
+    monkeypatch.setattr(services, "place_order", slow)
+
+
+def test_pipelined_read_sees_the_earlier_write(make_product, slow_place_order):
+    product = make_product(stock_quantity=5)
+    order = {"customer_name": "Alice", "items": [{"product_id": product.id, "quantity": 3}]}
+
+    (placed, created), (read, found) = asyncio.run(pipeline(
+        ("POST", "/orders", order),
+        ("GET", f"/products/{product.id}"),
+    ))
+
+    assert placed == 201 and created["status"] == "pending"
+    assert read == 200 and found["stock_quantity"] == 2
+
+
+def test_pipelined_write_waits_for_the_earlier_read(make_product, slow_place_order):
+    product = make_product(stock_quantity=5)
+    order = {"customer_name": "Alice", "items": [{"product_id": product.id, "quantity": 3}]}
+
+    (read, found), (placed, _), (reread, refound) = asyncio.run(pipeline(
+        ("GET", f"/products/{product.id}"),
+        ("POST", "/orders", order),
+        ("GET", f"/products/{product.id}"),
+    ))
+
+    assert (read, found["stock_quantity"]) == (200, 5)
+    assert placed == 201
+    assert (reread, refound["stock_quantity"]) == (200, 2)